@@ -0,0 +1,154 @@
+import argparse
+
+from dogpark.game.game import AIS
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(prog="dogpark")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    simulate_parser = commands.add_parser("simulate", help="play many automatic games between AIs")
+    simulate_parser.add_argument("--games", type=int, default=2000, help="number of games to play")
+    simulate_parser.add_argument(
+        "--ais",
+        type=lambda s: s.replace(" ", "").split(","),
+        default=["NaiveAI", "NaiveAI", "StingyAI", "StingyAI"],
+        help=f"comma separated AIs, one per player. Available: {', '.join(AIS)}",
+    )
+    simulate_parser.add_argument("--jobs", type=int, default=0, help="worker processes, 0 for one per core")
+    simulate_parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    simulate_parser.add_argument(
+        "--duplicate", action="store_true", help="play every game once per seat, moving the AIs round a seat each time"
+    )
+    simulate_parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="profile the games, print where the time went and save the cProfile stats to PATH for pstats",
+    )
+
+    evaluate_parser = commands.add_parser(
+        "evaluate", help="play AIs against each other until it is clear which is stronger, and rate them"
+    )
+    evaluate_parser.add_argument(
+        "--ais",
+        type=lambda s: s.replace(" ", "").split(","),
+        default=list(AIS),
+        help="comma separated AIs, every two of which play a matchup. Defaults to every AI",
+    )
+    evaluate_parser.add_argument("--max-games", type=int, default=2000, help="most games to play in a matchup")
+    evaluate_parser.add_argument("--elo0", type=float, default=0, help="Elo difference of the null hypothesis")
+    evaluate_parser.add_argument("--elo1", type=float, default=20, help="Elo difference of the alternative hypothesis")
+    evaluate_parser.add_argument("--alpha", type=float, default=0.05, help="false positive rate")
+    evaluate_parser.add_argument("--beta", type=float, default=0.05, help="false negative rate")
+    evaluate_parser.add_argument("--jobs", type=int, default=0, help="worker processes, 0 for one per core")
+    evaluate_parser.add_argument("--seed", type=int, default=0, help="seed of the first deal")
+
+    bench_parser = commands.add_parser("bench", help="benchmark the engine, and check for regressions")
+    bench_parser.add_argument("--quick", action="store_true", help="only check that the benchmarks run")
+    bench_parser.add_argument("--save", help="save the results as JSON to this path")
+    bench_parser.add_argument("--baseline", help="compare to the JSON results at this path, failing on regressions")
+    bench_parser.add_argument(
+        "--threshold", type=float, default=0.1, help="fraction worse than the baseline that is a regression"
+    )
+
+    commands.add_parser("tablebase", help="solve the walking tablebase of every park card ahead of time")
+
+    serve_parser = commands.add_parser(
+        "serve", help="host games against AIs, with a player connecting to play each one (see dogpark.game.async_game)"
+    )
+    serve_parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    serve_parser.add_argument("--port", type=int, default=7654, help="port to listen on")
+    serve_parser.add_argument(
+        "--ais",
+        type=lambda s: s.replace(" ", "").split(","),
+        default=["HeuristicAI"],
+        help="comma separated AIs the connecting player plays against",
+    )
+    serve_parser.add_argument("--workers", type=int, default=8, help="threads the AIs think in")
+    serve_parser.add_argument("--max-games", type=int, default=10000, help="games that can be in progress at once")
+    serve_parser.add_argument(
+        "--timeout", type=float, default=300, help="seconds a player has for each decision before losing their game"
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "simulate":
+        from dogpark.simulate import print_averages, simulate
+
+        for ai in args.ais:
+            if ai not in AIS:
+                parser.error(f"unknown AI {ai}")
+        if not 2 <= len(args.ais) <= 4:
+            parser.error("dogpark is played by 2 to 4 players")
+        profile = None
+        if args.profile:
+            from dogpark.game.profiling import Profile
+
+            profile = Profile(cprofile=True)
+        records = simulate(
+            args.games, args.ais, jobs=args.jobs or None, seed=args.seed, duplicate=args.duplicate, profile=profile
+        )
+        print_averages(records)
+        if profile is not None:
+            profile.print_summary()
+            profile.dump_stats(args.profile)
+
+    if args.command == "evaluate":
+        from dogpark.evaluate import league, print_league
+
+        for ai in args.ais:
+            if ai not in AIS:
+                parser.error(f"unknown AI {ai}")
+        if len(args.ais) < 2:
+            parser.error("at least 2 AIs are needed for a matchup")
+        sprt = {"elo0": args.elo0, "elo1": args.elo1, "alpha": args.alpha, "beta": args.beta}
+        matchups, ratings = league(args.ais, max_games=args.max_games, jobs=args.jobs or None, seed=args.seed, **sprt)
+        print_league(matchups, ratings)
+
+    if args.command == "bench":
+        from dogpark import bench
+
+        baseline = None
+        if args.baseline:
+            with open(args.baseline) as f:
+                baseline = bench.loads(f.read())
+        results = bench.run(quick=args.quick)
+        bench.print_results(results, baseline)
+        if args.save:
+            with open(args.save, "w") as f:
+                f.write(bench.dumps(results))
+        if baseline:
+            regressions = bench.compare(results, baseline, args.threshold)
+            if regressions:
+                parser.exit(1, f"Regressions beyond {args.threshold:.0%}: {', '.join(regressions)}\n")
+
+    if args.command == "tablebase":
+        from dogpark.game.tablebase import solve_all
+
+        for path in solve_all():
+            print(path)
+
+    if args.command == "serve":
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        from dogpark.game.async_game import serve
+
+        for ai in args.ais:
+            if ai not in AIS:
+                parser.error(f"unknown AI {ai}")
+        if not 1 <= len(args.ais) <= 3:
+            parser.error("dogpark is played by 2 to 4 players")
+
+        async def run():
+            with ThreadPoolExecutor(args.workers) as executor:
+                server = await serve(args.host, args.port, tuple(args.ais), executor, args.max_games, args.timeout)
+                print(f"Serving games against {', '.join(args.ais)} on {args.host}:{args.port}")
+                async with server:
+                    await server.serve_forever()
+
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
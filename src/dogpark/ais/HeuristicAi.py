@@ -1,15 +1,39 @@
-from dogpark.ais.naive_ai import NaiveAI
-from dogpark.game.park import Park
+from typing import Optional
 
+from dogpark.ais.search_ai import SearchAI
+from dogpark.game.clock import Deadline
+from dogpark.game.gamestate import Stage
+from dogpark.game.moves import Journal, Move, apply_move, legal_moves
+from dogpark.game.player import score_breakdown
+from dogpark.game.ponder import Pondered
+from dogpark.game.selection import best_selection
 
-class HeuristicAI(NaiveAI):
+
+class HeuristicAI(SearchAI):
     """
     The Heuristic AI isn't quite a full minimax, but it builds on the naive AI by calculating the immediate
-    final score of any decision it could make, and always choosing the highest one.
+    final score of any decision it could make, and always choosing the highest one. It does this while walking. Dogs on
+    the lead don't count towards the final score until home time, so it selects the lead that gains the most by then
+    (see dogpark.game.selection).
     """
 
-    def choose_destination(self, park: Park) -> int:
-        """
-        Choose the destination that will result in the highest score.
-        """
+    def think(self, deadline: Deadline, pondered: Optional[Pondered] = None) -> tuple[Optional[Move], int, object]:
+        """Takes no time to speak of, so it never looks at the deadline"""
+        if self.game.stage is Stage.SELECTION:
+            return best_selection(self.game, self), 1, None
+        if self.game.stage is not Stage.WALKING:
+            return None, 0, None
 
+        state = self.game.clone()
+        me = state.players[self.game.players.index(self)]
+        journal = Journal()
+        best, best_score = None, None
+        moves = legal_moves(state)
+        for move in moves:
+            apply_move(state, move, journal)
+            # resources only score in fives at the end, so count each one as a fifth of a point
+            score = score_breakdown(me).total + sum(me.resources.values()) / 5
+            journal.undo()
+            if best_score is None or score > best_score:
+                best, best_score = move, score
+        return best, len(moves), None
@@ -0,0 +1,16 @@
+from dogpark.ais.HeuristicAi import HeuristicAI
+from dogpark.game.bidding import dog_value, equilibrium_bid
+
+
+class EquilibriumAI(HeuristicAI):
+    """
+    Plays like the HeuristicAI, but bids with the equilibrium strategy of the bidding round (see dogpark.game.bidding),
+    and picks the dog worth most to it when it wins none. A bidding round it hasn't seen before takes a few
+    milliseconds to solve.
+    """
+
+    def bid(self, available_dogs: list[int], bids: dict[int, list]) -> (int, int):
+        return equilibrium_bid(self.game, self, self.rng)
+
+    def choose_dog(self, available_dogs: list[int]) -> int:
+        return max(available_dogs, key=lambda dog: dog_value(self, dog))
@@ -0,0 +1,218 @@
+"""
+Information set Monte Carlo tree search (ISMCTS).
+
+Dogpark hides some of the game from each player: the order of the dog deck, the other players' objectives and the
+amounts of sealed bids. Rather than search a single guess at these, every iteration of the search determinizes: it
+copies the game, shuffles the deck, deals the other players objectives from the pools draw_objective_pairs deals from
+(less the pair this player was given), and redraws the amounts of bids already made. The iteration then walks down a
+tree shared by all determinizations, only choosing between the moves that are legal in this one, and plays the rest of
+the game out with the cheap policy of dogpark.game.playout. Every node keeps the utility (see dogpark.game.node) of the
+player who made its move, so each player picks the moves that are best for them.
+
+The tree covers the selection and walking moves left in the round. Objectives, bids and dogs chosen after bidding are
+searched as the first move of the tree.
+"""
+from __future__ import annotations
+
+import math
+import random
+from typing import Callable, Hashable, Optional
+
+from dogpark.ais.search_ai import SearchAI
+from dogpark.game.clock import Deadline
+from dogpark.game.gamestate import GameState, Stage
+from dogpark.game.moves import Journal, Move, apply_move, legal_moves
+from dogpark.game.node import utilities
+from dogpark.game.playout import PlayoutPlayer, finish_bidding, greedy_bonus, play_bidding, play_out
+from dogpark.game.player import Player
+from dogpark.game.ponder import Pondered
+
+# applies an option of the first move to a determinized game, for the given (determinized) player
+ApplyOption = Callable[[GameState, Player, Hashable], None]
+
+
+class ISMCTSNode:
+    __slots__ = ("move", "player", "children", "visits", "available", "reward")
+
+    def __init__(self, move: Hashable = None, player: int = -1):
+        self.move = move
+        self.player = player  # index of the player who made the move
+        self.children: dict[Hashable, ISMCTSNode] = {}
+        self.visits = 0
+        self.available = 0  # iterations in which the move could have been chosen
+        self.reward = 0.0  # total utility for self.player
+
+    def ucb(self, exploration: float) -> float:
+        return self.reward / self.visits + exploration * math.sqrt(math.log(self.available) / self.visits)
+
+
+class ISMCTSAI(SearchAI):
+    time_limit = 0.05  # seconds per decision
+    ponders = True
+    unit = "playouts"
+    max_iterations = 5000  # per decision, whichever runs out first
+    exploration = 0.25  # utilities are shares of the total score, so they don't vary by much
+    max_bid = 3
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.objective_pair: tuple[Optional[int], ...] = ()
+        self.iterations = 0  # of the last search
+
+    def determinize(self) -> tuple[GameState, Player]:
+        """A copy of the game with the hidden information redrawn, and this player's copy in it"""
+        state = self.game.clone()
+        state.zobrist = None
+        self.rng.shuffle(state.dogs_deck)
+        me = state.players[self.game.players.index(self)]
+
+        hidden = self.objective_pair or (self.objective,)
+        hards = [o for o in (range(1, 6) if state.num_players >= 4 else range(2, 6)) if o not in hidden]
+        easies = [o for o in range(6, 11) if o not in hidden]
+        others = [player for player in state.players if player is not me]
+        pairs = zip(self.rng.sample(hards, len(others)), self.rng.sample(easies, len(others)))
+        for player, pair in zip(others, pairs):
+            player.objective = self.rng.choice(pair)
+
+        for player in state.players:
+            player.__class__ = PlayoutPlayer
+            player.rng = self.rng
+        return state, me
+
+    def run(self, options: Optional[list] = None, apply: Optional[ApplyOption] = None) -> Optional[Hashable]:
+        """
+        Search from the current position, and return the most visited first move. The first moves are the given
+        options if there are any, otherwise the legal moves of the player to move. Returns None if the hard deadline
+        passed before anything was searched.
+        """
+        root = ISMCTSNode()
+        deadline = self.start_thinking()
+        self.grow(root, deadline, self.max_iterations, options, apply)
+        self.stop_thinking(deadline, self.iterations, self.unit)
+        return self.best(root)
+
+    def think(self, deadline: Deadline, pondered: Optional[Pondered] = None) -> tuple[Optional[Move], int, object]:
+        if pondered is None:
+            root, iterations = ISMCTSNode(), self.max_iterations
+        else:
+            root, iterations = pondered.carry, self.max_iterations - pondered.work
+        self.grow(root, deadline, iterations)
+        return self.best(root), self.iterations, root
+
+    def grow(
+        self,
+        root: ISMCTSNode,
+        deadline: Deadline,
+        iterations: int,
+        options: Optional[list] = None,
+        apply: Optional[ApplyOption] = None,
+    ):
+        """
+        Iterate on the tree until the deadline, or for the given number of iterations. At least one iteration is
+        made unless the hard deadline has passed, and none are started after it.
+        """
+        self.iterations = 0
+        while (
+            self.iterations < iterations
+            and not deadline.hard_passed()
+            and (self.iterations == 0 or not deadline.soft_passed())
+        ):
+            self._iterate(root, options, apply)
+            self.iterations += 1
+
+    @staticmethod
+    def best(root: ISMCTSNode) -> Optional[Hashable]:
+        """The most visited first move"""
+        if not root.children:
+            return None
+        return max(root.children.values(), key=lambda child: child.visits).move
+
+    def _iterate(self, root: ISMCTSNode, options: Optional[list], apply: Optional[ApplyOption]):
+        state, me = self.determinize()
+        index = {id(player): i for i, player in enumerate(state.players)}
+        journal = Journal()
+        node = root
+        path = []
+        while True:
+            if node is root and options is not None:
+                moves, player = options, index[id(me)]
+            elif state.stage in (Stage.SELECTION, Stage.WALKING) and state.player is not None:
+                moves, player = legal_moves(state), index[id(state.player)]
+            else:
+                break
+
+            node, expanded = self._select(node, moves, player)
+            path.append(node)
+            if options is not None and len(path) == 1:
+                apply(state, me, node.move)
+            else:
+                apply_move(state, node.move, journal)
+            if expanded:
+                break
+
+        values = utilities(play_out(state, self.rng))
+        for node in path:
+            node.visits += 1
+            node.reward += values[node.player]
+
+    def _select(self, node: ISMCTSNode, moves: list, player: int) -> tuple[ISMCTSNode, bool]:
+        """The child to go down, and whether it was just added to the tree"""
+        untried = []
+        for move in moves:
+            child = node.children.get(move)
+            if child is None:
+                untried.append(move)
+            else:
+                child.available += 1
+        if untried:
+            move = self.rng.choice(untried)
+            child = node.children[move] = ISMCTSNode(move, player)
+            child.available = 1
+            return child, True
+        return max((node.children[move] for move in moves), key=lambda c: c.ucb(self.exploration)), False
+
+    def choose_objective(self, hard: int = None, easy: int = None) -> Optional[int]:
+        if hard is None or easy is None:
+            return super().choose_objective(hard, easy)
+        self.objective_pair = (hard, easy)
+        objective = self.run([hard, easy], _set_objective)
+        if objective is None:
+            return super().choose_objective(hard, easy)
+        self.objective = objective
+        return self.objective
+
+    def bid(self, available_dogs: list[int], bids: dict[int, list]) -> (int, int):
+        amounts = range(1, max(1, min(self.max_bid, self.reputation)) + 1)
+        options = [(dog, amount) for dog in available_dogs for amount in amounts]
+        bid = self.run(options, lambda state, me, option: self._play_bid(state, me, option, bids))
+        return super().bid(available_dogs, bids) if bid is None else bid
+
+    def _play_bid(self, state: GameState, me: Player, option: tuple[int, int], bids: dict[int, list]):
+        # bids are sealed, so only the dogs that were bid on are known, not the amounts
+        players = {id(player): state.players[i] for i, player in enumerate(self.game.players)}
+        det_bids = {
+            dog: [(players[id(player)], self.rng.randint(1, max(1, min(self.max_bid, player.reputation))))
+                  for player, _ in dog_bids]
+            for dog, dog_bids in bids.items()
+        }
+        dog, amount = option
+        det_bids[dog].append((me, amount))
+        play_bidding(state, det_bids)
+
+    def choose_dog(self, available_dogs: list[int]) -> int:
+        dog = self.run(list(available_dogs), _take_dog)
+        return super().choose_dog(available_dogs) if dog is None else dog
+
+    def choose_bonus(self, bonuses: list[str]) -> str:
+        return greedy_bonus(self, bonuses)
+
+
+def _set_objective(state: GameState, me: Player, objective: int):
+    me.objective = objective
+
+
+def _take_dog(state: GameState, me: Player, dog: int):
+    me.reputation -= 1
+    state.dogs.remove(dog)
+    me.add_dog_to_kennel(dog)
+    finish_bidding(state, {})
@@ -0,0 +1,32 @@
+from typing import Optional
+
+from dogpark.ais.search_ai import SearchAI
+from dogpark.game.clock import Deadline
+from dogpark.game.moves import Move
+from dogpark.game.node import MaxnSearch
+from dogpark.game.ponder import Pondered
+from dogpark.game.zobrist import TranspositionTable
+
+
+class MinimaxAI(SearchAI):
+    """Searches the game tree during selection and walking with max^n (see dogpark.game.node)"""
+
+    time_limit = 0.05  # seconds per decision
+    ponders = True
+    table_memory = 8 * 2**20  # bytes for the transposition table, kept between decisions
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.last_search: Optional[MaxnSearch] = None
+        self.table = TranspositionTable(self.table_memory)
+
+    def think(self, deadline: Deadline, pondered: Optional[Pondered] = None) -> tuple[Optional[Move], int, object]:
+        if pondered is None:
+            search = MaxnSearch(self.game.clone(), table=self.table, deadline=deadline)
+        else:
+            search = pondered.carry  # deepens on from the last iteration it completed
+            search.deadline = deadline
+        nodes = search.nodes
+        move = search.search()
+        self.last_search = search
+        return move, search.nodes - nodes, search
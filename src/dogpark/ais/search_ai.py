@@ -0,0 +1,110 @@
+from abc import abstractmethod
+from typing import Optional
+
+from dogpark.ais.naive_ai import NaiveAI
+from dogpark.game import ANY
+from dogpark.game.clock import Clock, Deadline
+from dogpark.game.moves import Leave, Move, Select, Walk
+from dogpark.game.park import Park
+from dogpark.game.ponder import Pondered
+from dogpark.game.zobrist import zobrist_hash
+
+
+class SearchAI(NaiveAI):
+    """
+    Base class for AIs that search through the moves of the selection and walking phases (see dogpark.game.moves),
+    and play like the NaiveAI for everything else. A walk is searched once when choosing the destination, and the
+    payment or leaving bonus found with it is reused when the game asks for them.
+
+    A search takes time_limit seconds, unless the AI is given a clock, which sets the time for each decision (see
+    dogpark.game.clock). AIs that ponder search positions ahead of time while the game waits on a human player (see
+    dogpark.game.ponder), and carry on with that search when they get to one of them.
+    """
+
+    time_limit = 0.05  # seconds per decision
+    clock: Optional[Clock] = None
+    ponders = False  # if thinking ahead is worth it, rather than instant
+    unit = "positions"  # what the work done by think counts
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.planned: Optional[Move] = None
+        self.pondered: dict[int, Pondered] = {}  # by zobrist hash of the position, filled in by a Ponderer
+        self.ponder_hits = 0  # decisions made in a position that had been pondered
+        self.ponder_misses = 0  # decisions made after pondering other positions
+
+    def search(self) -> Optional[Move]:
+        """The move to make from the current position, which must be this player's turn"""
+        deadline = self.start_thinking()
+        pondered = None
+        if self.pondered:
+            # whatever was pondered led up to this decision, so none of it is any use after it
+            pondered = self.pondered.get(zobrist_hash(self.game))
+            self.pondered = {}
+            if pondered is None:
+                self.ponder_misses += 1
+            else:
+                self.ponder_hits += 1
+
+        if pondered is not None and pondered.move is not None and (
+            pondered.done or pondered.seconds >= deadline.soft - deadline.start
+        ):
+            move, work = pondered.move, 0
+        else:
+            if pondered is not None:
+                deadline.soft -= pondered.seconds  # the time already spent on this position counts towards it
+            move, work, _ = self.think(deadline, pondered)
+        self.stop_thinking(deadline, work, self.unit)
+        return move
+
+    @abstractmethod
+    def think(self, deadline: Deadline, pondered: Optional[Pondered] = None) -> tuple[Optional[Move], int, object]:
+        """
+        Search from the current position until the deadline, carrying on with the pondered search if there is one.
+        Returns the best move, the work done, and what is needed to carry on with the search later.
+        """
+
+    def start_thinking(self) -> Deadline:
+        """The deadline of the decision being made"""
+        if self.clock is None:
+            return Deadline(self.time_limit)
+        return self.clock.deadline(self.game)
+
+    def stop_thinking(self, deadline: Deadline, work: int, unit: str):
+        """Count the time taken by the decision, and the work done in it, on the clock"""
+        if self.clock is not None:
+            self.clock.record(self.game, deadline, work, unit)
+
+    def do_selection(self) -> list[int]:
+        move = self.search()
+        if not isinstance(move, Select):
+            return super().do_selection()
+
+        for resource, cost in zip(ANY, move.cost):
+            self.resources[resource] -= cost
+        for dog in move.dogs:
+            self.put_on_lead(dog)
+        self.finish_selection()
+
+        return list(self.lead)
+
+    def choose_destination(self, park: Park) -> int:
+        self.planned = self.search()
+        if isinstance(self.planned, Walk):
+            return self.planned.destination
+        if isinstance(self.planned, Leave):
+            return 15
+        return super().choose_destination(park)
+
+    def pay_walking_bonus(self, park: Park, destination: int) -> bool:
+        if isinstance(self.planned, Walk) and self.planned.destination == destination:
+            return self.planned.pay
+        return super().pay_walking_bonus(park, destination)
+
+    def choose_leaving_bonus_index(self, park: Park) -> int:
+        # when forced to leave there was no destination to plan with
+        planned = self.planned if isinstance(self.planned, Leave) else self.search()
+        self.planned = None
+        if isinstance(planned, Leave) and 0 <= planned.bonus < len(park.leaving_bonuses):
+            return planned.bonus
+        return super().choose_leaving_bonus_index(park)
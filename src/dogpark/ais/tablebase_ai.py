@@ -0,0 +1,48 @@
+import warnings
+from typing import Optional
+
+from dogpark.ais.HeuristicAi import HeuristicAI
+from dogpark.game.clock import Deadline
+from dogpark.game.gamestate import Stage
+from dogpark.game.moves import Leave, Move, Walk, has_butterfly
+from dogpark.game.ponder import Pondered
+from dogpark.game.tablebase import BONUS_VALUES, load_tablebase, table_path
+
+
+class TablebaseAI(HeuristicAI):
+    """
+    Selects its lead like the HeuristicAI, and walks by looking its position up in the park's tablebase (see
+    dogpark.game.tablebase). Tables are built ahead of time with python -m dogpark tablebase, never during a game, so
+    in a park without one it walks like the HeuristicAI.
+    """
+
+    def think(self, deadline: Deadline, pondered: Optional[Pondered] = None) -> tuple[Optional[Move], int, object]:
+        if self.game.stage is not Stage.WALKING:
+            return super().think(deadline, pondered)
+
+        state = self.game
+        park = state.park
+        if len(state.players_walking) == 1:
+            return self._leave(), 1, None
+        table = load_tablebase(park, state.num_players)
+        if table is None:
+            warnings.warn(
+                f"No tablebase at {table_path(park, state.num_players)}, walking like the HeuristicAI. "
+                f"Build the tables with python -m dogpark tablebase"
+            )
+            return super().think(deadline, pondered)
+        # the table is for the first player, and turns go round in the order of the players
+        me = state.players.index(self)
+        positions = tuple(park.player_positions[player.colour] for player in state.players[me:] + state.players[:me])
+        destination, pay = table.best_move(positions, 0)
+        if destination == 15:
+            return self._leave(), 1, None
+        return Walk(destination, pay and self.reputation > 0 and not has_butterfly(self)), 1, None
+
+    def _leave(self) -> Leave:
+        """Take the best leaving bonus left"""
+        bonuses = self.game.park.leaving_bonuses
+        if not bonuses:
+            return Leave(-1)
+        values = [sum(BONUS_VALUES[bonus] for bonus in bonus_list) for bonus_list in bonuses]
+        return Leave(values.index(max(values)))
@@ -0,0 +1,215 @@
+"""
+Benchmarks of the hot paths of the engine, and of whole games.
+
+Each micro-benchmark times one operation on a fixed position, taking the best of a few repeats (the one least
+disturbed by the rest of the machine), in microseconds per call. Operations that change the state run on copies made
+before the clock starts. The macro-benchmarks play whole silent games of NaiveAIs and StingyAIs, in games per second,
+and trace the peak memory a game allocates with tracemalloc.
+
+Results are saved as JSON and compared against a saved baseline from the same machine: any benchmark more than the
+threshold worse than its baseline is a regression.
+"""
+from __future__ import annotations
+
+import json
+import platform
+import tracemalloc
+from time import perf_counter
+from typing import Callable, NamedTuple
+
+from dogpark.game.game import Dogpark
+from dogpark.game.gamestate import GameState, Stage
+
+# the seed of the position the micro-benchmarks run on, where a player walks with a converter dog on the lead
+SEED = 1
+AIS = ["NaiveAI", "StingyAI", "NaiveAI", "StingyAI"]
+
+
+class Result(NamedTuple):
+    value: float
+    unit: str
+    higher_is_better: bool = False
+
+
+def _best(run: Callable[[int], float], number: int, repeat: int) -> float:
+    """The fewest seconds per call of run(number), which times number calls"""
+    return min(run(number) for _ in range(repeat)) / number
+
+
+def _game(num_players: int = 4, seed: int = SEED) -> Dogpark:
+    d = Dogpark(autorun=False, num_players=num_players, ais=AIS[:num_players], prints=False, seed=seed)
+    d.setup()
+    return d
+
+
+def walking_state() -> GameState:
+    """The first round of a 4 player game, at the start of walking"""
+    d = _game()
+    d.play_recruitment()
+    d.play_selection()
+    state = d.state
+    state.stage = Stage.WALKING
+    state.players_walking = state.players.copy()
+    state.park.player_positions = {player.colour: -1 for player in state.players}
+    return state
+
+
+def final_state() -> GameState:
+    d = _game()
+    d.play()
+    return d.state
+
+
+def bench_possible_moves(number: int) -> float:
+    park = walking_state().park
+    positions = range(-1, 15)
+    start = perf_counter()
+    for _ in range(number):
+        for position in positions:
+            park.possible_moves(position)
+    return (perf_counter() - start) / len(positions)
+
+
+def bench_walk(number: int) -> float:
+    state = walking_state()
+    assert any(player.get_lead_converters() for player in state.players), "no converters to resolve"
+    states = [state.clone() for _ in range(number)]
+    start = perf_counter()
+    for state in states:
+        for player in state.players:
+            player.walk(state.park)
+    return (perf_counter() - start) / len(state.players)
+
+
+def bench_final_score(number: int) -> float:
+    players = final_state().players
+    start = perf_counter()
+    for _ in range(number):
+        for player in players:
+            player.final_score()
+    return (perf_counter() - start) / len(players)
+
+
+def bench_breed_experts(number: int) -> float:
+    state = final_state()
+    start = perf_counter()
+    for _ in range(number):
+        state.calculate_breed_experts()
+    return perf_counter() - start
+
+
+def bench_draw_dogs(number: int) -> float:
+    state = _game().state
+    deck = state.dogs_deck
+    start = perf_counter()
+    for _ in range(number):
+        state.draw_dogs()
+        deck += reversed(state.dogs)  # put the dogs back, so the deck never runs out
+    return perf_counter() - start
+
+
+def bench_look(number: int) -> float:
+    state = _game().state
+    player = state.players[0]
+    decks = [state.dogs_deck.copy() for _ in range(number)]
+    dogs = state.dogs
+    start = perf_counter()
+    for deck in decks:
+        state.dogs_deck = deck
+        state.dogs = dogs.copy()
+        state.look(player)
+    return perf_counter() - start
+
+
+def bench_bidding(number: int) -> float:
+    d = _game()
+    d.state.stage = Stage.RECRUITMENT
+    d.state.bid_round = 1
+    states = [d.state.clone() for _ in range(number)]
+    start = perf_counter()
+    for state in states:
+        d.state = state
+        d.bidding()
+    return perf_counter() - start
+
+
+MICRO = {
+    "Park.possible_moves": bench_possible_moves,
+    "Player.walk": bench_walk,
+    "Player.final_score": bench_final_score,
+    "GameState.calculate_breed_experts": bench_breed_experts,
+    "GameState.draw_dogs": bench_draw_dogs,
+    "GameState.look": bench_look,
+    "Dogpark.bidding": bench_bidding,
+}
+
+
+def games_per_second(num_players: int, games: int) -> float:
+    start = perf_counter()
+    for seed in range(games):
+        Dogpark(num_players=num_players, ais=AIS[:num_players], prints=False, seed=seed)
+    return games / (perf_counter() - start)
+
+
+def peak_memory(num_players: int, games: int) -> float:
+    """The most memory allocated at once while playing a game, in KiB"""
+    peak = 0
+    for seed in range(games):
+        tracemalloc.start()
+        Dogpark(num_players=num_players, ais=AIS[:num_players], prints=False, seed=seed)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def run(quick: bool = False) -> dict[str, Result]:
+    """Run every benchmark. quick runs far fewer calls, to check the benchmarks work rather than to measure."""
+    number, repeat, games = (20, 1, 2) if quick else (2000, 5, 200)
+    Dogpark(num_players=4, ais=AIS, prints=False, seed=0)  # import and warm up everything first
+    results = {name: Result(_best(bench, number, repeat) * 1e6, "us") for name, bench in MICRO.items()}
+    for num_players in (2, 3, 4):
+        rate = max(games_per_second(num_players, games) for _ in range(repeat))
+        results[f"games/s {num_players}p"] = Result(rate, "games/s", higher_is_better=True)
+    for num_players in (2, 3, 4):
+        results[f"peak memory {num_players}p"] = Result(peak_memory(num_players, max(1, games // 20)), "KiB")
+    return results
+
+
+def dumps(results: dict[str, Result]) -> str:
+    return json.dumps(
+        {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": {name: result._asdict() for name, result in results.items()},
+        },
+        indent=2,
+    )
+
+
+def loads(data: str) -> dict[str, Result]:
+    return {name: Result(**result) for name, result in json.loads(data)["results"].items()}
+
+
+def compare(results: dict[str, Result], baseline: dict[str, Result], threshold: float = 0.1) -> list[str]:
+    """
+    The names of the benchmarks that are more than threshold (a fraction) worse than the baseline. Benchmarks missing
+    from either are skipped.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name].value
+        ratio = base / result.value if result.higher_is_better else result.value / base
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return regressions
+
+
+def print_results(results: dict[str, Result], baseline: dict[str, Result] = None):
+    for name, result in results.items():
+        line = f"{name:<36}{result.value:>12.2f} {result.unit}"
+        if baseline and name in baseline:
+            change = result.value / baseline[name].value - 1
+            line += f"  ({change:+.1%} vs {baseline[name].value:.2f})"
+        print(line)
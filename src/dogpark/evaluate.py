@@ -0,0 +1,241 @@
+"""
+Comparing AIs by playing them against each other until the result is clear.
+
+A matchup plays pairs of heads-up games, each pair on the same deal with the AIs swapping seats (as in simulate's
+duplicate mode). After every pair it runs a sequential probability ratio test (SPRT) of whether the first AI is elo0 or
+elo1 Elo stronger than the second, and stops as soon as one of them is accepted at the given error rates. Between AIs
+of clearly different strength that takes a few dozen pairs, rather than a fixed few thousand games.
+
+The test is the one chess engine testing uses (as in fishtest): the log-likelihood ratio is approximated from the mean
+and variance of the score of each pair, with the five possible pair scores counted separately so that the seat swap
+cancelling out the luck of the deal is taken into account.
+
+A league plays a matchup between every two AIs, and rates them all on one Elo scale, updated after every game.
+"""
+from __future__ import annotations
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from typing import Iterator, NamedTuple, Optional
+
+from dogpark.game.game import AIS, Dogpark
+
+
+class GameResult(NamedTuple):
+    """A heads-up game from the point of view of the first AI of a matchup"""
+
+    points: float  # 1 for a win, 0.5 for a draw, 0 for a loss
+    margin: int  # final score minus the opponent's
+
+
+def play_heads_up(seed: int, ai: str, opponent: str, ai_first: bool = True) -> GameResult:
+    """Play a single silent 2 player game"""
+    ais = [ai, opponent] if ai_first else [opponent, ai]
+    d = Dogpark(autorun=True, num_players=2, ais=ais, prints=False, seed=seed)
+    me, other = d.state.players if ai_first else reversed(d.state.players)
+    won, lost = me.colour in d.winners, other.colour in d.winners
+    return GameResult(0.5 if won == lost else float(won), d.scores[me] - d.scores[other])
+
+
+def play_pair(seed: int, ai: str, opponent: str) -> tuple[GameResult, GameResult]:
+    """Play the deal of the seed twice, with the AIs in either seat"""
+    return play_heads_up(seed, ai, opponent), play_heads_up(seed, ai, opponent, ai_first=False)
+
+
+def elo_to_score(elo: float) -> float:
+    """The expected score against an opponent elo Elo weaker"""
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def score_to_elo(score: float) -> float:
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+
+class Ratings:
+    """Elo ratings of AIs, updated after every game with a fixed K factor"""
+
+    def __init__(self, k: float = 8, initial: float = 1500):
+        self.k = k
+        self.initial = initial
+        self.ratings: dict[str, float] = {}
+        self.games: dict[str, int] = {}
+
+    def update(self, ai: str, opponent: str, points: float):
+        rating, other = self[ai], self[opponent]
+        change = self.k * (points - elo_to_score(rating - other))
+        self.ratings[ai] = rating + change
+        self.ratings[opponent] = other - change
+        self.games[ai] = self.games.get(ai, 0) + 1
+        self.games[opponent] = self.games.get(opponent, 0) + 1
+
+    def __getitem__(self, ai: str) -> float:
+        return self.ratings.get(ai, self.initial)
+
+    def table(self) -> list[tuple[str, float, int]]:
+        """(AI, rating, games played) from the highest rated down"""
+        return sorted(((ai, rating, self.games[ai]) for ai, rating in self.ratings.items()), key=lambda r: -r[1])
+
+
+# log-likelihood ratio bounds can't be reached before this many pairs, so the variance estimate is sensible
+MIN_PAIRS = 4
+# added to pair scores that haven't happened yet, so a matchup with no variance (like identical AIs) still has a test
+REGULARIZATION = 1e-3
+
+
+class Matchup:
+    """
+    The running results of ai against opponent. The SPRT tests H0: ai is elo0 Elo stronger, against H1: ai is elo1
+    Elo stronger, with false positive rate alpha and false negative rate beta.
+    """
+
+    def __init__(
+        self, ai: str, opponent: str, elo0: float = 0, elo1: float = 20, alpha: float = 0.05, beta: float = 0.05
+    ):
+        self.ai = ai
+        self.opponent = opponent
+        self.elo0 = elo0
+        self.elo1 = elo1
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+        self.pair_scores = [0] * 5  # pairs scoring 0, 0.5, 1, 1.5 and 2 points
+        self.wins = self.draws = self.losses = 0
+        self.margin = 0  # total over every game
+
+    def add_pair(self, games: tuple[GameResult, GameResult]):
+        points = 0.0
+        for game in games:
+            points += game.points
+            self.margin += game.margin
+            if game.points == 1:
+                self.wins += 1
+            elif game.points == 0:
+                self.losses += 1
+            else:
+                self.draws += 1
+        self.pair_scores[int(points * 2)] += 1
+
+    @property
+    def pairs(self) -> int:
+        return sum(self.pair_scores)
+
+    @property
+    def games(self) -> int:
+        return 2 * self.pairs
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.games if self.games else 0
+
+    @property
+    def mean_margin(self) -> float:
+        return self.margin / self.games if self.games else 0
+
+    def _moments(self) -> tuple[float, float]:
+        """The mean score of a game, and the variance of that mean"""
+        counts = [count or REGULARIZATION for count in self.pair_scores]
+        total = sum(counts)
+        mean = sum(count * i / 4 for i, count in enumerate(counts)) / total
+        variance = sum(count * (i / 4 - mean) ** 2 for i, count in enumerate(counts)) / total
+        return mean, variance / total
+
+    @property
+    def score(self) -> float:
+        return self._moments()[0] if self.pairs else 0.5
+
+    def elo(self) -> tuple[float, float]:
+        """The Elo difference the results show, and the half width of its 95% confidence interval"""
+        if not self.pairs:
+            return 0.0, math.inf
+        mean, variance = self._moments()
+        spread = 1.96 * math.sqrt(variance)
+        return score_to_elo(mean), (score_to_elo(mean + spread) - score_to_elo(mean - spread)) / 2
+
+    def llr(self) -> float:
+        """The log-likelihood ratio of H1 to H0"""
+        if self.pairs < MIN_PAIRS:
+            return 0.0
+        mean, variance = self._moments()
+        score0, score1 = elo_to_score(self.elo0), elo_to_score(self.elo1)
+        return (score1 - score0) * (2 * mean - score0 - score1) / (2 * variance)
+
+    @property
+    def result(self) -> Optional[str]:
+        """H1 or H0 once one is accepted, otherwise None"""
+        llr = self.llr()
+        if llr >= self.upper:
+            return "H1"
+        if llr <= self.lower:
+            return "H0"
+        return None
+
+    def __repr__(self):
+        elo, error = self.elo()
+        result = {"H1": "stronger", "H0": "not stronger", None: "undecided"}[self.result]
+        return (
+            f"{self.ai} vs {self.opponent}: {self.games} games, +{self.wins} ={self.draws} -{self.losses},"
+            f" margin {self.mean_margin:+.2f}, Elo {elo:+.1f} +- {error:.1f}, LLR {self.llr():.2f}"
+            f" [{self.lower:.2f}, {self.upper:.2f}]: {result}"
+        )
+
+
+def _pairs(ai: str, opponent: str, seeds: range, jobs: Optional[int]) -> Iterator[tuple[GameResult, GameResult]]:
+    """The results of every pair in seed order, played in batches across the workers"""
+    if jobs == 1:
+        for seed in seeds:
+            yield play_pair(seed, ai, opponent)
+        return
+
+    workers = jobs or os.cpu_count() or 1
+    batch = workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for start in range(0, len(seeds), batch):
+            chunk = seeds[start:start + batch]
+            yield from executor.map(play_pair, chunk, [ai] * len(chunk), [opponent] * len(chunk))
+
+
+def play_matchup(
+    ai: str,
+    opponent: str,
+    max_games: int = 2000,
+    jobs: Optional[int] = 1,
+    seed: int = 0,
+    ratings: Optional[Ratings] = None,
+    **sprt,
+) -> Matchup:
+    """
+    Play pairs of games until the SPRT accepts a hypothesis or max_games are played. The pairs are seeded with seed,
+    seed + 1 and so on, and results are taken in that order, so the outcome doesn't depend on the number of jobs.
+    sprt are the keyword arguments of Matchup. If ratings are given, they are updated after every game.
+    """
+    matchup = Matchup(ai, opponent, **sprt)
+    for games in _pairs(ai, opponent, range(seed, seed + max_games // 2), jobs):
+        matchup.add_pair(games)
+        if ratings is not None:
+            for game in games:
+                ratings.update(ai, opponent, game.points)
+        if matchup.result is not None:
+            break
+    return matchup
+
+
+def league(
+    ais: Optional[list[str]] = None, ratings: Optional[Ratings] = None, **kwargs
+) -> tuple[list[Matchup], Ratings]:
+    """A matchup between every two of the AIs, every registered AI by default. kwargs are those of play_matchup."""
+    ratings = Ratings() if ratings is None else ratings
+    matchups = [
+        play_matchup(ai, opponent, ratings=ratings, **kwargs) for ai, opponent in combinations(ais or list(AIS), 2)
+    ]
+    return matchups, ratings
+
+
+def print_league(matchups: list[Matchup], ratings: Ratings):
+    print("Matchups:")
+    for matchup in matchups:
+        print(matchup)
+    print("Ratings:")
+    for ai, rating, games in ratings.table():
+        print(f"{ai}: {rating:.0f} ({games} games)")
@@ -0,0 +1,324 @@
+"""
+Playing games from asyncio: many games at once in one process, with seats played by asynchronous players.
+
+An AsyncDogpark with asynchronous seats is played as a dogpark.game.machine.GameMachine, which stops at every decision
+without holding anything. A decision for a seat played from asyncio goes to an AsyncPlayer on the event loop, and the
+game waits for the answer there, holding no thread, so the number of games in progress is bounded only by memory. The
+engine and the AIs only run in a worker of an executor while they compute: answering a decision and playing on to the
+next one for an asynchronous seat takes a single call. An AsyncPlayer decides without changing the game, returning its
+decision as data (a selection is a dogpark.game.moves.Select), which is one of the decision's options. The AIs at such
+a table decide a decision at a time with dogpark.game.machine.decide, so their random choices can fall differently
+from the game Dogpark deals from the same seed. A game of AIs alone has nothing to wait on, and is played by Dogpark
+in a worker.
+
+A StreamPlayer is an AsyncPlayer playing over a stream, such as a local socket or a pipe, one JSON object per line.
+Each decision is sent as {"decision": name, "colour": ..., "reputation": ..., "resources": ..., "kennel": ..., ...}
+with what the decision is between, dogs by name, and answered with a JSON value: an objective, [dog, amount] for a
+bid, a dog, the index of a selection in "options", a destination, true or false to pay, the index of a leaving bonus,
+a bonus, [field dog, top dog] or null for a look, and [kennel dog, field dog] or null for a swap. An answer that
+isn't one of the options gets {"error": ...} and the decision is asked again. serve runs a server where every
+connection plays a game against AIs, and is sent {"scores": ..., "winners": ...} at the end. A connection that doesn't
+answer a decision in time, or that comes in while the server has as many games as it takes, is sent {"error": ...}
+and closed.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Union
+
+from dogpark.game import ANY
+from dogpark.game.dog import DOG_IDS, DOGS
+from dogpark.game.game import Dogpark, get_ai, seed_streams
+from dogpark.game.gamestate import GameState
+from dogpark.game.machine import Decision, GameMachine, decide
+from dogpark.game.moves import Leave, Select, Walk, legal_moves
+from dogpark.game.park import Park
+from dogpark.game.player import Player
+from dogpark.game.recording import BID, BONUS, DOG, LEAVE, LOOK, OBJECTIVE, SELECT, WALK
+
+
+class AsyncPlayer(ABC):
+    """
+    The decisions of a Player, made asynchronously and without changing the game. player is the player in the seat
+    this plays, set before each decision, whose state (and game) can be read while the decision is being made.
+    """
+
+    player: Player
+
+    @abstractmethod
+    async def choose_objective(self, hard: int, easy: int) -> Optional[int]:
+        ...
+
+    @abstractmethod
+    async def bid(self, available_dogs: list[int], bids: dict[int, list]) -> tuple[int, int]:
+        ...
+
+    @abstractmethod
+    async def choose_dog(self, available_dogs: list[int]) -> int:
+        ...
+
+    @abstractmethod
+    async def do_selection(self) -> Select:
+        ...
+
+    @abstractmethod
+    async def choose_destination(self, park: Park) -> int:
+        ...
+
+    @abstractmethod
+    async def pay_walking_bonus(self, park: Park, destination: int) -> bool:
+        ...
+
+    @abstractmethod
+    async def choose_leaving_bonus_index(self, park: Park) -> int:
+        ...
+
+    @abstractmethod
+    async def choose_bonus(self, bonuses: list[str]) -> str:
+        ...
+
+    @abstractmethod
+    async def look(self, top_cards: list[int]) -> Optional[tuple[int, int]]:
+        ...
+
+    @abstractmethod
+    async def swap(self, walked: bool) -> Optional[tuple[int, int]]:
+        """The kennel dog and field dog to swap, or None not to"""
+
+
+def _names(dogs) -> list[str]:
+    return [DOGS[dog].name for dog in dogs]
+
+
+def _int_in(options) -> Callable[[Any], bool]:
+    # not a bool or a float, which compare equal to ints
+    return lambda answer: type(answer) is int and answer in options
+
+
+class StreamPlayer(AsyncPlayer):
+    """An AsyncPlayer asking over a stream, one JSON object per line (see the module docstring)"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    async def send(self, message: dict):
+        self.writer.write(json.dumps(message).encode() + b"\n")
+        await self.writer.drain()
+
+    async def ask(self, decision: str, valid: Callable[[Any], bool], **options) -> Any:
+        """Ask for a decision until the answer is valid"""
+        player = self.player
+        await self.send(
+            {
+                "decision": decision,
+                "colour": player.colour,
+                "reputation": player.reputation,
+                "resources": player.resources,
+                "kennel": _names(sorted(player.kennel)),
+                **options,
+            }
+        )
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                raise ConnectionError(f"{player.colour} disconnected")
+            try:
+                answer = json.loads(line)
+                if valid(answer):
+                    return answer
+            except (ValueError, TypeError, KeyError, IndexError):
+                pass
+            await self.send({"error": f"invalid answer to {decision}: {line.decode().strip()}"})
+
+    async def choose_objective(self, hard: int, easy: int) -> Optional[int]:
+        return await self.ask("choose_objective", _int_in((hard, easy)), hard=hard, easy=easy)
+
+    async def bid(self, available_dogs: list[int], bids: dict[int, list]) -> tuple[int, int]:
+        names = _names(available_dogs)
+        amounts = range(1, max(1, self.player.reputation) + 1)
+        dog, amount = await self.ask(
+            "bid", lambda answer: answer[0] in names and _int_in(amounts)(answer[1]), dogs=names, amounts=list(amounts)
+        )
+        return DOG_IDS[dog], amount
+
+    async def choose_dog(self, available_dogs: list[int]) -> int:
+        names = _names(available_dogs)
+        return DOG_IDS[await self.ask("choose_dog", lambda answer: answer in names, dogs=names)]
+
+    async def do_selection(self) -> Select:
+        moves = legal_moves(self.player.game)
+        options = [{"dogs": _names(move.dogs), "cost": dict(zip(ANY, move.cost))} for move in moves]
+        return moves[await self.ask("do_selection", _int_in(range(len(moves))), options=options)]
+
+    async def choose_destination(self, park: Park) -> int:
+        position = park.player_positions[self.player.colour]
+        options = park.possible_moves(position)
+        return await self.ask("choose_destination", _int_in(options), position=position, options=list(options))
+
+    async def pay_walking_bonus(self, park: Park, destination: int) -> bool:
+        return await self.ask(
+            "pay_walking_bonus",
+            lambda answer: isinstance(answer, bool),
+            destination=destination,
+            bonuses=park.board[destination],
+        )
+
+    async def choose_leaving_bonus_index(self, park: Park) -> int:
+        bonuses = park.leaving_bonuses
+        return await self.ask("choose_leaving_bonus_index", _int_in(range(len(bonuses))), bonuses=bonuses)
+
+    async def choose_bonus(self, bonuses: list[str]) -> str:
+        return await self.ask("choose_bonus", lambda answer: answer in bonuses, bonuses=bonuses)
+
+    async def look(self, top_cards: list[int]) -> Optional[tuple[int, int]]:
+        top, field = _names(top_cards), _names(self.player.game.dogs)
+        answer = await self.ask(
+            "look", lambda answer: answer is None or (answer[0] in field and answer[1] in top), top=top, field=field
+        )
+        return None if answer is None else (DOG_IDS[answer[0]], DOG_IDS[answer[1]])
+
+    async def swap(self, walked: bool) -> Optional[tuple[int, int]]:
+        kennel, field = _names(sorted(self.player.kennel)), _names(self.player.game.dogs)
+        answer = await self.ask(
+            "swap",
+            lambda answer: answer is None or (answer[0] in kennel and answer[1] in field),
+            walked=walked,
+            field=field,
+        )
+        return None if answer is None else (DOG_IDS[answer[0]], DOG_IDS[answer[1]])
+
+
+class AsyncDogpark:
+    """
+    A game to be played from asyncio with run. Each seat is the name of an AI or an AsyncPlayer, and the game is dealt
+    from seed as Dogpark deals it. If timeout is given, an AsyncPlayer that takes longer than that many seconds over a
+    decision ends the game with asyncio.TimeoutError.
+    """
+
+    def __init__(
+        self, seats: list[Union[str, AsyncPlayer]], seed: Optional[int] = None, timeout: Optional[float] = None
+    ):
+        self.seats = seats
+        self.seed = seed
+        self.timeout = timeout
+        self.scores: dict[str, int] = {}  # colour: final score, filled in at the end of the game
+        self.winners: list[str] = []
+
+    async def run(self, executor: Optional[Executor] = None) -> dict[str, int]:
+        """
+        Play the game, computing in workers of the executor (the loop's default one if None), and return the score of
+        each colour
+        """
+        loop = asyncio.get_running_loop()
+        if not any(isinstance(seat, AsyncPlayer) for seat in self.seats):
+            game = Dogpark(autorun=False, num_players=len(self.seats), ais=self.seats, prints=False, seed=self.seed)
+            await loop.run_in_executor(executor, game.play)
+            self.scores = {player.colour: score for player, score in game.scores.items()}
+            self.winners = game.winners
+            return self.scores
+
+        machine = GameMachine.deal(len(self.seats), self.seed)
+        _, seat_rngs = seed_streams(self.seed)
+        colours = machine.recording.colours
+        ais = {
+            seat: get_ai(ai)(machine.state, colours[seat], rng=seat_rngs[seat])
+            for seat, ai in enumerate(self.seats)
+            if not isinstance(ai, AsyncPlayer)
+        }
+        decision = await loop.run_in_executor(executor, _play_ais, machine, ais)
+        while decision is not None:
+            seat = self.seats[decision.seat]
+            seat.player = machine.player
+            option = await asyncio.wait_for(_ask(seat, decision, machine.state), self.timeout)
+            decision = await loop.run_in_executor(executor, _play_ais, machine, ais, (option,))
+        self.scores = machine.scores
+        self.winners = machine.winners
+        return self.scores
+
+
+def _play_ais(machine: GameMachine, ais: dict[int, Player], answer: tuple = ()) -> Optional[Decision]:
+    """Make the answer (if any), and the AIs' decisions after it, returning the next decision of an AsyncPlayer"""
+    if answer:
+        machine.answer(*answer)
+    while (decision := machine.decision) is not None and decision.seat in ais:
+        machine.answer(decide(machine, ais[decision.seat]))
+    return decision
+
+
+async def _ask(seat: AsyncPlayer, decision: Decision, state: GameState) -> Any:
+    """The AsyncPlayer's answer to the decision, one of its options, as machine.decide gets an AI's"""
+    kind, options = decision.kind, decision.options
+    if kind == OBJECTIVE:
+        return await seat.choose_objective(*options)
+    if kind == BID:
+        return tuple(await seat.bid(list(dict.fromkeys(dog for dog, _ in options)), state.bids))
+    if kind == DOG:
+        return await seat.choose_dog(list(options))
+    if kind == SELECT:
+        return await seat.do_selection()
+    if kind == WALK:
+        park = state.park
+        destination = await seat.choose_destination(park)
+        if destination == 15:
+            return Leave(await seat.choose_leaving_bonus_index(park) if park.leaving_bonuses else -1)
+        if Walk(destination, pay=True) in options:
+            return Walk(destination, pay=bool(await seat.pay_walking_bonus(park, destination)))
+        return Walk(destination)
+    if kind == LEAVE:
+        return Leave(await seat.choose_leaving_bonus_index(state.park))
+    if kind == BONUS:
+        return await seat.choose_bonus(list(options))
+    if kind == LOOK:
+        look = await seat.look(list(dict.fromkeys(top for _, top in options[1:])))
+        return None if look is None else tuple(look)
+    swap = await seat.swap(decision.walked)
+    return None if swap is None else tuple(swap)
+
+
+async def play_games(games: list[AsyncDogpark], workers: int = 64) -> list[dict]:
+    """Play the games at once, with up to workers threads computing for them, and return their scores"""
+    with ThreadPoolExecutor(workers) as executor:
+        return await asyncio.gather(*(game.run(executor) for game in games))
+
+
+async def serve(
+    host: str = "127.0.0.1",
+    port: int = 7654,
+    ais: tuple[str, ...] = ("HeuristicAI",),
+    executor: Optional[Executor] = None,
+    max_games: int = 10000,
+    timeout: Optional[float] = 300.0,
+) -> asyncio.AbstractServer:
+    """
+    Start a server where every connection plays a game against the AIs, with the connection in the first seat. The
+    AIs think in the executor, the loop's default one if None. A connection that comes in with max_games in progress is
+    turned away, and one that takes longer than timeout seconds over a decision loses its game.
+    """
+    playing = 0
+
+    async def play(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        nonlocal playing
+        seat = StreamPlayer(reader, writer)
+        try:
+            if playing >= max_games:
+                await seat.send({"error": "the server is full, try again later"})
+                return
+            playing += 1
+            try:
+                game = AsyncDogpark([seat, *ais], timeout=timeout)
+                scores = await game.run(executor)
+                await seat.send({"scores": scores, "winners": game.winners})
+            except asyncio.TimeoutError:
+                await seat.send({"error": f"no answer in {timeout:g}s, so the game is over"})
+            finally:
+                playing -= 1
+        except ConnectionError:
+            pass  # the player left
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(play, host, port)
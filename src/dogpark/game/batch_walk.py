@@ -0,0 +1,243 @@
+"""
+The walking phase for thousands of games at once, as numpy array operations. Requires numpy.
+
+Each game of a batch is a row of a few arrays (a struct of arrays), and every step moves one seat in every game where
+that seat is still walking. Parks are turned into move and bonus tables up front, so choosing a destination and
+collecting its bonuses is a lookup rather than a walk over Python objects. The players follow the walking policies of
+NaiveAI, or StingyAI for the seats marked stingy, so the results match Dogpark.play_walking with those AIs, with the
+exception that random choices are drawn from a numpy generator.
+
+Only reputation and resources are simulated: LOOK, SWAP and WALKED SWAP bonuses change nothing for these AIs.
+"""
+from __future__ import annotations
+
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from dogpark.game import ANY
+from dogpark.game.dog import DOGS, Ability
+from dogpark.game.gamestate import GameState
+
+# the bonuses that are simulated, in the order of the last axis of bonus tables
+KINDS = ANY + ["REP"]
+REP = KINDS.index("REP")
+# padding for move tables and converters
+NONE = -1
+
+# lookup tables for masks over the possible destinations, so choosing between them is done on whole masks at once
+MASK_BITS = 12
+POPCOUNT = np.array([bin(mask).count("1") for mask in range(1 << MASK_BITS)], dtype=np.intp)
+LOWEST_BIT = np.array([(mask & -mask).bit_length() - 1 if mask else 0 for mask in range(1 << MASK_BITS)], dtype=np.intp)
+NTH_BIT = np.zeros((1 << MASK_BITS, MASK_BITS), dtype=np.intp)
+for _mask in range(1 << MASK_BITS):
+    _bits = [k for k in range(MASK_BITS) if _mask >> k & 1]
+    NTH_BIT[_mask, : len(_bits)] = _bits
+
+
+class WalkingBatch(NamedTuple):
+    """The start of the walking phase for G games of P players, in turn order"""
+
+    park: np.ndarray  # (G,) index of each game's park in the tables below
+    moves: np.ndarray  # (parks, 17, max moves) destinations from each position + 1, padded with NONE
+    board: np.ndarray  # (parks, 16, kinds) bonuses at each location, 15 (leaving) has none
+    resource_bits: np.ndarray  # (parks, 17, max moves) the resources at each destination in moves, as bits
+    leaving: np.ndarray  # (G, P) reputation gained by the 1st, 2nd... player to leave, -1 once no bonuses are left
+    reputation: np.ndarray  # (G, P)
+    resources: np.ndarray  # (G, P, len(ANY))
+    butterfly: np.ndarray  # (G, P) a social butterfly on the lead, so the player never pays for occupied locations
+    converters: np.ndarray  # (G, P, C, 2) prerequisite and gain kinds of go fetch and obedient dogs, or NONE
+    stingy: np.ndarray  # (G, P) play like StingyAI rather than NaiveAI
+
+
+class WalkingResult(NamedTuple):
+    reputation: np.ndarray  # (G, P) change in reputation over the walk
+    resources: np.ndarray  # (G, P, len(ANY)) change in resources over the walk
+
+
+def park_tables(boards: Sequence[tuple[tuple[str, ...], ...]], moves: Sequence[tuple[tuple[int, ...], ...]]):
+    """Move, bonus and resource bit tables for the given park boards and move tables (see ParkTemplate)"""
+    width = max(len(destinations) for park_moves in moves for destinations in park_moves)
+    assert width <= MASK_BITS, f"destinations are chosen with {MASK_BITS} bit masks"
+    move_table = np.full((len(moves), 17, width), NONE, dtype=np.int8)
+    for p, park_moves in enumerate(moves):
+        for position, destinations in enumerate(park_moves):
+            move_table[p, position, : len(destinations)] = destinations
+
+    board_table = np.zeros((len(boards), 16, len(KINDS)), dtype=np.int8)
+    for p, board in enumerate(boards):
+        for location, bonuses in enumerate(board):
+            for bonus in bonuses:
+                if bonus in KINDS:
+                    board_table[p, location, KINDS.index(bonus)] += 1
+    # bit r is set for each destination that has resource r, to compare with the resources a player is low on
+    resource_bits = np.zeros(move_table.shape, dtype=np.uint8)
+    for r in range(len(ANY)):
+        has = board_table[np.arange(len(moves))[:, None, None], np.where(move_table == NONE, 15, move_table), r] > 0
+        resource_bits |= has.astype(np.uint8) << r
+    return move_table, board_table, resource_bits
+
+
+def batch_from_states(states: Sequence[GameState]) -> WalkingBatch:
+    """
+    Gather games at the start of their walking phase into a batch. Every game must have the same number of players,
+    and players must be NaiveAIs or StingyAIs to match what walk_batch simulates for them.
+    """
+    from dogpark.ais.naive_ai import StingyAI
+
+    num_players = len(states[0].players)
+    parks: dict[int, int] = {}  # id of a park's shared board to its index in the tables
+    boards, park_moves = [], []
+    park = np.empty(len(states), dtype=np.intp)
+    for g, state in enumerate(states):
+        index = parks.setdefault(id(state.park.board), len(boards))
+        if index == len(boards):
+            boards.append(state.park.board)
+            park_moves.append(state.park._moves)
+        park[g] = index
+    moves, board, resource_bits = park_tables(boards, park_moves)
+
+    leaving = np.full((len(states), num_players), -1, dtype=np.int16)
+    converters = np.full((len(states), num_players, 4, 2), NONE, dtype=np.int8)
+    for g, state in enumerate(states):
+        for i, bonus in enumerate(state.park.leaving_bonuses[:num_players]):
+            leaving[g, i] = bonus.count("REP")
+        for p, player in enumerate(state.players):
+            kinds = [
+                (KINDS.index(prereq), KINDS.index(gain))
+                for prereq, gain in player.get_lead_converters()
+                if prereq in KINDS and gain in KINDS
+            ]
+            if kinds:
+                converters[g, p, : len(kinds)] = kinds
+
+    return WalkingBatch(
+        park=park,
+        moves=moves,
+        board=board,
+        resource_bits=resource_bits,
+        leaving=leaving,
+        reputation=np.array([[p.reputation for p in s.players] for s in states], dtype=np.int16),
+        resources=np.array([[[p.resources[r] for r in ANY] for p in s.players] for s in states], dtype=np.int16),
+        butterfly=np.array(
+            [[any(DOGS[d].ability is Ability.SOCIAL_BUTTERFLY for d in p.lead) for p in s.players] for s in states]
+        ),
+        converters=converters,
+        stingy=np.array([[isinstance(p, StingyAI) for p in s.players] for s in states]),
+    )
+
+
+def _pick(bits: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """The index of a uniformly random set bit of each mask, or 0 for empty masks"""
+    return NTH_BIT[bits, (rng.random(len(bits)) * POPCOUNT[bits]).astype(np.intp)]
+
+
+def _choose_destinations(
+    batch: WalkingBatch, positions: np.ndarray, resources: np.ndarray, games: np.ndarray, seat: int, rng
+) -> np.ndarray:
+    """NaiveAI.choose_destination for the seat in each of the games"""
+    park = batch.park[games]
+    from_position = positions[games, seat] + 1
+    possible = batch.moves[park, from_position]  # (n, width)
+    resource_bits = batch.resource_bits[park, from_position]
+    others = positions[games]
+
+    held = resources[games, seat]
+    fewest = held.min(axis=1)
+    low = np.zeros(len(games), dtype=np.uint8)  # the resources the player has the fewest of, as bits
+    for r in range(len(ANY)):
+        low |= (held[:, r] == fewest).astype(np.uint8) << r
+
+    # masks over the possible destinations, with bit k for possible[:, k]
+    valid = np.zeros(len(games), dtype=np.uint16)
+    free = np.zeros(len(games), dtype=np.uint16)  # where no one is standing, anyone can leave
+    wanted = np.zeros(len(games), dtype=np.uint16)  # free locations with a resource the player has the fewest of
+    leaving = np.zeros(len(games), dtype=np.uint16)
+    for k in range(possible.shape[1]):
+        destination = possible[:, k]
+        occupied = destination == others[:, 0]
+        for p in range(1, others.shape[1]):
+            occupied |= destination == others[:, p]
+        is_valid = destination != NONE
+        is_leaving = destination == 15
+        is_free = is_valid & (is_leaving | ~occupied)
+        valid |= is_valid.astype(np.uint16) << k
+        free |= is_free.astype(np.uint16) << k
+        leaving |= is_leaving.astype(np.uint16) << k
+        wanted |= (is_free & ~is_leaving & ((resource_bits[:, k] & low) != 0)).astype(np.uint16) << k
+
+    choice = np.where(wanted != 0, LOWEST_BIT[wanted], _pick(free & ~leaving, rng))
+    num_free = POPCOUNT[free]
+    choice = np.where(num_free == 1, LOWEST_BIT[free], choice)
+    choice = np.where(num_free == 0, _pick(valid, rng), choice)
+    choice = np.where(POPCOUNT[valid] == 1, 0, choice)
+    return possible[np.arange(len(games)), choice].astype(np.intp)
+
+
+def _convert(converters: np.ndarray, gained: np.ndarray) -> np.ndarray:
+    """convert_bonuses for arrays: the extra bonuses gained by (n, C, 2) converters from (n, kinds) bonuses"""
+    rows = np.arange(len(converters))[:, None]
+    unused = converters[:, :, 0] != NONE
+    prereqs = np.maximum(converters[:, :, 0], 0)
+    gains = np.maximum(converters[:, :, 1], 0)
+    total = np.zeros_like(gained)
+    new = gained
+    # each converter fires at most once, so there are at most C passes
+    for _ in range(converters.shape[1]):
+        fired = unused & (new[rows, prereqs] > 0)
+        if not fired.any():
+            break
+        unused &= ~fired
+        new = np.zeros_like(gained)
+        np.add.at(new, (np.broadcast_to(rows, gains.shape)[fired], gains[fired]), 1)
+        total += new
+    return total
+
+
+def walk_batch(batch: WalkingBatch, rng: Optional[np.random.Generator] = None) -> WalkingResult:
+    """Play the walking phase of every game in the batch, and return how much each player gained"""
+    rng = np.random.default_rng() if rng is None else rng
+    num_games, num_players = batch.reputation.shape
+    reputation = batch.reputation.astype(np.int32)
+    resources = batch.resources.astype(np.int32)
+    positions = np.full((num_games, num_players), -1, dtype=np.int8)
+    walking = np.ones((num_games, num_players), dtype=bool)
+    left = np.zeros(num_games, dtype=np.intp)  # players who have left each park
+
+    def leave(games: np.ndarray, seat: int):
+        positions[games, seat] = 15
+        walking[games, seat] = False
+        reputation[games, seat] += batch.leaving[games, left[games]]
+        left[games] += 1
+
+    # players move in turn order until one is left, who then has to leave
+    while True:
+        moved = False
+        for seat in range(num_players):
+            games = np.flatnonzero(walking[:, seat] & (left < num_players - 1))
+            if len(games) == 0:
+                continue
+            moved = True
+            destinations = _choose_destinations(batch, positions, resources, games, seat, rng)
+
+            leaving = destinations == 15
+            leave(games[leaving], seat)
+            games, destinations = games[~leaving], destinations[~leaving]
+
+            occupied = (positions[games] == destinations[:, None]).any(axis=1)
+            asked = occupied & ~batch.butterfly[games, seat] & (reputation[games, seat] > 0)
+            paid = asked & ~batch.stingy[games, seat]
+            reputation[games, seat] -= paid
+            positions[games, seat] = destinations
+
+            bonus = batch.board[batch.park[games], destinations].astype(np.int32) * ~(asked & ~paid)[:, None]
+            bonus += _convert(batch.converters[games, seat], bonus)
+            resources[games, seat] += bonus[:, : len(ANY)]
+            reputation[games, seat] += bonus[:, REP]
+        if not moved:
+            break
+
+    for seat in range(num_players):
+        leave(np.flatnonzero(walking[:, seat]), seat)
+
+    return WalkingResult(reputation - batch.reputation, resources - batch.resources)
@@ -0,0 +1,197 @@
+"""
+Equilibrium bidding: mixed strategies for the sealed bids of a bidding round.
+
+A bidding round is a small simultaneous game. Every player bids 1 to MAX_BID REP (no more than they have) on one of the
+dogs on offer, the highest bid on each dog wins it (the first player in turn order on a tie), and the players who won
+nothing each pick the dog they like best of those left in turn order, for 1 REP. A player's payoff is what the dog they
+end up with is worth to them less what they paid. The equilibrium is found by regret matching (the + variant, with the
+later iterations weighing more in the average strategy): each iteration every player samples the others' bids from
+their current strategies, and shifts their own strategy towards the bids that would have done better.
+
+A dog is worth what it adds to the player's final score now (breed experts, pack dogs, collectors and objectives about
+breeds) and what a walk with it is worth (as in dogpark.game.selection). Other players' objectives are hidden, so they
+are left out of what a dog is worth to them. Worths are counted from each player's favourite dog and rounded to
+QUANTUM, the dogs are put in a canonical order, and equilibria are memoized on the worths and REP of the players in
+turn order, which is everything they depend on, so the same situations coming up again in a game or a simulation are
+looked up. The iterations are seeded by the situation, so an equilibrium is the same whenever it's solved.
+"""
+from __future__ import annotations
+
+import random
+from functools import lru_cache
+from itertools import product
+from operator import mul
+from typing import Optional
+
+from dogpark.game.dog import BREED_INDEX, DOGS
+from dogpark.game.gamestate import GameState
+from dogpark.game.player import Player, score_breakdown
+from dogpark.game.selection import RESOURCE_VALUE, _dog_value
+
+MAX_BID = 3
+ITERATIONS = 100  # more hardly makes the equilibria harder to exploit, as the sampling is noisier than that
+QUANTUM = 1.0  # REP that the worth of a dog is rounded to
+PRUNE = 0.01  # bids played less often than this in the equilibrium are dropped
+
+# a bid is (index of the dog, amount), and a strategy a probability for each bid a player can make
+Strategy = tuple[tuple[tuple[int, int], float], ...]
+
+
+def dog_value(player: Player, dog: int, objective: bool = True) -> float:
+    """
+    The REP the dog is worth to the player, with or without what it does for their objective. The dog is added to a
+    copy of the player, so the player is never touched (the copy's rivals for the breed experts are the real players,
+    which includes the player without the dog, who can't beat the copy).
+    """
+    before = score_breakdown(player)
+    with_dog = player.clone(player.game)
+    with_dog.kennel.add(dog)
+    with_dog.breeds[BREED_INDEX[DOGS[dog].breed]] += 1
+    after = score_breakdown(with_dog)
+    gain = after.total - before.total
+    if not objective:
+        gain -= after.objective - before.objective
+    return gain + _dog_value(dog, 0, None) - RESOURCE_VALUE * sum(DOGS[dog].cost)
+
+
+def bids(reputation: int, num_dogs: int) -> list[tuple[int, int]]:
+    """The bids a player with the REP can make, dog by dog"""
+    amounts = range(1, max(1, min(MAX_BID, reputation)) + 1)
+    return [(dog, amount) for dog in range(num_dogs) for amount in amounts]
+
+
+def payoffs(values: tuple[tuple[float, ...], ...], profile: tuple[tuple[int, int], ...]) -> list[Optional[float]]:
+    """What each player gains when they make the bids of the profile, resolved like Dogpark.bidding"""
+    num_dogs = len(values[0])
+    winners, highest = [-1] * num_dogs, [0] * num_dogs
+    for player, (dog, amount) in enumerate(profile):
+        if amount > highest[dog]:
+            winners[dog], highest[dog] = player, amount
+    gains: list[Optional[float]] = [None] * len(profile)
+    for dog, player in enumerate(winners):
+        if player >= 0:
+            gains[player] = values[player][dog] - highest[dog]
+    left = [dog for dog in range(num_dogs) if winners[dog] < 0]
+    for player, gain in enumerate(gains):
+        if gain is None:
+            worth = values[player]
+            dog = max(left, key=worth.__getitem__)
+            left.remove(dog)
+            gains[player] = worth[dog] - 1
+    return gains
+
+
+def option_gains(
+    values: tuple[tuple[float, ...], ...],
+    player: int,
+    profile: list[tuple[int, int]],
+    wins: list[tuple[float, int, int]],
+) -> list[float]:
+    """
+    What the player gains with each of their bids, when the others make their bids of the profile, as payoffs has it.
+    A bid that loses doesn't change who wins what, so every losing bid gains the same, and only the bids that win are
+    told apart: wins are what each bid gains if it wins, with its dog and amount.
+    """
+    num_dogs = len(values[0])
+    winners, highest = [-1] * num_dogs, [0] * num_dogs
+    for other, (dog, amount) in enumerate(profile):
+        if other != player and amount > highest[dog]:
+            winners[dog], highest[dog] = other, amount
+    left = [dog for dog in range(num_dogs) if winners[dog] < 0]
+    for other in range(player):
+        if other not in winners:
+            worth = values[other]
+            left.remove(max(left, key=worth.__getitem__))
+    worth = values[player]
+    lost = max(map(worth.__getitem__, left)) - 1
+    # the bid to beat on each dog, which the player wins ties of against later players
+    beat = [amount + (other < player) for other, amount in zip(winners, highest)]
+    return [gain if amount >= beat[dog] else lost for gain, dog, amount in wins]
+
+
+@lru_cache(maxsize=1 << 14)
+def equilibrium(values: tuple[tuple[float, ...], ...], reputations: tuple[int, ...]) -> tuple[Strategy, ...]:
+    """
+    The equilibrium strategy of each player, given what each dog is worth to each player (players in turn order, dogs
+    in any order) and the REP of each player
+    """
+    num_players = len(values)
+    actions = [bids(reputation, len(values[0])) for reputation in reputations]
+    wins = [[(worth[dog] - amount, dog, amount) for dog, amount in options] for worth, options in zip(values, actions)]
+
+    rng = random.Random(hash((values, reputations)))
+    regrets = [[0.0] * len(options) for options in actions]
+    totals = [[0.0] * len(options) for options in actions]
+    for iteration in range(1, ITERATIONS + 1):
+        strategies = [_strategy(regret) for regret in regrets]
+        profile = [rng.choices(actions[player], strategies[player])[0] for player in range(num_players)]
+        for player, strategy in enumerate(strategies):
+            utilities = option_gains(values, player, profile, wins[player])
+            expected = sum(map(mul, strategy, utilities))
+            regret = regrets[player]
+            regrets[player] = [r + u - expected if r + u > expected else 0.0 for r, u in zip(regret, utilities)]
+            totals[player] = [t + iteration * p for t, p in zip(totals[player], strategy)]
+
+    strategies = []
+    for player in range(num_players):
+        total = sum(totals[player])
+        kept = [(bid, t / total) for bid, t in zip(actions[player], totals[player]) if t / total >= PRUNE]
+        norm = sum(p for _, p in kept)
+        strategies.append(tuple((bid, p / norm) for bid, p in kept))
+    return tuple(strategies)
+
+
+def _strategy(regret: list[float]) -> list[float]:
+    """Bids in proportion to their positive regret, or uniformly if there is none"""
+    total = sum(regret)
+    if total <= 0:
+        return [1 / len(regret)] * len(regret)
+    return [r / total for r in regret]
+
+
+def exploitability(
+    values: tuple[tuple[float, ...], ...], reputations: tuple[int, ...], strategies: tuple[Strategy, ...]
+) -> float:
+    """The most any player could gain by changing their strategy while the others keep theirs, in REP"""
+    num_dogs = len(values[0])
+    most = 0.0
+    for player, reputation in enumerate(reputations):
+        others = [strategy for p, strategy in enumerate(strategies) if p != player]
+        expected = {bid: 0.0 for bid in bids(reputation, num_dogs)}
+        for combination in product(*others):
+            probability = 1.0
+            for _, p in combination:
+                probability *= p
+            for bid in expected:
+                profile = [b for b, _ in combination]
+                profile.insert(player, bid)
+                expected[bid] += probability * payoffs(values, tuple(profile))[player]
+        value = sum(p * expected[bid] for bid, p in strategies[player])
+        most = max(most, max(expected.values()) - value)
+    return most
+
+
+def situation(state: GameState, player: Optional[Player] = None) -> tuple[tuple[tuple[float, ...], ...], list[int]]:
+    """
+    The worths of the dogs on offer for every player in turn order (only the player knows their own objective), in a
+    canonical order of the dogs, and the dogs in that order. Only the differences between the dogs matter to a player,
+    so each player's worths are counted from the dog worth most to them.
+    """
+    player = player or state.player
+    rows = []
+    for other in state.players:
+        worths = [dog_value(other, dog, objective=other is player) for dog in state.dogs]
+        best = max(worths)
+        rows.append([round((worth - best) / QUANTUM) * QUANTUM for worth in worths])
+    columns = {dog: tuple(row[i] for row in rows) for i, dog in enumerate(state.dogs)}
+    dogs = sorted(state.dogs, key=lambda dog: (columns[dog], dog), reverse=True)
+    return tuple(zip(*(columns[dog] for dog in dogs))), dogs
+
+
+def equilibrium_bid(state: GameState, player: Player, rng: random.Random) -> tuple[int, int]:
+    """A bid for the player drawn from their equilibrium strategy, as (dog, amount)"""
+    values, dogs = situation(state, player)
+    reputations = tuple(min(other.reputation, MAX_BID) for other in state.players)
+    strategy = equilibrium(values, reputations)[state.players.index(player)]
+    (dog, amount), = rng.choices([bid for bid, _ in strategy], [p for _, p in strategy])
+    return dogs[dog], amount
@@ -0,0 +1,52 @@
+"""
+Loading the card data files (dogs.yaml, parks.yaml) shipped with dogpark.game.
+
+Parsing YAML is most of the time it takes to import the game, so the parsed data is cached with marshal in the
+__pycache__ directory next to the files, the same way Python caches compiled modules. A cache file is named after a
+hash of the YAML it was made from, so editing a card file simply misses the cache and parses it again. yaml is only
+imported on a miss, and if the cache can't be written (a read-only install, say) the data is parsed every time.
+"""
+import marshal
+import os
+import sys
+import zlib
+
+CARD_DIR = os.path.dirname(__file__)
+
+
+def load_cards(name: str):
+    """The parsed contents of one of the card files in dogpark.game"""
+    return load_yaml(os.path.join(CARD_DIR, name), os.path.join(CARD_DIR, "__pycache__"))
+
+
+def load_yaml(path: str, cache_dir: str):
+    """Parse a YAML file of plain data, through a marshalled copy in cache_dir"""
+    with open(path, "rb") as f:
+        data = f.read()
+    # a checksum is plenty to notice an edited file, and much quicker to import than hashlib
+    digest = f"{zlib.crc32(data):08x}{len(data):x}"
+    # marshal's format can change between versions of Python, like .pyc files
+    prefix = f"{os.path.basename(path)}.{sys.implementation.cache_tag}."
+    cache = os.path.join(cache_dir, f"{prefix}{digest}.marshal")
+    try:
+        with open(cache, "rb") as f:
+            return marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    import yaml
+
+    cards = yaml.safe_load(data)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        for stale in os.listdir(cache_dir):
+            if stale.startswith(prefix) and stale.endswith(".marshal"):
+                os.remove(os.path.join(cache_dir, stale))
+        # write to a temporary file first, so another process never reads half a cache
+        temp = f"{cache}.{os.getpid()}"
+        with open(temp, "wb") as f:
+            marshal.dump(cards, f)
+        os.replace(temp, cache)
+    except (OSError, ValueError):
+        pass  # marshal raises ValueError for data it can't store, which plain YAML never has
+    return cards
@@ -0,0 +1,149 @@
+"""
+Binary snapshots of a whole GameState, for saving long games and for handing positions to other processes.
+
+A snapshot is the state reduced to plain values (players are stored by their seat, dogs by id, enums by value) and
+packed with marshal, behind a short header with the format version. Packing and loading a game takes a few hundred
+microseconds. Players are restored as the class they were saved as, but anything an AI keeps for itself between
+decisions (like a search tree) isn't saved.
+
+The state of each random generator of the game is stored too, packed into bytes (about 2.5 kB each), so a restored
+game draws the same cards and makes the same choices as the game it was saved from would have. Saving leaves the game
+alone: it plays on exactly as if it had never been saved.
+"""
+from __future__ import annotations
+
+import marshal
+import random
+import struct
+
+from dogpark.game import ANY
+from dogpark.game.dog import BREED_INDEX, DOGS, Breed, reload_dogs
+from dogpark.game.gamestate import GameState, Stage
+from dogpark.game.park import PARKS, Park
+from dogpark.game.player import Player
+
+MAGIC = b"DPC"
+VERSION = 3
+MARSHAL_VERSION = 4  # readable by every version of Python 3 this runs on
+
+
+def dumps(state: GameState) -> bytes:
+    """Snapshot the state"""
+    seat = {id(player): i for i, player in enumerate(state.players)}
+    park = state.park
+    snapshot = {
+        "rng": _dump_rng(state.rng),
+        "round": state.round,
+        "stage": state.stage.value,
+        "player": seat[id(state.player)] if state.player is not None else -1,
+        "num_players": state.num_players,
+        "players": [
+            (
+                type(player).__name__,
+                player.colour,
+                player.is_physical,
+                player.reputation,
+                tuple(player.resources[r] for r in ANY),
+                sorted(player.kennel),
+                sorted(player.lead),
+                player.objective if player.objective is not None else -1,
+                _dump_rng(player.rng),
+            )
+            for player in state.players
+        ],
+        "forecasts": state.forecasts,
+        "breed_experts": [breed.value for breed in state.breed_experts],
+        "dogs_deck": state.dogs_deck,
+        "walked": bytes(state.walked),
+        "parks_deck": list(state.parks_deck),
+        "park": None if park is None else (
+            park.modifiers, park.is_special, park.player_positions, park.leaving_bonuses
+        ),
+        "dogs": state.dogs,
+        "bid_round": state.bid_round,
+        "bid_state": state.bid_state,
+        "players_to_bid": [seat[id(player)] for player in state.players_to_bid],
+        "bids": {dog: [(seat[id(player)], amount) for player, amount in bids] for dog, bids in state.bids.items()},
+        "players_walking": [seat[id(player)] for player in state.players_walking],
+    }
+    return MAGIC + bytes([VERSION]) + marshal.dumps(snapshot, MARSHAL_VERSION)
+
+
+def loads(data: bytes) -> GameState:
+    """Restore a state from a snapshot"""
+    if data[:3] != MAGIC:
+        raise ValueError("Not a dogpark checkpoint")
+    if data[3] != VERSION:
+        raise ValueError(f"Unsupported checkpoint version {data[3]}")
+    snapshot = marshal.loads(data[4:])
+    if len(snapshot["walked"]) > len(DOGS):
+        reload_dogs()  # dogs were added to dogs.yaml during a physical game
+
+    # every attribute is set here, so skip GameState.__init__ rather than shuffle a deck only to replace it
+    state = GameState.__new__(GameState)
+    state.round = snapshot["round"]
+    state.stage = Stage(snapshot["stage"])
+    state.rng = _load_rng(snapshot["rng"])
+    state.zobrist = None
+    state.observers = []
+    state.num_players = snapshot["num_players"]
+    state.num_dogs = 3 if state.num_players <= 3 else 4
+    state.players = [_load_player(state, *player) for player in snapshot["players"]]
+    players = state.players
+    state.player = players[snapshot["player"]] if snapshot["player"] != -1 else None
+    state.forecasts = snapshot["forecasts"]
+    state.breed_experts = [Breed(breed) for breed in snapshot["breed_experts"]]
+    state.dogs_deck = snapshot["dogs_deck"]
+    state.walked = bytearray(snapshot["walked"])
+    state.parks_deck = {park_id: PARKS[park_id] for park_id in snapshot["parks_deck"]}
+    state.park = None
+    if snapshot["park"] is not None:
+        modifiers, is_special, positions, leaving_bonuses = snapshot["park"]
+        state.park = park = Park(modifiers, state.num_players)
+        park.is_special = is_special
+        park.player_positions = positions
+        park.leaving_bonuses = [tuple(bonuses) for bonuses in leaving_bonuses]
+    state.dogs = snapshot["dogs"]
+    state.bid_round = snapshot["bid_round"]
+    state.bid_state = snapshot["bid_state"]
+    state.players_to_bid = [players[i] for i in snapshot["players_to_bid"]]
+    state.bids = {dog: [(players[i], amount) for i, amount in bids] for dog, bids in snapshot["bids"].items()}
+    state.players_walking = [players[i] for i in snapshot["players_walking"]]
+    return state
+
+
+def player_class(name: str) -> type:
+    """The player class saved by name"""
+    from dogpark.game.game import AIS, get_ai
+
+    if name in AIS:
+        return get_ai(name)
+    if name == "HumanPlayer":
+        from dogpark.game.human import HumanPlayer
+
+        return HumanPlayer
+    raise ValueError(f"Can't restore a player of class {name}")
+
+
+def _dump_rng(rng: random.Random) -> tuple:
+    version, words, gauss_next = rng.getstate()
+    return version, struct.pack(f"<{len(words)}I", *words), gauss_next
+
+
+def _load_rng(saved: tuple) -> random.Random:
+    version, words, gauss_next = saved
+    rng = random.Random()
+    rng.setstate((version, struct.unpack(f"<{len(words) // 4}I", words), gauss_next))
+    return rng
+
+
+def _load_player(state, name, colour, is_physical, reputation, resources, kennel, lead, objective, rng) -> Player:
+    player = player_class(name)(state, colour, is_physical=is_physical, rng=_load_rng(rng))
+    player.reputation = reputation
+    player.resources = dict(zip(ANY, resources))
+    player.kennel = set(kennel)
+    player.lead = set(lead)
+    for dog in kennel:
+        player.breeds[BREED_INDEX[DOGS[dog].breed]] += 1
+    player.objective = objective if objective != -1 else None
+    return player
@@ -0,0 +1,107 @@
+"""
+Thinking time for AIs, for games played against a clock, like a physical game where the table is waiting.
+
+A Clock hands out a Deadline for each decision an AI makes, from a TimeControl: the time to aim for on each decision,
+the time for the whole game (shared out between the decisions likely to be left), and a hard limit that no decision
+goes past. Searches are anytime: they always hold the best move found so far, and ask the deadline whether to go on.
+Once the soft deadline has passed they start nothing new (a new iteration started late wouldn't finish in time), and
+once the hard deadline has passed they stop straight away with what they have. stop() makes a deadline pass at once,
+from any thread.
+
+The clock counts the time each decision took and the work done in it (positions searched, or playouts played), so
+budgets can be tuned to the machine the AI runs on; report sums these up.
+"""
+from __future__ import annotations
+
+from time import perf_counter
+from typing import NamedTuple, Optional
+
+from dogpark.game.gamestate import GameState
+
+DECISIONS_PER_ROUND = 8  # guessed for the rounds still to come, until a round has been played
+
+
+class TimeControl(NamedTuple):
+    per_decision: float = 2.0  # seconds to aim for on each decision
+    per_game: Optional[float] = None  # seconds for all of the decisions of a game, if limited
+    hard_limit: float = 5.0  # seconds after which a decision is made with whatever has been found
+
+
+class Deadline:
+    """When a search should start nothing new (soft), and when it must stop (hard), in perf_counter seconds"""
+
+    __slots__ = ("start", "soft", "hard", "stopped")
+
+    def __init__(self, soft: float, hard: Optional[float] = None):
+        """soft and hard are the seconds from now, hard being the same as soft if not given"""
+        self.start = perf_counter()
+        self.soft = self.start + soft
+        self.hard = self.start + (soft if hard is None else max(soft, hard))
+        self.stopped = False
+
+    def stop(self):
+        """Make the deadline pass now"""
+        self.stopped = True
+
+    def soft_passed(self) -> bool:
+        return self.stopped or perf_counter() > self.soft
+
+    def hard_passed(self) -> bool:
+        return self.stopped or perf_counter() > self.hard
+
+    def elapsed(self) -> float:
+        return perf_counter() - self.start
+
+
+class DecisionTime(NamedTuple):
+    round: int
+    seconds: float
+    work: int
+    unit: str  # what work counts, like "positions" or "playouts"
+
+
+class Clock:
+    """The thinking time of one AI over a game"""
+
+    def __init__(self, control: TimeControl = TimeControl()):
+        self.control = control
+        self.decisions: list[DecisionTime] = []
+
+    @property
+    def seconds(self) -> float:
+        return sum(decision.seconds for decision in self.decisions)
+
+    def deadline(self, state: GameState) -> Deadline:
+        """The deadline for a decision to be made now in the game"""
+        control = self.control
+        soft, hard = control.per_decision, control.hard_limit
+        if control.per_game is not None:
+            left = max(0.0, control.per_game - self.seconds)
+            soft = min(soft, left / self.decisions_to_go(state))
+            hard = min(hard, left)
+        return Deadline(min(soft, hard), hard)
+
+    def decisions_to_go(self, state: GameState) -> int:
+        """A guess at how many decisions are left in the game, counting this one"""
+        rounds: dict[int, int] = {}
+        for decision in self.decisions:
+            rounds[decision.round] = rounds.get(decision.round, 0) + 1
+        played = [count for r, count in rounds.items() if r < state.round]
+        per_round = sum(played) / len(played) if played else DECISIONS_PER_ROUND
+        to_go = (5 - state.round) * per_round - rounds.get(state.round, 0)
+        return max(1, round(to_go))
+
+    def record(self, state: GameState, deadline: Deadline, work: int, unit: str):
+        """Count a decision made before the deadline, and the work done for it"""
+        self.decisions.append(DecisionTime(state.round, deadline.elapsed(), work, unit))
+
+    def report(self) -> str:
+        if not self.decisions:
+            return "no decisions timed"
+        seconds = self.seconds
+        longest = max(decision.seconds for decision in self.decisions)
+        work: dict[str, int] = {}
+        for decision in self.decisions:
+            work[decision.unit] = work.get(decision.unit, 0) + decision.work
+        done = ", ".join(f"{count:,} {unit} ({count / max(seconds, 1e-9):,.0f}/s)" for unit, count in work.items())
+        return f"{len(self.decisions)} decisions in {seconds:.1f}s (longest {longest:.2f}s), {done}"
@@ -1,20 +1,113 @@
-import copy
-import importlib.resources
+from enum import Enum
+from typing import Iterable, NamedTuple, Optional
 
-import yaml
+from dogpark.game import ANY
+from dogpark.game.cards import load_cards
 
 
-def reload_dogs(from_file: bool = False) -> dict[str, dict]:
-    if from_file:
-        with open(importlib.resources.files("dogpark.game") / "dogs.yaml") as f:
-            dogs = yaml.safe_load(f)
-    else:
-        return copy.deepcopy(DOGS)
+class Breed(Enum):
+    WORKING = "W"
+    HOUND = "H"
+    TERRIER = "TE"
+    PASTORAL = "P"
+    TOY = "TO"
+    GUNDOG = "G"
+    UTILITY = "U"
 
-    # init walked at 0 for all dogs
-    for dog in dogs:
-        dogs[dog]["w"] = 0
-    return dogs
 
+class Ability(Enum):
+    PACK_DOG = "pack_dog"
+    RARING_TO_GO = "raring_to_go"
+    SOCIABLE = "sociable"
+    SOCIAL_BUTTERFLY = "social_butterfly"
+    SEARCH_AND_RESCUE = "search_and_rescue"
+    STICK_CHASER = "stick_chaser"
+    BALL_HOG = "ball_hog"
+    TOY_COLLECTOR = "toy_collector"
+    TREAT_LOVER = "treat_lover"
+    CRAFTY = "crafty"
+    EAGER = "eager"
+    GO_FETCH = "go_fetch"
+    OBEDIENT = "obedient"
+    PLAYMATE = "playmate"
 
-DOGS = reload_dogs(True)
+
+# position of each breed in per-player breed count vectors
+BREED_INDEX = {breed: i for i, breed in enumerate(Breed)}
+
+# abilities that score 1 REP (or 2 for the rarer TOY and TREAT) for each resource assigned to them at the end
+COLLECTORS = {
+    Ability.STICK_CHASER: "STICK",
+    Ability.BALL_HOG: "BALL",
+    Ability.TOY_COLLECTOR: "TOY",
+    Ability.TREAT_LOVER: "TREAT",
+}
+
+
+class Dog(NamedTuple):
+    """A dog card. These never change during a game, anything that does (like walked tokens) lives in the GameState"""
+
+    id: int
+    name: str
+    breed: Breed
+    ability: Ability
+    args: tuple[str, ...]  # resources named by the ability, e.g. ("STICK", "TOY") for go_fetch_stick_toy
+    cost: tuple[int, ...]  # resources needed to walk the dog, in the same order as ANY
+    converter: Optional[tuple[str, str]]  # (prerequisite, gain) for go fetch, obedient and playmate dogs
+
+    def __str__(self):
+        return self.name
+
+
+def _parse_ability(ability: str) -> tuple[Ability, tuple[str, ...]]:
+    for candidate in Ability:
+        if ability == candidate.value:
+            return candidate, ()
+        if ability.startswith(candidate.value + "_"):
+            return candidate, tuple(a.upper() for a in ability[len(candidate.value) + 1:].split("_"))
+    raise ValueError(f"Unknown ability {ability}")
+
+
+def _make_dog(dog_id: int, name: str, card: dict) -> Dog:
+    ability, args = _parse_ability(card["a"])
+    converter = None
+    if ability is Ability.GO_FETCH:
+        converter = args
+    elif ability is Ability.OBEDIENT:
+        converter = (args[0], "REP")
+    elif ability is Ability.PLAYMATE:
+        converter = (args[0], "SWAP")
+    return Dog(
+        id=dog_id,
+        name=name,
+        breed=Breed(card["b"]),
+        ability=ability,
+        args=args,
+        cost=tuple(card["c"].count(r) for r in ANY),
+        converter=converter,
+    )
+
+
+def _load_cards() -> dict[str, dict]:
+    return load_cards("dogs.yaml")
+
+
+# The catalog of all dog cards, indexed by id. Dogs are only ever appended, so ids stay valid for the whole process.
+DOGS: list[Dog] = [_make_dog(i, name, card) for i, (name, card) in enumerate(_load_cards().items())]
+DOG_IDS: dict[str, int] = {dog.name: dog.id for dog in DOGS}
+
+
+def reload_dogs() -> list[int]:
+    """Read dogs.yaml again, adding any dogs that have been added to it since. Returns the ids of the new dogs."""
+    new = []
+    for name, card in _load_cards().items():
+        if name not in DOG_IDS:
+            dog = _make_dog(len(DOGS), name, card)
+            DOGS.append(dog)
+            DOG_IDS[name] = dog.id
+            new.append(dog.id)
+    return new
+
+
+def dog_names(dogs: Iterable[int]) -> list[str]:
+    return [DOGS[dog].name for dog in dogs]
@@ -0,0 +1,261 @@
+"""
+Events of a game, for anything that wants to follow one as it is played, like the console output.
+
+An observer is any callable taking an event, added to GameState.observers. The game only builds an event after checking
+that there are observers, as in
+
+    if state.observers:
+        state.emit(BidPlaced(player, dog, amount))
+
+so a game no one is watching (a simulation, or a search playing on a clone) never formats or even creates them.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, NamedTuple, Optional, Union
+
+from dogpark.game.dog import DOGS, dog_names
+
+if TYPE_CHECKING:
+    from dogpark.game.gamestate import GameState, Stage
+    from dogpark.game.park import Park
+    from dogpark.game.player import Player, ScoreBreakdown
+
+
+class GameStarted(NamedTuple):
+    state: GameState  # after the cards of the first round are drawn, before objectives are chosen
+
+
+class ObjectiveChosen(NamedTuple):
+    player: Player
+    objective: int  # hidden from the other players
+
+
+class StageStarted(NamedTuple):
+    stage: Stage
+
+
+class BiddingRoundStarted(NamedTuple):
+    bid_round: int
+
+
+class BidPlaced(NamedTuple):
+    player: Player
+    dog: int
+    amount: Optional[int]  # sealed, and unknown until revealed for physical players
+
+
+class DogWon(NamedTuple):
+    player: Player
+    dog: int
+    amount: int
+
+
+class DogChosen(NamedTuple):
+    """A player left without a dog after bidding takes one for 1 REP"""
+
+    player: Player
+    dog: int
+
+
+class DogsSelected(NamedTuple):
+    player: Player
+    dogs: list[int]
+    resources: tuple[int, ...]  # left after paying for the dogs, in the order of ANY
+
+
+class DestinationChosen(NamedTuple):
+    player: Player
+    destination: int  # 15 for leaving the park
+    paid: bool  # paid 1 REP for the bonus of an occupied location
+
+
+class BonusesTaken(NamedTuple):
+    """The bonuses of a location, including any gained from them by the dogs on the lead"""
+
+    player: Player
+    bonuses: list[str]
+
+
+class LeavingBonusChosen(NamedTuple):
+    player: Player
+    index: int  # into park.leaving_bonuses, or -1 if there were none left (costing 1 REP)
+    bonuses: list[str]
+
+
+class BonusChosen(NamedTuple):
+    """A bonus chosen from a few on offer, like the resource a forecast gives"""
+
+    player: Player
+    bonus: str
+
+
+class DogsDrawn(NamedTuple):
+    dogs: list[int]
+
+
+class ParkDrawn(NamedTuple):
+    park_id: int  # key of the park card in PARKS
+    park: Park
+
+
+class Looked(NamedTuple):
+    player: Player
+    top_cards: list[int]
+    swap: Optional[tuple[int, int]]  # the field dog and the top card that replaced it, if any
+
+
+class Swapped(NamedTuple):
+    player: Player
+    walked: bool
+    kennel_dog: Optional[int]  # both None if the player chose not to swap
+    field_dog: Optional[int]
+
+
+class WaitingForInput(NamedTuple):
+    """A human player is being asked for something, and the game waits until they answer (see HumanPlayer.input)"""
+
+    player: Player
+
+
+class InputGiven(NamedTuple):
+    player: Player
+
+
+class RoundEnded(NamedTuple):
+    state: GameState  # after home time, with the next round set up
+
+
+class GameEnded(NamedTuple):
+    state: GameState
+
+
+class FinalScore(NamedTuple):
+    player: Player
+    breakdown: ScoreBreakdown
+
+
+class Result(NamedTuple):
+    scores: dict[str, int]  # colour: final score
+    winners: list[str]
+    breed_expert_tiebreak: bool  # the winners were decided by the 8 point breed expert
+
+
+Event = Union[
+    GameStarted,
+    ObjectiveChosen,
+    StageStarted,
+    BiddingRoundStarted,
+    BidPlaced,
+    DogWon,
+    DogChosen,
+    DogsSelected,
+    DestinationChosen,
+    BonusesTaken,
+    LeavingBonusChosen,
+    BonusChosen,
+    DogsDrawn,
+    ParkDrawn,
+    Looked,
+    Swapped,
+    WaitingForInput,
+    InputGiven,
+    RoundEnded,
+    GameEnded,
+    FinalScore,
+    Result,
+]
+Observer = Callable[[Event], None]
+
+SEPARATOR = "------------------------------"
+
+
+class ConsoleObserver:
+    """
+    Prints a game as it is played. Cards drawn, looks and swaps are only printed if verbose, since the status printed
+    every round shows them. Objectives are hidden information, so they are only printed if show_hidden.
+    """
+
+    def __init__(self, verbose: bool = False, show_hidden: bool = True):
+        self.verbose = verbose
+        self.show_hidden = show_hidden
+
+    def __call__(self, event: Event):
+        handler = getattr(self, f"on_{type(event).__name__}", None)
+        if handler is not None:
+            handler(event)
+
+    def on_GameStarted(self, event: GameStarted):
+        event.state.print_status()  # players can see the setup before choosing objectives
+
+    def on_ObjectiveChosen(self, event: ObjectiveChosen):
+        if self.show_hidden:
+            print(f"{event.player.colour} chose objective {event.objective}")
+
+    def on_StageStarted(self, event: StageStarted):
+        print(SEPARATOR)
+        print({"SELECTION": "Selection:", "HOME_TIME": "Home Time"}.get(event.stage.name, event.stage.name.title()))
+
+    def on_BiddingRoundStarted(self, event: BiddingRoundStarted):
+        print(f"Bidding Round {event.bid_round}")
+
+    def on_BidPlaced(self, event: BidPlaced):
+        print(f"{event.player.colour} bid on {DOGS[event.dog]}")
+
+    def on_DogWon(self, event: DogWon):
+        print(f"{event.player.colour} won {DOGS[event.dog]} for {event.amount} REP")
+
+    def on_DogChosen(self, event: DogChosen):
+        print(f"{event.player.colour} took {DOGS[event.dog]}")
+
+    def on_DogsSelected(self, event: DogsSelected):
+        print(f"{event.player.colour} selected {dog_names(event.dogs)}")
+
+    def on_BonusesTaken(self, event: BonusesTaken):
+        print(f"{event.player.colour} chose bonuses {event.bonuses}")
+
+    def on_LeavingBonusChosen(self, event: LeavingBonusChosen):
+        print(f"{event.player.colour} chose leaving bonus {event.bonuses}")
+
+    def on_DogsDrawn(self, event: DogsDrawn):
+        if self.verbose:
+            print("The following dogs were drawn:", ", ".join(dog_names(event.dogs)))
+
+    def on_ParkDrawn(self, event: ParkDrawn):
+        if self.verbose:
+            print("The following park was drawn:", event.park)
+
+    def on_Looked(self, event: Looked):
+        if not self.verbose:
+            return
+        print("Top 2 Dog cards drawn:")
+        print(dog_names(event.top_cards))
+        if event.swap is None:
+            print(f"{event.player.colour} chose not to swap")
+        else:
+            print(f"Swapped {DOGS[event.swap[0]]} for {DOGS[event.swap[1]]}")
+
+    def on_Swapped(self, event: Swapped):
+        if self.verbose and event.kennel_dog is not None:
+            print(f"{event.player.colour} swapped {DOGS[event.kennel_dog]} for {DOGS[event.field_dog]}")
+
+    def on_RoundEnded(self, event: RoundEnded):
+        print(SEPARATOR)
+        event.state.print_status()
+
+    def on_GameEnded(self, event: GameEnded):
+        print("Game over!")
+        event.state.print_status()
+        print("Final scores:")
+
+    def on_FinalScore(self, event: FinalScore):
+        event.player.print_score(event.breakdown)
+
+    def on_Result(self, event: Result):
+        for colour, score in event.scores.items():
+            print(f"{colour}: {score} REP")
+        if len(event.winners) == 1 and not event.breed_expert_tiebreak:
+            print(f"Winner: {event.winners[0]}")
+        elif len(event.winners) == 1:
+            print(f"Winner: {event.winners[0]} after winning the 8 point breed expert")
+        else:
+            print(f"Winners: {', '.join(event.winners)} after jointly winning the 8 point breed expert")
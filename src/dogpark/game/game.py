@@ -1,36 +1,132 @@
+import importlib
+import os
 import random
-from typing import Optional
+from typing import TYPE_CHECKING, Callable, Optional, Union
+
+from dogpark.game.dog import DOGS, Breed
+from dogpark.game.events import (
+    BiddingRoundStarted,
+    BidPlaced,
+    ConsoleObserver,
+    DogChosen,
+    DogWon,
+    FinalScore,
+    GameEnded,
+    GameStarted,
+    ObjectiveChosen,
+    Result,
+    RoundEnded,
+    StageStarted,
+)
+from dogpark.game.gamestate import GameState, Stage
+from dogpark.game.objective import draw_objective_pairs
 
-import yaml
+if TYPE_CHECKING:
+    from dogpark.game.player import Player
+    from dogpark.game.profiling import Profile
 
-from dogpark.game.gamestate import GameState
-from dogpark.game.objective import draw_objective_pairs
+# the phases of a round, in order
+PHASES = (Stage.RECRUITMENT, Stage.SELECTION, Stage.WALKING, Stage.HOME_TIME)
 
 
 class Dogpark:
-    def __init__(self, autorun: bool = True, num_players: int = None, ais: list[str] = None, prints: bool = True):
-        """When created the game is set up"""
+    def __init__(
+        self,
+        autorun: bool = True,
+        num_players: int = None,
+        ais: list[str] = None,
+        prints: bool = True,
+        seed: Optional[int] = None,
+        record: bool = False,
+        checkpoint: Optional[str] = None,
+        profile: Optional["Profile"] = None,
+    ):
+        """
+        When created the game is set up. If prints, the game is printed to the console as it is played. If seed is
+        given the game is reproducible: the cards and each seat's own random choices are drawn from separate
+        generators seeded from it, so the same seed deals the same cards whoever sits at each seat (see
+        seed_streams). If record, the game is recorded so it can be saved with save_game and replayed (see
+        dogpark.game.recording). If checkpoint is a path, the game is saved there at the start of every phase, to be
+        picked up again with Dogpark.restore. If profile is given, the time taken by each phase and decision is added
+        to it (see dogpark.game.profiling).
+        """
         if num_players is None:
             num_players = int(input("How many players? "))
+        game_rng, self.seat_rngs = seed_streams(seed)
         self.show_hidden = True
         self.ais = ais
-        self.prints = prints
+        self.checkpoint = checkpoint
+        self.profile = profile
+        self.scores: dict = {}  # player: final score, filled in at the end of the game
+        self.winners: list[str] = []  # colours, empty if a tie wasn't broken by the breed experts
 
         # declare properties before setup
-        self.state = GameState(num_players)
+        self.state = GameState(num_players, rng=game_rng)
+        if prints:
+            self.state.observers.append(ConsoleObserver(show_hidden=self.show_hidden))
+        self.recorder = None
+        if record:
+            from dogpark.game.recording import Recorder
 
-        if autorun:
-            self.setup()
+            self.recorder = Recorder(seed)
+            self.state.observers.append(self.recorder)
 
-            for r in range(1, 5):
-                self.state.round = r
-                self.play_round()
+        if autorun:
+            self.play()
 
-            self.end_game()
+    def play(self):
+        """Play the whole game, or the rest of a restored game from the start of the phase it was saved at"""
+        if self.profile is not None:
+            with self.profile.game():
+                self._play()
+        else:
+            self._play()
 
-    def print(self, *args, **kwargs):
-        if self.prints:
-            print(*args, **kwargs)
+    def _play(self):
+        phases = PHASES
+        if self.state.stage is Stage.SETUP:
+            self.run_phase("SETUP", self.setup)
+        else:
+            phases = PHASES[PHASES.index(self.state.stage):]
+        if self.profile is not None:
+            self.profile.instrument(self.state.players)
+
+        for r in range(self.state.round, 5):
+            self.state.round = r
+            self.play_round(phases)
+            phases = PHASES
+
+        self.run_phase("SCORING", self.end_game)
+
+    def run_phase(self, name: str, play: Callable[[], None]):
+        """Play part of the game, timing it if profiling"""
+        if self.profile is not None:
+            with self.profile.phase(name):
+                play()
+        else:
+            play()
+
+    @classmethod
+    def restore(cls, path: str, prints: bool = True, checkpoint: Optional[str] = None) -> "Dogpark":
+        """A game saved by a checkpoint, which play() carries on with"""
+        from dogpark.game.checkpoint import loads
+
+        with open(path, "rb") as f:
+            state = loads(f.read())
+        game = cls(autorun=False, num_players=state.num_players, prints=prints, checkpoint=checkpoint)
+        game.ais = [type(player).__name__ for player in state.players]
+        state.observers = game.state.observers
+        game.state = state
+        return game
+
+    def save_checkpoint(self, path: str):
+        """Save the whole state of the game, see dogpark.game.checkpoint"""
+        from dogpark.game.checkpoint import dumps
+
+        # write to a temporary file first, so a crash while saving leaves the last checkpoint intact
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(dumps(self.state))
+        os.replace(f"{path}.tmp", path)
 
     def setup(self):
         """Set up a game by drawing cards and printing them to the console"""
@@ -39,55 +135,64 @@ class Dogpark:
         if self.ais is None:
             print("Please enter a list of AI players, seperated by commas:")
             self.ais = input("AIs: ").replace(" ", "").split(",")
+        rng = self.state.rng
         available_colours = ["Red", "Green", "Yellow", "Purple"]
-        self.state.players = [get_ai(ai)(self.state, available_colours.pop(), is_physical=False) for ai in self.ais]
+        self.state.players = [
+            get_ai(ai)(self.state, available_colours.pop(), is_physical=False, rng=self.seat_rngs[seat])
+            for seat, ai in enumerate(self.ais)
+        ]
         self.state.players += [
-            HumanPlayer(self.state, colour, is_physical=False)
-            for colour in random.sample(available_colours, self.state.num_players - len(self.state.players))
+            HumanPlayer(self.state, colour, is_physical=False, rng=self.seat_rngs[seat])
+            for seat, colour in enumerate(
+                rng.sample(available_colours, self.state.num_players - len(self.state.players)), len(self.ais)
+            )
         ]
-        self.state.forecasts = random.sample(range(1, 12), k=4)  # get ids for 4 forecasts
+        self.deal()
+        if self.state.observers:
+            self.state.emit(GameStarted(self.state))
+        available_objectives = draw_objective_pairs(self.state.num_players, rng)
+        for player in self.state.players:
+            obj = player.choose_objective(*available_objectives.pop())
+            if obj is not None and self.state.observers:
+                self.state.emit(ObjectiveChosen(player, obj))
+
+    def deal(self):
+        """Draw the forecasts, the breed experts, and the dogs and park of the first round"""
+        rng = self.state.rng
+        self.state.forecasts = rng.sample(range(1, 12), k=4)  # get ids for 4 forecasts
         if self.state.forecasts[0] == 11:  # swap first and second
             self.state.forecasts[0], self.state.forecasts[1] = self.state.forecasts[1], self.state.forecasts[0]
-        self.state.breed_experts = [
-            "W",
-            "H",
-            "TE",
-            "P",
-            "TO",
-            "G",
-            "U",
-        ]
-        random.shuffle(self.state.breed_experts)
+        self.state.breed_experts = list(Breed)
+        rng.shuffle(self.state.breed_experts)
         self.state.draw_dogs()
-        self.state.draw_park()
-        if self.prints:
-            self.state.print_status()  # players can see the setup before choosing objectives
-        available_objectives = draw_objective_pairs(self.state.num_players)
-        for player in self.state.players:
-            obj = player.choose_objective(*available_objectives.pop())
-            if self.show_hidden and obj is not None:
-                self.print(f"{player.colour} chose objective {obj}")
-
-    def play_round(self):
-        self.print("------------------------------")
-        self.play_recruitment()
-        self.print("------------------------------")
-        self.play_selection()
-        self.print("------------------------------")
-        self.play_walking()
-        self.print("------------------------------")
-        self.play_home_time()
-        self.print("------------------------------")
-        # draw new park
-        if self.prints:
-            self.state.print_status()
+        self.draw_park()
+
+    def play_round(self, phases: tuple[Stage, ...] = None):
+        """Play the phases of the round, every phase by default"""
+        play = {
+            Stage.RECRUITMENT: self.play_recruitment,
+            Stage.SELECTION: self.play_selection,
+            Stage.WALKING: self.play_walking,
+            Stage.HOME_TIME: self.play_home_time,
+        }
+        for phase in phases or PHASES:
+            if self.checkpoint is not None:
+                self.state.stage = phase
+                self.save_checkpoint(self.checkpoint)
+            self.run_phase(phase.name, play[phase])
+        if self.state.observers:
+            self.state.emit(RoundEnded(self.state))
 
     def play_recruitment(self):
         """Players compete in 2 rounds of Offers to attract their most desired Dogs to their Kennel"""
-        self.print("Recruitment")
+        self.state.stage = Stage.RECRUITMENT
+        if self.state.observers:
+            self.state.emit(StageStarted(Stage.RECRUITMENT))
 
         for bidding_round in range(1, 3):
-            self.print(f"Bidding Round {bidding_round}")
+            if self.state.observers:
+                self.state.emit(BiddingRoundStarted(bidding_round))
+            self.state.bid_round = bidding_round
             self.bidding()
 
             # reset dogs
@@ -96,14 +201,18 @@ class Dogpark:
     def bidding(self):
         from dogpark.game.player import Player
 
-        players_to_bid = self.state.players.copy()
-        # dict of dog name, and then a list of tuples of (player, bid amount). if physical game, bid amount is None
+        # kept in the state, so they can be seen by anything looking at the game part way through bidding
+        self.state.players_to_bid = players_to_bid = self.state.players.copy()
+        # dict of dog id, and then a list of tuples of (player, bid amount). if physical game, bid amount is None
         # until revealed
-        bids: dict[str, list[tuple[Player, Optional[int]]]] = {dog_name: [] for dog_name in self.state.dogs}
+        bids: dict[int, list[tuple[Player, Optional[int]]]] = {dog: [] for dog in self.state.dogs}
+        self.state.bids = bids
+        self.state.bid_state = "bidding"
         for player in players_to_bid:
             dog, amount = player.bid(self.state.dogs, bids)  # Assume players don't read other players bids
             bids[dog].append((player, amount))
-            self.print(f"{player.colour} bid on {dog}")
+            if self.state.observers:
+                self.state.emit(BidPlaced(player, dog, amount))
 
         # resolve bids
         for dog, dog_bids in bids.items():
@@ -111,42 +220,53 @@ class Dogpark:
                 # highest bid wins, if tied, first player wins
                 winner, amount = max(dog_bids, key=lambda x: x[1])
                 winner.reputation -= amount
-                winner.add_dog_to_kennel(dog, self.state.dogs.pop(dog))
+                self.state.dogs.remove(dog)
+                if self.state.observers:
+                    self.state.emit(DogWon(winner, dog, amount))
+                winner.add_dog_to_kennel(dog)
                 players_to_bid.remove(winner)
 
         # players left without a dog pick from remaining dogs, choosing in turn order
+        self.state.bid_state = "choosing"
         for player in players_to_bid:
             dog = player.choose_dog(self.state.dogs)
             # TODO: if player has no reputation, then there should be another round of choosing
             player.reputation -= 1
-            player.add_dog_to_kennel(dog, self.state.dogs.pop(dog))
+            self.state.dogs.remove(dog)
+            if self.state.observers:
+                self.state.emit(DogChosen(player, dog))
+            player.add_dog_to_kennel(dog)
+        self.state.players_to_bid, self.state.bids, self.state.bid_state = [], {}, "bidding"
 
     def play_selection(self):
         """Players take turns to place Dogs from their Kennel onto their Lead"""
-        self.print("Selection:")
+        self.state.stage = Stage.SELECTION
+        if self.state.observers:
+            self.state.emit(StageStarted(Stage.SELECTION))
         for player in self.state.players:
+            self.state.player = player
             # TODO: maybe AIs could be given an advantage by going last, since the rules state this happens
             #   simultaneously
-            selected = player.do_selection()
+            player.do_selection()  # reported by Player.finish_selection
             if self.state.current_forecast() == 6:
                 # 2 rep for each hound
-                player.reputation += 2 * [d["b"] for d in player.lead.values()].count("H")
-            self.print(f"{player.colour} selected {selected}")
+                player.reputation += 2 * [DOGS[d].breed for d in player.lead].count(Breed.HOUND)
 
     def play_walking(self):
         """
         Players take turns to walk their Dogs, gaining resources and reputation.
         They keep walking until all but one player has left the park. The last player is then forced to leave.
         """
-        self.print("Walking")
-        players_walking = self.state.players.copy()
+        self.state.stage = Stage.WALKING
+        if self.state.observers:
+            self.state.emit(StageStarted(Stage.WALKING))
+        self.state.players_walking = players_walking = self.state.players.copy()
         # all players start at pos -1
         self.state.park.player_positions = {player.colour: -1 for player in players_walking}
         while len(players_walking) > 1:
             for player in players_walking.copy():
+                self.state.player = player
                 destination, bonuses = player.walk(self.state.park)
-                if bonuses is not None:
-                    self.print(f"{player.colour} chose bonuses {bonuses}")
                 if destination == 15:
                     players_walking.remove(player)
                 # if at any point there is only one player left, they are forced to leave (even if they are next to
@@ -155,9 +275,11 @@ class Dogpark:
                     break
 
         # last player is forced to leave
-        last_player = players_walking.pop()
-        bonus_chosen = last_player.choose_leaving_bonus(self.state.park)
-        self.print(f"{last_player.colour} chose leaving bonus {bonus_chosen}")
+        self.state.player = last_player = players_walking[0]
+        self.state.park.player_positions[last_player.colour] = 15
+        last_player.choose_leaving_bonus(self.state.park)
+        players_walking.pop()
+        self.state.player = None
 
     def play_home_time(self):
         """
@@ -168,64 +290,85 @@ class Dogpark:
         3. Return the Dogs on their Lead to their Kennel.
         """
 
-        self.print("Home Time")
+        self.state.stage = Stage.HOME_TIME
+        if self.state.observers:
+            self.state.emit(StageStarted(Stage.HOME_TIME))
         for player in self.state.players:
             player.home_time()
 
-        self.state.draw_park()
+        self.draw_park()
         self.state.players.append(self.state.players.pop(0))  # rotate players
 
+    def draw_park(self):
+        self.state.draw_park()
+
     def end_game(self):
-        self.print("Game over!")
-        if self.prints:
-            self.state.print_status()
-        self.print("Final scores:")
-        scores = {
-            player: player.final_score(print_breakdown=True if self.prints else False)
-            for player in self.state.players
-        }
-        for player, score in scores.items():
-            self.print(f"{player.colour}: {score} REP")
+        from dogpark.game.player import score_breakdown
+
+        observers = self.state.observers
+        if observers:
+            self.state.emit(GameEnded(self.state))
+        self.scores = scores = {}
+        for player in self.state.players:
+            breakdown = score_breakdown(player)
+            scores[player] = breakdown.total
+            if observers:
+                self.state.emit(FinalScore(player, breakdown))
 
         # check for ties
         max_score = max(scores.values())
-        winners = [player for player, score in scores.items() if score == max_score]
-        if len(winners) == 1:
-            self.print(f"Winner: {winners[0].colour}")
-        else:
+        winners = [player.colour for player, score in scores.items() if score == max_score]
+        tiebreak = len(winners) > 1
+        if tiebreak:
             # the player who won the highest valued breed expert award (8) wins
             breed_experts = self.state.calculate_breed_experts()
             # if multiple players have the same highest breed expert, then they share the victory
             winners = [colour for colour, score in breed_experts.items() if score[2] == 8]
-            if len(winners) == 1:
-                self.print(f"Winner: {winners[0]} after winning the 8 point breed expert")
-            else:
-                self.print(
-                    f"Winners: {', '.join([winner for winner in winners])} after jointly winning the"
-                    f" 8 point breed expert"
-                )
+        self.winners = winners
+        if observers:
+            self.state.emit(Result({player.colour: score for player, score in scores.items()}, winners, tiebreak))
 
     def save_game(self, name: str):
-        """Save to yaml"""
-        yml = {
-            "round": self.round,
-            "num_players": self.num_players,
-            "num_dogs": self.num_dogs,
-            # TODO: save players
-        }
-        yaml.dump(yml, open(f"{name}.yml", "w"))
-
-
-def get_ai(ai_name: str) -> type:
-    if ai_name == "NaiveAI":
-        from dogpark.ais.naive_ai import NaiveAI
-
-        return NaiveAI
-
-    if ai_name == "StingyAI":
-        from dogpark.ais.naive_ai import StingyAI
-
-        return StingyAI
+        """Save the record of the game so far to {name}.dogpark, see dogpark.game.recording"""
+        if self.recorder is None:
+            raise ValueError("Only recorded games can be saved, create the game with record=True")
+        with open(f"{name}.dogpark", "wb") as f:
+            f.write(self.recorder.recording().to_bytes())
+
+
+# AI names mapped to the module they live in, imported lazily so that importing the game doesn't import every AI
+AIS = {
+    "NaiveAI": "dogpark.ais.naive_ai",
+    "StingyAI": "dogpark.ais.naive_ai",
+    "HeuristicAI": "dogpark.ais.HeuristicAi",
+    "EquilibriumAI": "dogpark.ais.equilibrium_ai",
+    "MinimaxAI": "dogpark.ais.minimax_ai",
+    "ISMCTSAI": "dogpark.ais.ismcts_ai",
+    "TablebaseAI": "dogpark.ais.tablebase_ai",
+}
+
+
+def seed_streams(seed: Optional[int]) -> tuple[random.Random, list[random.Random]]:
+    """
+    The generator for the cards of a game, and one for each of the 4 seats, split from a single seed. A seat's choices
+    draw only from its own generator, so whatever happens at one seat never changes the cards drawn or another seat's
+    choices, and the same seed can be replayed with different players at the seats. Without a seed they are random.
+    """
+    streams = random.Random(seed)
+    game_rng = random.Random(streams.getrandbits(64))
+    return game_rng, [random.Random(streams.getrandbits(64)) for _ in range(4)]
+
+
+def get_ai(ai_name: Union[str, Callable[..., "Player"]]) -> Callable[..., "Player"]:
+    """
+    The class of a registered AI. A seat can also be given as a Player class, or anything else called like one, which
+    is returned as it is.
+    """
+    if callable(ai_name):
+        return ai_name
+    if ai_name not in AIS:
+        raise ValueError(f"Unknown AI {ai_name}, expected one of {', '.join(AIS)}")
+    return getattr(importlib.import_module(AIS[ai_name]), ai_name)
 
 
 if __name__ == "__main__":
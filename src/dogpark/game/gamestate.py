@@ -1,15 +1,14 @@
+import copy
 import random
 from enum import Enum
 from typing import Optional
 
-from dogpark.game.dog import reload_dogs
+from dogpark.game.dog import BREED_INDEX, DOGS, Breed, dog_names
+from dogpark.game.events import DogsDrawn, Event, Looked, Observer, ParkDrawn, Swapped
 from dogpark.game.forecast import forecast_description
 from dogpark.game.park import Park, PARKS
 
 
-PRINTS = False
-
-
 class Stage(Enum):
     SETUP = 1
     RECRUITMENT = 2
@@ -20,11 +19,15 @@ class Stage(Enum):
 
 class GameState:
 
-    def __init__(self, num_players: int = 3):
+    def __init__(self, num_players: int = 3, rng: Optional[random.Random] = None):
+        """rng draws every card of the game, see Dogpark for how games are seeded"""
         from dogpark.game.player import Player
+        self.rng = rng if rng is not None else random.Random()
         self.round = 1
         self.stage = Stage.SETUP
-        self.player = None
+        self.player: Optional[Player] = None  # whose turn it is, during selection and walking
+        self.zobrist: Optional[int] = None  # hash of the position, only kept up to date by dogpark.game.moves
+        self.observers: list[Observer] = []  # see dogpark.game.events
 
         self.num_players = num_players
         self.num_dogs = 3 if self.num_players <= 3 else 4
@@ -32,19 +35,57 @@ class GameState:
         # general states
         self.players: list[Player] = []
         self.forecasts: list[int] = []
-        self.current_forecast = lambda: self.forecasts[self.round - 1]
-        self.breed_experts: list[str] = []
+        self.breed_experts: list[Breed] = []
         self.park: Optional[Park] = None
-        self.dogs_deck = reload_dogs(from_file=False)
+        self.dogs_deck: list[int] = list(range(len(DOGS)))  # ids of the dogs left to draw, drawn from the end
+        self.rng.shuffle(self.dogs_deck)
+        self.walked = bytearray(len(DOGS))  # walked tokens on each dog, by dog id
         self.parks_deck = PARKS.copy()
 
         # stage specific states
         #   recruitment
-        self.dogs: dict[str, dict] = {}  # always available, but only really matters during bidding
-        self.bid_round = 1
+        self.dogs: list[int] = []  # always available, but only really matters during bidding
+        self.bid_round = 1  # the bidding round being played, or to be played next
         self.bid_state = "bidding"  # "bidding" or "choosing"
         self.players_to_bid: list[Player] = []
-        self.bids: dict[str, list[tuple[Player, Optional[int]]]] = {}
+        self.bids: dict[int, list[tuple[Player, Optional[int]]]] = {}
+        #   walking
+        self.players_walking: list[Player] = []  # players still in the park, in turn order
+
+    def current_forecast(self) -> Optional[int]:
+        # physical games may be played without forecasts
+        return self.forecasts[self.round - 1] if self.forecasts else None
+
+    def clone(self) -> "GameState":
+        """
+        Copy everything that can change during a game, so the copy can be played on without affecting this one.
+        Dog cards and park boards never change, so they are shared.
+        """
+        new = copy.copy(self)
+        new.observers = []  # no one is watching a copy being searched
+        # generators are shared (the players' too), so searches draw from their own to leave the real game's alone
+        new.forecasts = self.forecasts.copy()
+        new.breed_experts = self.breed_experts.copy()
+        new.dogs_deck = self.dogs_deck.copy()
+        new.walked = self.walked.copy()
+        new.parks_deck = self.parks_deck.copy()
+        new.dogs = self.dogs.copy()
+        if self.park is not None:
+            new.park = self.park.clone()
+
+        # players hold a reference to their game, so they are copied too and every reference to them is swapped
+        players = {id(player): player.clone(new) for player in self.players}
+        new.players = [players[id(player)] for player in self.players]
+        new.player = players[id(self.player)] if self.player is not None else None
+        new.players_to_bid = [players[id(player)] for player in self.players_to_bid]
+        new.bids = {dog: [(players[id(player)], amount) for player, amount in bids] for dog, bids in self.bids.items()}
+        new.players_walking = [players[id(player)] for player in self.players_walking]
+        return new
+
+    def emit(self, event: Event):
+        """Pass an event to every observer. Check that there are observers before building the event."""
+        for observer in self.observers:
+            observer(event)
 
     def print_status(self):
         print(f"Round {self.round}")
@@ -53,7 +94,7 @@ class GameState:
             prefix = ">>" if i == 0 else "  "
             print(f"{prefix} {player}")
         print("Dogs:")
-        print(self.dogs)
+        print(dog_names(self.dogs))
         print("Dog deck size:", len(self.dogs_deck))
         print("Park:")
         print(self.park)
@@ -62,65 +103,51 @@ class GameState:
             prefix = ">>" if i + 1 == self.round else "  "
             print(f"{prefix} Round {i + 1}: {forecast_description(forecast)}")
         print("Breed Experts:")
-        print("\n".join([f"{8 - i}: {breed}" for i, breed in enumerate(self.breed_experts)]))
+        print("\n".join([f"{8 - i}: {breed.value}" for i, breed in enumerate(self.breed_experts)]))
 
-    def look(self, player, prints: bool = PRINTS):
+    def look(self, player):
         """
         The player must look at the top 2 cards of the dog deck. This action is performed publicly. The player then
         may choose to replace a dog in the field with 1 of the dog cards they have drawn. The other dog cards are
         discarded.
         """
-        top_cards = {dog: self.dogs_deck.pop(dog) for dog in random.sample(list(self.dogs_deck.keys()), 2)}
-        if prints:
-            print("Top 2 Dog cards drawn:")
-            print(top_cards)
-
+        top_cards = [self.dogs_deck.pop(), self.dogs_deck.pop()]
         response = player.look(top_cards)
+        if self.observers:
+            self.emit(Looked(player, top_cards, response))
         if response is None:
-            if prints:
-                print(f"{player.colour} chose not to swap")
             return
         field_dog, top_dog = response
 
-        del self.dogs[field_dog]
-        self.dogs[top_dog] = top_cards[top_dog]
-        if prints:
-            print(f"Swapped {field_dog} for {top_dog}")
+        self.dogs[self.dogs.index(field_dog)] = top_dog
 
-    def draw_dogs(self, prints: bool = PRINTS):
-        self.dogs = {k: self.dogs_deck.pop(k) for k in random.sample(list(self.dogs_deck), k=self.num_dogs)}
-        if prints:
-            print(
-                "The following dogs were drawn:",
-                ", ".join(self.dogs.keys()),
-            )
+    def draw_dogs(self):
+        self.dogs = [self.dogs_deck.pop() for _ in range(self.num_dogs)]
+        if self.observers:
+            self.emit(DogsDrawn(self.dogs.copy()))
 
-    def draw_park(self, prints: bool = PRINTS):
+    def draw_park(self, rng: Optional[random.Random] = None):
         # Draw a park card from parks.yaml
         # Parks numbered 1-8 are for 2-3 players (Rerouted Park)
         # Parks numbered 9-16 are for 4 players (Plentiful Park)
         available_parks = [i for i in range(1, 9)] if self.num_players < 4 else [i for i in range(9, 17)]
         available_parks = list(set(available_parks) & set(self.parks_deck.keys()))
-        self.park = Park(self.parks_deck.pop(random.choice(available_parks)), self.num_players)
-        if prints:
-            print("The following park was drawn:", self.park)
-
-    def swap(self, player, walked: bool, kennel_dog: str, field_dog: str, prints: bool = PRINTS):
-        kennel_dict = player.kennel.pop(kennel_dog)
-        field_dict = self.dogs.pop(field_dog)
-        if "w" in kennel_dict:
-            del kennel_dict["w"]
+        park_id = (rng or self.rng).choice(available_parks)
+        self.park = Park(self.parks_deck.pop(park_id), self.num_players)
+        if self.observers:
+            self.emit(ParkDrawn(park_id, self.park))
 
-        if walked:
-            field_dict["w"] = 1
+    def swap(self, player, walked: bool, kennel_dog: int, field_dog: int):
+        player.remove_dog_from_kennel(kennel_dog)
+        self.walked[kennel_dog] = 0  # walked tokens are discarded when a dog leaves a kennel
+        self.dogs[self.dogs.index(field_dog)] = kennel_dog
 
-        if self.current_forecast() == 10:
-            field_dict["w"] = 1  # could end up with 2 walked this way
+        # could end up with 2 walked this way
+        self.walked[field_dog] = walked + (self.current_forecast() == 10)
 
-        player.add_dog_to_kennel(field_dog, field_dict)
-        self.dogs[kennel_dog] = kennel_dict
-        if prints:
-            print(f"{player.colour} swapped {kennel_dog} for {field_dog}")
+        player.add_dog_to_kennel(field_dog)
+        if self.observers:
+            self.emit(Swapped(player, walked, kennel_dog, field_dog))
 
     def calculate_breed_experts(self) -> dict[str, tuple[int, int, int]]:
         """return a dict of player colour and a tuple of: number of awards, points from awards, and highest award"""
@@ -129,10 +156,10 @@ class GameState:
             # players get score if they have the most of a certain breed in their kennel. If there is a tie, all tied
             # players get the points
             value = 8 - i
-            dogs = {p.colour: len([d for d in p.kennel.values() if d["b"] == breed]) for p in self.players}
-            maxdogs = max(dogs.values())
-            for winner_colour in [c for c, v in dogs.items() if v == maxdogs]:
-                breed_experts[winner_colour][0] += 1
-                breed_experts[winner_colour][1] += value
-                breed_experts[winner_colour][2] = max(breed_experts[winner_colour][2], value)
+            b = BREED_INDEX[breed]
+            maxdogs = max(p.breeds[b] for p in self.players)
+            for winner in [p for p in self.players if p.breeds[b] == maxdogs]:
+                breed_experts[winner.colour][0] += 1
+                breed_experts[winner.colour][1] += value
+                breed_experts[winner.colour][2] = max(breed_experts[winner.colour][2], value)
         return breed_experts
@@ -0,0 +1,381 @@
+"""
+Games as state machines, which stop at every decision and carry on once it's answered.
+
+Dogpark asks its players for their decisions as it plays, so a game waiting on a decision holds the thread playing it.
+A GameMachine turns this around: it plays until someone has to decide something, and then stops with a Decision saying
+whose it is and what it is between, until it's given an answer. Nothing waits in the meantime, so a program can keep
+any number of games at once and answer their decisions in whatever order they come in.
+
+A game is the cards it was dealt and the decisions made in it, which is what a Recording holds (see
+dogpark.game.recording), so a machine is a recording that grows by a decision at a time. It finds where the game is by
+replaying the recording with the same engine Dogpark plays with, from a copy of the game it keeps at the start of each
+phase, so an answer costs a replay of the phase so far rather than of the whole game. Machines pickle as their
+recording, a few hundred bytes, and suspend drops everything else from memory until the game is needed again.
+
+Decisions follow the stages of a game (see Stage): each player chooses an objective at SETUP, bids (and maybe chooses
+a dog) during RECRUITMENT, selects the dogs for their lead during SELECTION, and walks during WALKING, with bonuses
+to choose, LOOKs and SWAPs along the way (and which to take first, when a LOOK and a SWAP come together). Walking and
+selections are decided as the moves of dogpark.game.moves.
+"""
+from __future__ import annotations
+
+import struct
+from typing import Any, NamedTuple, Optional
+
+from dogpark.game import ANY
+from dogpark.game.events import ParkDrawn
+from dogpark.game.game import Dogpark, get_ai, seed_streams
+from dogpark.game.gamestate import GameState
+from dogpark.game.moves import Leave, Walk, legal_moves
+from dogpark.game.objective import draw_objective_pairs
+from dogpark.game.player import Player
+from dogpark.game.recording import (
+    BID,
+    BONUS,
+    BONUSES,
+    DOG,
+    HIDDEN,
+    LEAVE,
+    LOOK,
+    OBJECTIVE,
+    SELECT,
+    SWAP,
+    WALK,
+    Action,
+    Recording,
+    ReplayDogpark,
+    ReplayPlayer,
+    ReplayStopped,
+)
+
+# colours the seats are given, the same as Dogpark gives AIs
+COLOURS = ("Purple", "Yellow", "Green", "Red")
+
+
+class Decision(NamedTuple):
+    kind: int  # the kind of action (as in dogpark.game.recording): OBJECTIVE, BID, DOG, SELECT, WALK, ...
+    seat: int  # of the player to decide, in the order they were seated at setup
+    # what can be answered: objectives, (dog, amount) bids, dogs, Selects, Walks and Leaves (walking), Leaves (when the
+    # last player is made to leave), bonuses (or which of those that ask for a decision to take first), (field dog, top
+    # card) or None for a LOOK, (kennel dog, field dog) or None for a SWAP
+    options: tuple
+    walked: bool = False  # for a SWAP, if the dog taken from the field gets a walked token
+
+
+class SeatPlayer(ReplayPlayer):
+    """A seat of a GameMachine, noting what each decision is between before taking it from the recording"""
+
+    replay: MachineDogpark
+
+    def choose_objective(self, hard: int = None, easy: int = None) -> Optional[int]:
+        self.replay.options = self.replay.machine.objectives[self.seat]
+        return super().choose_objective()
+
+    def bid(self, available_dogs: list[int], bids: dict) -> (int, int):
+        amounts = range(1, max(1, self.reputation) + 1)
+        self.replay.options = tuple((dog, amount) for dog in available_dogs for amount in amounts)
+        return super().bid(available_dogs, bids)
+
+    def choose_dog(self, available_dogs: list[int]) -> int:
+        self.replay.options = tuple(available_dogs)
+        return super().choose_dog(available_dogs)
+
+    def choose_bonus(self, bonuses: list[str]) -> str:
+        self.replay.options = tuple(bonuses)
+        return super().choose_bonus(bonuses)
+
+    def first_hidden(self, hidden: list[str]) -> str:
+        # which of a LOOK and a SWAP (or a SWAP and a WALKED SWAP) comes first is the player's to choose, which the
+        # machine keeps until the first of them is answered, as the recording doesn't show it until then
+        first = self.replay.machine._first
+        if first not in hidden and len(set(hidden)) > 1:
+            self.replay.options = tuple(dict.fromkeys(hidden))
+            self.replay.take(BONUS, self.seat)  # stops, as nothing is recorded past here
+        return first if first in hidden else hidden[0]
+
+    def look(self, top_cards: list[int]) -> Optional[tuple[int, int]]:
+        self.replay.options = (None, *((field, top) for field in self.game.dogs for top in top_cards))
+        return super().look(top_cards)
+
+    def swap(self, walked: bool) -> Optional[tuple[int, int]]:
+        self.replay.options = (None, *((kennel, field) for kennel in sorted(self.kennel) for field in self.game.dogs))
+        self.replay.walked = walked
+        return super().swap(walked)
+
+
+class MachineDogpark(ReplayDogpark):
+    """The engine a GameMachine replays its recording with, keeping a copy of the game at the start of each phase"""
+
+    player_class = SeatPlayer
+
+    def __init__(self, machine: GameMachine):
+        self.machine = machine
+        self.asked = (OBJECTIVE, 0)  # the kind of the decision being taken, and by which seat
+        self.options: tuple = ()  # what it's between
+        self.walked = False
+        super().__init__(machine.recording)
+        self.checkpoint = ""  # so save_checkpoint is called at the start of every phase
+
+    def take(self, kind: int, seat: int) -> tuple[int, ...]:
+        self.asked = kind, seat
+        return super().take(kind, seat)
+
+    def save_checkpoint(self, path: str):
+        phase = self.machine._phase
+        # a phase is replayed from its start each time, when there's no need to copy it again
+        if phase is None or (phase[0].stage, phase[1]) != (self.state.stage, self.cursor):
+            self.machine._phase = (self.state.clone(), self.cursor, self.parks_drawn)
+
+    def restore_phase(self, phase: tuple[GameState, int, int]):
+        """Carry on from a copy of the game kept at the start of a phase"""
+        state, self.cursor, self.parks_drawn = phase
+        self.state = state.clone()
+        for player in self.state.players:
+            player.replay = self
+
+
+class GameMachine:
+    """
+    A game that stops at every decision. decision is the one to be made next (None once the game is over), state the
+    game as it stands, and answer carries on with one of the decision's options.
+    """
+
+    def __init__(self, recording: Recording, objectives: tuple[tuple[int, int], ...] = ()):
+        """
+        Carry on with a recorded game from the end of its recording. objectives are the (hard, easy) objectives offered
+        to each seat, which are only needed if the recording stops before every objective has been chosen.
+        """
+        self._recording: Optional[Recording] = recording
+        self.objectives = objectives
+        self._packed: Optional[bytes] = None  # the recording, while suspended
+        self._game: Optional[MachineDogpark] = None  # the engine, stopped at the decision or finished
+        self._phase: Optional[tuple[GameState, int, int]] = None  # the start of the phase, see restore_phase
+        self._decision: Optional[Decision] = None
+        self._first: Optional[str] = None  # the bonus asking for a decision chosen to be taken first, see first_hidden
+        self._stale = True  # the engine is behind the recording
+
+    @classmethod
+    def deal(cls, num_players: int = 3, seed: Optional[int] = None) -> GameMachine:
+        """A new game, dealt the same cards as Dogpark(seed=seed)"""
+        game = Dogpark(autorun=False, num_players=num_players, ais=[], prints=False, seed=seed)
+        state = game.state
+        parks = []
+        state.observers.append(lambda event: parks.append(event.park_id) if type(event) is ParkDrawn else None)
+        deck = tuple(state.dogs_deck)
+        game.deal()
+        # setup draws the objectives after the first park, and each seat takes theirs from the end
+        objectives = tuple(reversed(draw_objective_pairs(num_players, state.rng)))
+        for _ in range(4):
+            game.draw_park()  # in every home time, the last not being played in
+        recording = Recording(
+            seed,
+            COLOURS[:num_players],
+            (SeatPlayer.__name__,) * num_players,
+            tuple(state.forecasts),
+            tuple(state.breed_experts),
+            deck,
+            tuple(parks),
+            (),
+        )
+        return cls(recording, objectives)
+
+    @property
+    def recording(self) -> Recording:
+        if self._recording is None:
+            self._recording, _, _ = _unpack(self._packed)
+            self._packed = None
+        return self._recording
+
+    @property
+    def decision(self) -> Optional[Decision]:
+        self._play()
+        return self._decision
+
+    @property
+    def state(self) -> GameState:
+        """The game, stopped at the decision. Look, but don't change it."""
+        self._play()
+        return self._game.state
+
+    @property
+    def player(self) -> Optional[Player]:
+        """The player to decide"""
+        decision = self.decision
+        if decision is None:
+            return None
+        return next(player for player in self.state.players if player.seat == decision.seat)
+
+    @property
+    def scores(self) -> dict[str, int]:
+        """The final score of each colour, empty until the game is over"""
+        self._play()
+        return {player.colour: score for player, score in self._game.scores.items()}
+
+    @property
+    def winners(self) -> list[str]:
+        self._play()
+        return self._game.winners
+
+    def answer(self, option: Any):
+        """Make the decision, with one of its options, and play on to the next one"""
+        decision = self.decision
+        if decision is None:
+            raise ValueError("The game is over")
+        if option not in decision.options:
+            raise ValueError(f"{option!r} isn't one of the options of {decision}")
+        if decision.kind == BONUS and option in HIDDEN:
+            self._first = option
+        else:
+            recording = self.recording
+            self._recording = recording._replace(actions=recording.actions + self._actions(decision, option))
+            self._first = None
+        self._stale = True
+        self._play()
+
+    def suspend(self):
+        """Keep nothing but the recording, packed, until the game is needed again"""
+        self._packed = self.to_bytes()
+        self._recording = self._game = self._phase = self._decision = None
+        self._stale = True
+
+    def to_bytes(self) -> bytes:
+        """The game so far, with the objectives offered, for from_bytes"""
+        if self._recording is None:
+            return self._packed
+        objectives = bytes(objective for pair in self.objectives for objective in pair)
+        first = 0 if self._first is None else 1 + HIDDEN.index(self._first)
+        return struct.pack("<B", len(self.objectives)) + objectives + bytes((first,)) + self._recording.to_bytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> GameMachine:
+        recording, objectives, first = _unpack(data)
+        machine = cls(recording, objectives)
+        machine._first = first
+        return machine
+
+    def __reduce__(self):
+        return GameMachine.from_bytes, (self.to_bytes(),)
+
+    def _play(self):
+        """Replay the recording up to the decision, if it hasn't been already"""
+        if not self._stale:
+            return
+        self._stale = False
+        game = self._game
+        if game is None or self._phase is None:
+            self._game = game = MachineDogpark(self)
+        else:
+            # the same engine plays on from the start of the phase, now that the recording has more in it
+            game.recording, game.stop = self.recording, len(self.recording.actions)
+        if self._phase is not None:
+            game.restore_phase(self._phase)
+        try:
+            game.play()
+            self._decision = None
+        except ReplayStopped:
+            kind, seat = game.asked
+            options = game.options
+            if kind in (SELECT, WALK, LEAVE):
+                options = tuple(legal_moves(game.state))
+            self._decision = Decision(kind, seat, options, game.walked)
+
+    def _actions(self, decision: Decision, option: Any) -> tuple[Action, ...]:
+        """The actions of the recording that answer the decision"""
+        kind, seat = decision.kind, decision.seat
+        if kind == SELECT:
+            resources = self.player.resources
+            args = (*(resources[r] - cost for r, cost in zip(ANY, option.cost)), *option.dogs)
+        elif kind == WALK and isinstance(option, Leave):
+            leave = (Action(LEAVE, seat, (option.bonus,)),) if option.bonus != -1 else ()
+            return (Action(WALK, seat, (15, 0)), *leave)
+        elif kind == WALK:
+            args = (option.destination, int(option.pay))
+        elif kind == LEAVE:
+            args = (option.bonus,)
+        elif kind == BONUS and option in HIDDEN:
+            return ()  # only the order, which shows in the recording by the action answering the bonus
+        elif kind == BONUS:
+            args = (BONUSES.index(option),)
+        elif kind == LOOK:
+            args = option or ()
+        elif kind == SWAP:
+            args = (int(decision.walked), *(option or ()))
+        elif kind == BID:
+            args = option
+        else:
+            args = (option,)
+        return (Action(kind, seat, tuple(args)),)
+
+
+def _unpack(data: bytes) -> tuple[Recording, tuple[tuple[int, int], ...], Optional[str]]:
+    count = data[0]
+    objectives = tuple(tuple(data[1 + 2 * i: 3 + 2 * i]) for i in range(count))
+    first = data[1 + 2 * count]
+    return Recording.from_bytes(data[2 + 2 * count:]), objectives, HIDDEN[first - 1] if first else None
+
+
+def decide(machine: GameMachine, ai: Player) -> Any:
+    """
+    The answer the AI gives to the machine's decision. The AI decides on a copy of the game, sitting in the seat of
+    the player to decide, so whatever it does along the way is left on the copy.
+    """
+    decision = machine.decision
+    state = machine.state.clone()
+    player = next(player for player in state.players if player.seat == decision.seat)
+    _sit(ai, player, state)
+    kind, options = decision.kind, decision.options
+    if kind == OBJECTIVE:
+        return ai.choose_objective(*options)
+    if kind == BID:
+        return tuple(ai.bid(state.dogs, state.bids))
+    if kind == DOG:
+        return ai.choose_dog(state.dogs)
+    if kind == SELECT:
+        ai.do_selection()
+        dogs = tuple(sorted(ai.lead))
+        return next(move for move in options if move.dogs == dogs)
+    if kind == WALK:
+        park = state.park
+        destination = ai.choose_destination(park)
+        if destination == 15:
+            return Leave(ai.choose_leaving_bonus_index(park) if park.leaving_bonuses else -1)
+        if Walk(destination, pay=True) in options:
+            return Walk(destination, pay=bool(ai.pay_walking_bonus(park, destination)))
+        return Walk(destination)
+    if kind == LEAVE:
+        return Leave(ai.choose_leaving_bonus_index(state.park))
+    if kind == BONUS:
+        return ai.choose_bonus(list(options))
+    if kind == LOOK:
+        top_cards = list(dict.fromkeys(top for _, top in options[1:]))
+        look = ai.look(top_cards)
+        return None if look is None else tuple(look)
+    swap = ai.swap(decision.walked)
+    return None if swap is None else tuple(swap)
+
+
+def _sit(ai: Player, player: Player, state: GameState):
+    """Put the AI in the player's seat in the state, as the player"""
+    ai.game = state
+    for name in ("colour", "is_physical", "reputation", "resources", "kennel", "lead", "breeds", "objective"):
+        setattr(ai, name, getattr(player, name))
+    swapped = lambda other: ai if other is player else other  # noqa: E731
+    state.players = [swapped(other) for other in state.players]
+    state.player = swapped(state.player)
+    state.players_walking = [swapped(other) for other in state.players_walking]
+    state.players_to_bid = [swapped(other) for other in state.players_to_bid]
+    state.bids = {dog: [(swapped(other), amount) for other, amount in bids] for dog, bids in state.bids.items()}
+
+
+def play(machine: GameMachine, ais: list[str], seed: Optional[int] = None) -> dict[str, int]:
+    """
+    Answer every decision of the machine with AIs, one for each seat, to the end of the game, and return the scores.
+    Each AI draws its random choices from the generator Dogpark(seed=seed) would give its seat.
+    """
+    _, seat_rngs = seed_streams(seed)
+    players = [
+        get_ai(ai)(machine.state, colour, rng=rng) for ai, colour, rng in zip(ais, machine.recording.colours, seat_rngs)
+    ]
+    while (decision := machine.decision) is not None:
+        machine.answer(decide(machine, players[decision.seat]))
+    return machine.scores
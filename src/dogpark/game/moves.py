@@ -0,0 +1,308 @@
+"""
+Moves for searching through the selection and walking phases.
+
+A move is applied to a GameState through a Journal, which records every change made so that it can be undone again.
+This lets a search explore many positions from one GameState without copying it at every step (see GameState.clone
+for when a full copy is needed). The rules follow Dogpark and Player.walk, except for the parts that depend on
+hidden cards: LOOK, SWAP and WALKED SWAP bonuses are taken without effect.
+"""
+from __future__ import annotations
+
+from itertools import combinations
+from typing import NamedTuple, Union
+
+from dogpark.game import ANY
+from dogpark.game.dog import BREED_INDEX, DOGS, Ability, Breed
+from dogpark.game.gamestate import GameState, Stage
+from dogpark.game.player import Player, convert_bonuses
+from dogpark.game.zobrist import (
+    COUNT_KEYS,
+    DOG_KEYS,
+    KENNEL,
+    LEAD,
+    POSITION,
+    STAGE,
+    TURN,
+    WALKED,
+    WALKING,
+    leaving_key,
+    player_key,
+    turn_key,
+)
+
+
+class Journal:
+    """A log of changes made to a game, which can be undone back to any earlier mark"""
+
+    def __init__(self):
+        self.entries: list[tuple] = []
+
+    def mark(self) -> int:
+        return len(self.entries)
+
+    def setattr(self, obj, name: str, value):
+        self.entries.append((setattr, obj, name, getattr(obj, name)))
+        setattr(obj, name, value)
+
+    def setitem(self, container, key, value):
+        """Set a key of a dict, or an index of a list or bytearray"""
+        if isinstance(container, dict) and key not in container:
+            self.entries.append((_delitem, container, key, None))
+        else:
+            self.entries.append((_setitem, container, key, container[key]))
+        container[key] = value
+
+    def pop(self, items: list, index: int):
+        value = items.pop(index)
+        self.entries.append((_insert, items, index, value))
+        return value
+
+    def add(self, items: set, item):
+        items.add(item)
+        self.entries.append((_discard, items, item, None))
+
+    def remove(self, items: set, item):
+        items.remove(item)
+        self.entries.append((_add, items, item, None))
+
+    def undo(self, mark: int = 0):
+        """Undo every change made since the mark"""
+        entries = self.entries
+        while len(entries) > mark:
+            undo, obj, key, value = entries.pop()
+            undo(obj, key, value)
+
+
+def _setitem(container, key, value):
+    container[key] = value
+
+
+def _delitem(container, key, _):
+    del container[key]
+
+
+def _insert(items, index, value):
+    items.insert(index, value)
+
+
+def _discard(items, item, _):
+    items.discard(item)
+
+
+def _add(items, item, _):
+    items.add(item)
+
+
+class Walk(NamedTuple):
+    destination: int  # 0-14, leaving the park is a Leave
+    pay: bool = False  # pay 1 REP to take the bonus at an occupied location
+
+
+class Leave(NamedTuple):
+    bonus: int  # index into park.leaving_bonuses, or -1 if there are none left (costing 1 REP)
+
+
+class Select(NamedTuple):
+    dogs: tuple[int, ...]  # the dogs placed on the lead
+    cost: tuple[int, ...]  # resources paid for them, in the same order as ANY
+
+
+Move = Union[Walk, Leave, Select]
+
+
+def lead_capacity(state: GameState) -> int:
+    return 4 if state.current_forecast() == 11 else 3
+
+
+def selection_cost(state: GameState, player: Player, dogs: tuple[int, ...]) -> tuple[int, ...] | None:
+    """
+    The cheapest affordable cost of placing the dogs on the lead, or None if the player can't afford them.
+    With forecast 3 each pastoral dog lets the dog placed after it go for free, but the first dog placed has to be
+    paid for, and must be a pastoral dog for any of the others to be free.
+    """
+    resources = tuple(player.resources[r] for r in ANY)
+    pastoral = sum(DOGS[dog].breed is Breed.PASTORAL for dog in dogs)
+    if state.current_forecast() != 3 or pastoral == 0 or len(dogs) < 2:
+        cost = tuple(sum(costs) for costs in zip(*(DOGS[dog].cost for dog in dogs))) if dogs else (0, 0, 0, 0)
+        return cost if all(c <= r for c, r in zip(cost, resources)) else None
+
+    # pay for the cheapest set of dogs that includes a pastoral dog to put down first
+    paid_for = len(dogs) - min(pastoral, len(dogs) - 1)
+    best = None
+    for paying in combinations(dogs, paid_for):
+        if not any(DOGS[dog].breed is Breed.PASTORAL for dog in paying):
+            continue
+        cost = tuple(sum(costs) for costs in zip(*(DOGS[dog].cost for dog in paying)))
+        if all(c <= r for c, r in zip(cost, resources)) and (best is None or sum(cost) < sum(best)):
+            best = cost
+    return best
+
+
+def legal_moves(state: GameState) -> list[Move]:
+    """Every move the player to move can make, or an empty list if the selection and walking phases are over"""
+    player = state.player
+    if state.stage is Stage.SELECTION:
+        moves = []
+        kennel = sorted(player.kennel)
+        for size in range(min(lead_capacity(state), len(kennel)), -1, -1):
+            for dogs in combinations(kennel, size):
+                cost = selection_cost(state, player, dogs)
+                if cost is not None:
+                    moves.append(Select(dogs, cost))
+        return moves
+
+    if state.stage is not Stage.WALKING or player is None:
+        return []
+
+    park = state.park
+    leaves = [Leave(i) for i in range(len(park.leaving_bonuses))] or [Leave(-1)]
+    if len(state.players_walking) == 1:
+        return leaves  # the last player in the park is forced to leave
+
+    moves = []
+    can_pay = player.reputation > 0 and not has_butterfly(player)
+    occupied = park.player_positions.values()
+    for destination in park.possible_moves(park.player_positions[player.colour]):
+        if destination == 15:
+            moves += leaves
+        elif can_pay and destination in occupied:
+            moves.append(Walk(destination, pay=True))
+            moves.append(Walk(destination, pay=False))
+        else:
+            moves.append(Walk(destination))
+    return moves
+
+
+def apply_move(state: GameState, move: Move, journal: Journal):
+    """Make a move for the player to move, and pass the turn on. Updates the position's hash, if it has one."""
+    if state.zobrist is None:
+        _APPLY[type(move)](state, move, journal)
+        return
+
+    # rather than hashing the whole position again, only hash what the move can change before and after
+    player = state.player
+    players = state.players
+    i = players.index(player)
+    positions = state.park.player_positions
+    key = state.zobrist ^ player_key(player, i) ^ TURN[i]
+    starts_walk = False
+    if isinstance(move, Walk):
+        key ^= POSITION[i][positions[player.colour] + 1] ^ POSITION[i][move.destination + 1]
+    elif isinstance(move, Leave):
+        key ^= POSITION[i][positions[player.colour] + 1] ^ POSITION[i][16] ^ WALKING[i] ^ leaving_key(state)
+        if len(state.players_walking) == 1:
+            key ^= STAGE[Stage.WALKING] ^ STAGE[Stage.HOME_TIME]
+    else:
+        for dog in move.dogs:
+            walked = WALKED[dog % DOG_KEYS]
+            key ^= KENNEL[i][dog % DOG_KEYS] ^ LEAD[i][dog % DOG_KEYS]
+            key ^= walked[state.walked[dog] % COUNT_KEYS] ^ walked[(state.walked[dog] + 1) % COUNT_KEYS]
+        starts_walk = player is players[-1]
+        if starts_walk:
+            key ^= turn_key(state) ^ TURN[i]
+
+    _APPLY[type(move)](state, move, journal)
+
+    key ^= player_key(player, i)
+    if isinstance(move, Leave):
+        key ^= leaving_key(state)
+    if starts_walk:
+        key ^= turn_key(state)
+    elif state.player is not None:
+        key ^= TURN[players.index(state.player)]
+    journal.setattr(state, "zobrist", key)
+
+
+def apply_bonus(player: Player, bonus: str, journal: Journal):
+    """Player.apply_bonus, without the bonuses that need a decision about hidden cards"""
+    if bonus == "REP":
+        journal.setattr(player, "reputation", player.reputation + 1)
+    elif bonus in player.resources:
+        journal.setitem(player.resources, bonus, player.resources[bonus] + 1)
+
+
+def has_butterfly(player: Player) -> bool:
+    """If the player has a social butterfly on their lead, so never pays for the bonus of an occupied location"""
+    return any(DOGS[dog].ability is Ability.SOCIAL_BUTTERFLY for dog in player.lead)
+
+
+def _apply_select(state: GameState, move: Select, journal: Journal):
+    player = state.player
+    resources = player.resources
+    for resource, cost in zip(ANY, move.cost):
+        if cost:
+            journal.setitem(resources, resource, resources[resource] - cost)
+    for dog in move.dogs:
+        journal.remove(player.kennel, dog)
+        journal.add(player.lead, dog)
+        breed = BREED_INDEX[DOGS[dog].breed]
+        journal.setitem(player.breeds, breed, player.breeds[breed] - 1)
+        journal.setitem(state.walked, dog, state.walked[dog] + 1)
+        if DOGS[dog].ability is Ability.EAGER:
+            apply_bonus(player, DOGS[dog].args[0], journal)
+
+    forecast = state.current_forecast()
+    if forecast == 6:
+        hounds = sum(DOGS[dog].breed is Breed.HOUND for dog in move.dogs)
+        journal.setattr(player, "reputation", player.reputation + 2 * hounds)
+    elif forecast == 1 and state.park.location_bonuses:
+        for dog in player.lead | player.kennel:
+            if DOGS[dog].breed is Breed.GUNDOG:
+                # take whatever the player has least of
+                bonus = min(state.park.location_bonuses, key=lambda b: resources.get(b, player.reputation))
+                apply_bonus(player, bonus, journal)
+
+    index = state.players.index(player)
+    if index + 1 < len(state.players):
+        journal.setattr(state, "player", state.players[index + 1])
+    else:
+        # everyone has selected, so the walk starts with every player at -1
+        journal.setattr(state, "stage", Stage.WALKING)
+        journal.setattr(state, "players_walking", state.players.copy())
+        journal.setattr(state.park, "player_positions", {p.colour: -1 for p in state.players})
+        journal.setattr(state, "player", state.players[0])
+
+
+def _apply_walk(state: GameState, move: Walk, journal: Journal):
+    player = state.player
+    park = state.park
+    get_bonus = True
+    if move.destination in park.player_positions.values() and not has_butterfly(player) and player.reputation > 0:
+        get_bonus = move.pay
+        if get_bonus:
+            journal.setattr(player, "reputation", player.reputation - 1)
+
+    journal.setitem(park.player_positions, player.colour, move.destination)
+
+    if get_bonus:
+        bonuses = park.board[move.destination]
+        for bonus in bonuses:
+            apply_bonus(player, bonus, journal)
+        for gain in convert_bonuses(player.get_lead_converters(), bonuses):
+            apply_bonus(player, gain, journal)
+
+    walking = state.players_walking
+    journal.setattr(state, "player", walking[(walking.index(player) + 1) % len(walking)])
+
+
+def _apply_leave(state: GameState, move: Leave, journal: Journal):
+    player = state.player
+    park = state.park
+    journal.setitem(park.player_positions, player.colour, 15)
+    if move.bonus == -1:
+        journal.setattr(player, "reputation", player.reputation - 1)
+    else:
+        for bonus in journal.pop(park.leaving_bonuses, move.bonus):
+            apply_bonus(player, bonus, journal)
+
+    walking = state.players_walking
+    index = walking.index(player)
+    journal.pop(walking, index)
+    if walking:
+        journal.setattr(state, "player", walking[index % len(walking)])
+    else:
+        journal.setattr(state, "stage", Stage.HOME_TIME)
+        journal.setattr(state, "player", None)
+
+
+_APPLY = {Select: _apply_select, Walk: _apply_walk, Leave: _apply_leave}
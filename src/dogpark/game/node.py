@@ -1,156 +1,213 @@
+"""
+Game tree search for the selection and walking phases.
+
+Dogpark is played by up to 4 players, so rather than minimax each node is valued with a vector holding every player's
+utility, and the player to move picks the child that is best for them (max^n). Utilities are each player's share of
+the total score, so they always sum to 1. That gives the only pruning max^n allows (shallow pruning): once the player to
+move is sure of more than the player before them left over, the rest of the node can be skipped.
+
+The search deepens iteratively until it runs out of time, ordering moves by the previous iteration's results, and
+always returns the best move of the deepest completed iteration: no iteration is started after the soft deadline, and
+the one running at the hard deadline is abandoned (see dogpark.game.clock). Positions reached through different move
+orders are only searched once, by storing results in a transposition table keyed by the position's zobrist hash.
+"""
+from __future__ import annotations
+
+from typing import Callable, Optional
+
+from dogpark.game.clock import Deadline
 from dogpark.game.gamestate import GameState
+from dogpark.game.moves import Journal, Move, apply_move, legal_moves
+from dogpark.game.zobrist import TranspositionTable, zobrist_hash
 
+# scores for each player of a position, in the order of GameState.players
+Evaluation = Callable[[GameState], tuple[float, ...]]
 
-class Node:
-    def __init__(self, root=True, message=None, player=0):
-        # A list of the child Nodes, found one level below in the game tree.
-        # NOTE: this field has to be initialized by self.compute_and_get_children().
-        self.children: list[Node] = []
-        # The current state of the game. See the State class for more information.
-        self.state: GameState = None
-        # The parent Node in the game tree.
-        self.parent: Node = None
-        # The action that led to this node in the game tree, represented as an int.
-        # Can be transformed to a string (e.g. "left") using ACTION_TO_STR in shared.py.
-        self.move = None
-        # This field can be ignored for this assignment.
-        self.probability = 1.0
-
-        if root:
-            # Initialize the following fields:
-            #   self.depth (the depth level at the current node - 0 at the root)
-            #   self.player (the current player's index; MAX is 0 and MIN is 1)
-            self.initialize_root(message, player)
-
-    def add_child(self, state: State, move: int, depth: int = 0, observations: dict = {}, probability: float = 1.0):
-        """
-        Add a new node as a child of current node
-        :param state: child's state
-        :param move: child's move
-        :param probability: probability of accessing child
-        :param depth: depth of the child
-        :observations: observations of the game
-        :return:
-        """
-        new_node = self.__class__(root=False)
-        new_node.state = state
-        new_node.parent = self
-        new_node.move = move
-        new_node.depth = depth
-        new_node.observations = observations
-        self.children.append(new_node)
-
-        new_node.probability = probability
-        return new_node
-
-    def initialize_root(self, curr_state, player):
-        """
-        Initialize root node.
-        :param curr_state: parsed dict coming from game_controller
-        :return:
-        """
+# nodes are only kept in memory to this depth, deeper than that the search just walks through the moves
+TREE_DEPTH = 4
+# stored as the depth of transposition table entries whose search reached the end of the walk
+FULL_DEPTH = 1 << 16
 
-        self.depth = 0
-        self.player = player  # Root's player
-        obs = curr_state["observations"]
-        keys = sorted(obs.keys())
-        obs = np.array([np.array(obs[k]) for k in keys])
-        obs = obs.T
-        obs = {i: j.tolist() for i, j in enumerate(obs)}
-        self.observations = obs
-        # Translate message state into state object
-        curr_state_s = State(len(curr_state["fishes_positions"].keys()))
-        curr_state_s.set_player(self.player)
-        curr_state_s.set_hook_positions(
-            (*curr_state["hooks_positions"][0], *curr_state["hooks_positions"][1]))
-        curr_state_s.set_caught(
-            (curr_state["caught_fish"][0], curr_state["caught_fish"][1]))
-        for i, f in curr_state["fishes_positions"].items():
-            curr_state_s.set_fish_positions(i, f)
-
-        # Set score of players
-        player_scores = curr_state["player_scores"]
-        curr_state_s.set_player_scores(player_scores[0], player_scores[1])
-
-        # Set score, i.e. points, for fishes
-        fish_scores = curr_state["fish_scores"]
-        curr_state_s.set_fish_scores(fish_scores)
-
-        self.state = curr_state_s  # Root's state object
-
-    def compute_and_get_children(self) -> List[Node]:
-        """
-        Populate the node with its children. Then return them.
-        :param:
-        :return: list of children nodes
-        """
 
-        if len(self.observations) == self.depth:  # Cannot compute children any longer
-            return []
+def heuristic_scores(state: GameState) -> tuple[float, ...]:
+    """Reputation after the coming home time, plus half a reputation per resource"""
+    forecast = state.current_forecast()
+    loss = 2 if forecast == 8 else 0 if forecast == 9 else 1
+    return tuple(
+        p.reputation
+        + 2 * len(p.lead)
+        - loss * sum(state.walked[dog] == 0 for dog in p.kennel)
+        + sum(p.resources.values()) / 2
+        for p in state.players
+    )
 
-        if len(self.children) != 0:  # If we already compute the children
-            return self.children
 
-        current_player = self.state.get_player()
-        caught = self.state.get_caught()
-        if caught[current_player] is not None:
-            # Next action is always up for the current player
-            new_state = self.compute_next_state(self.state, 1, self.observations[self.depth])
-            self.add_child(new_state, 1, self.depth + 1, self.observations)
-        else:
-            # Any action is possible
-            for act in range(5):
-                new_state = self.compute_next_state(
-                    self.state, act, self.observations[self.depth])
-                self.add_child(new_state, act, self.depth + 1, self.observations)
+def utilities(scores: tuple[float, ...]) -> tuple[float, ...]:
+    """Turn scores into shares of the total, shifted so that no share is negative"""
+    offset = 1 - min(min(scores), 0)
+    total = sum(scores) + offset * len(scores)
+    return tuple((score + offset) / total for score in scores)
+
+
+class SearchTimeout(Exception):
+    pass
 
+
+class Node:
+    def __init__(self, move: Optional[Move] = None, parent: Optional[Node] = None):
+        # The move that led to this node, None at the root
+        self.move = move
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
+        # A list of the child Nodes, found one level below in the game tree.
+        # NOTE: this field has to be initialized by self.compute_and_get_children().
+        self.children: Optional[list[Node]] = None
+        # The utility of this node for every player, from the latest search through it
+        self.values: Optional[tuple[float, ...]] = None
+
+    def compute_and_get_children(self, state: GameState) -> list[Node]:
+        """Populate the node with a child for every legal move in the given state (the state at this node)"""
+        if self.children is None:
+            self.children = [Node(move, self) for move in legal_moves(state)]
         return self.children
 
-    def compute_next_state(self, current_state, act, observations):
+    def order_children(self, player: int):
+        """Put the children that were best for the player to move first, so the next search prunes more"""
+        self.children.sort(key=lambda child: -1.0 if child.values is None else child.values[player], reverse=True)
+
+
+class MaxnSearch:
+    """
+    Iterative deepening max^n search from the given state. The state is changed during the search, but is always
+    restored again, even when the search times out.
+    """
+
+    def __init__(
+        self,
+        state: GameState,
+        evaluate: Evaluation = heuristic_scores,
+        time_limit: float = 0.1,
+        max_depth: int = 64,
+        table: Optional[TranspositionTable] = None,
+        deadline: Optional[Deadline] = None,
+    ):
+        """Searches for time_limit seconds from when search is called, or until the deadline if one is given"""
+        self.state = state
+        self.evaluate = evaluate
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        # pass a table to share it between searches, entries from earlier searches are only used for move ordering
+        self.table = TranspositionTable() if table is None else table
+
+        self.root = Node()
+        self.journal = Journal()
+        self.player_index = {id(player): i for i, player in enumerate(state.players)}
+        self.nodes = 0  # positions visited, across all iterations
+        self.depth = 0  # depth of the deepest completed iteration
+        self.deadline = deadline
+        self.cut_off = False  # if the current iteration stopped anywhere before the end of the walk
+        self.finished = False  # if the whole tree has been searched
+
+    def search(self) -> Optional[Move]:
         """
-        Given a state and an action, compute the next state. Add the next observations as well.
-        :param current_state: current state object instance
-        :param act: integer of the move
-        :param observations: list of observations for current fish
-        :return:
+        The best move for the player to move, or None if there are no moves to make. Searching again (with a new
+        deadline) carries on deepening from the last completed iteration.
         """
-        current_player = current_state.get_player()
-        next_player = 1 - current_player
-        fish_states = current_state.get_fish_positions()
-        hook_states = current_state.get_hook_positions()
-        new_state = State(len(fish_states.keys()))
-        new_state.set_player(next_player)
-        current_fishes_on_rod = current_state.get_caught()
-        self.compute_new_fish_states(new_state, fish_states, observations, current_player,
-                                     fishes_on_rod=current_fishes_on_rod)
-        new_hook_positions = self.compute_new_hook_states(
-            hook_states, current_player, ACT_TO_MOVES[act])
-        new_state.set_hook_positions(new_hook_positions)
-
-        # Get player scores for new state
-        score_p0, score_p1 = current_state.get_player_scores()
-
-        # Set fish scores for new state
-        new_state.set_fish_scores(current_state.get_fish_scores())
-
-        # Compute the fish that are currently caught by players
-        next_caught_fish, pull_in_fishes = compute_caught_fish(new_state, current_fishes_on_rod)
-
-        # Update player scores and remove fishes that are caught and at the surface
-        fish_score_points = new_state.get_fish_scores()
-        for i_player, fish_number in enumerate(pull_in_fishes):
-            if fish_number is not None:
-                if i_player == 0:
-                    score_p0 += fish_score_points[fish_number]
-                else:
-                    score_p1 += fish_score_points[fish_number]
-
-                # Remove fish
-                new_state.remove_fish(fish_number)
-
-        # Update players scores
-        new_state.set_player_scores(score_p0, score_p1)
-
-        new_state.set_caught(next_caught_fish)
-
-        return new_state
\ No newline at end of file
+        if self.deadline is None:
+            self.deadline = Deadline(self.time_limit)
+        deadline = self.deadline
+        if self.nodes == 0:
+            self.state.zobrist = zobrist_hash(self.state)
+            self.table.new_search()
+        for depth in range(self.depth + 1, self.max_depth + 1):
+            if self.finished or (depth > 1 and deadline.soft_passed()):
+                break
+            self.cut_off = False
+            try:
+                self._maxn(self.root, depth, -1, 0.0)
+            except SearchTimeout:
+                self.journal.undo()
+                break
+            self.depth = depth
+            if not self.cut_off:
+                self.finished = True  # so deeper iterations won't change anything
+
+        return self.best_move()
+
+    def best_move(self) -> Optional[Move]:
+        if not self.root.children:
+            return None
+        # the root's children are sorted after every completed iteration
+        return self.root.children[0].move
+
+    def _maxn(self, node: Optional[Node], depth: int, parent_player: int, parent_best: float) -> tuple[float, ...]:
+        self.nodes += 1
+        if self.nodes & 255 == 0 and self.deadline.hard_passed():
+            raise SearchTimeout()
+
+        state = self.state
+        if state.player is None:
+            return utilities(self.evaluate(state))
+        if depth == 0:
+            self.cut_off = True
+            return utilities(self.evaluate(state))
+
+        key = state.zobrist
+        entry = self.table.lookup(key)
+        if (
+            entry is not None
+            and entry.exact
+            and entry.depth >= depth
+            and entry.generation == self.table.generation
+            and node is not self.root
+        ):
+            if entry.depth < FULL_DEPTH:
+                self.cut_off = True
+            return entry.values
+
+        if node is not None:
+            children = node.compute_and_get_children(state)
+            moves = [child.move for child in children]
+        else:
+            children = None
+            moves = legal_moves(state)
+            if entry is not None and entry.move in moves:
+                # try the best move from an earlier search first
+                moves.remove(entry.move)
+                moves.insert(0, entry.move)
+        if not moves:
+            return utilities(self.evaluate(state))
+
+        # find out whether this subtree is cut off by the depth, to know what depth to store its values at
+        cut_off = self.cut_off
+        self.cut_off = False
+
+        player = self.player_index[id(state.player)]
+        best = None
+        best_move = None
+        pruned = False
+        for i, move in enumerate(moves):
+            mark = self.journal.mark()
+            apply_move(state, move, self.journal)
+            child = children[i] if children is not None and node.depth + 1 < TREE_DEPTH else None
+            values = self._maxn(child, depth - 1, player, 0.0 if best is None else best[player])
+            self.journal.undo(mark)
+            if children is not None:
+                children[i].values = values
+
+            if best is None or values[player] > best[player]:
+                best = values
+                best_move = move
+                # shallow pruning: the player before us can get at most what is left over here, which is no better
+                # than what they already have
+                if player != parent_player and best[player] >= 1 - parent_best:
+                    pruned = True
+                    break
+
+        self.table.store(key, depth if self.cut_off else FULL_DEPTH, best, best_move, exact=not pruned)
+        self.cut_off = self.cut_off or cut_off
+
+        if node is not None:
+            node.values = best
+            node.order_children(player)
+        return best
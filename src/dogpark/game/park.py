@@ -1,83 +1,131 @@
-import importlib.resources
-import random
-from itertools import chain
-from typing import List
+import copy
+from typing import NamedTuple
 
-import yaml
+from dogpark.game.cards import load_cards
 
-with open(importlib.resources.files("dogpark.game") / "parks.yaml") as f:
-    PARKS = yaml.safe_load(f)
+PARKS = load_cards("parks.yaml")
+
+
+# the indices are the positions on the board, where the lower path is 0-9 and the upper is 10-14
+BOARD: tuple[tuple[str, ...], ...] = (
+    ("STICK",),
+    ("BALL",),
+    ("TOY",),
+    ("TREAT",),
+    ("LOOK",),
+    ("BALL",),
+    ("SWAP",),
+    ("TOY",),
+    ("TREAT",),
+    ("STICK", "STICK"),
+    ("STICK",),
+    ("REP",),
+    ("LOOK",),
+    ("REP",),
+    ("BALL", "BALL"),
+)
+
+
+class ParkTemplate(NamedTuple):
+    """Everything about a park card that never changes, shared by every Park made from that card"""
+
+    board: tuple[tuple[str, ...], ...]
+    location_bonuses: tuple[str, ...]
+    # destinations reachable from each position, indexed by position + 1 so that the start position -1 is at index 0
+    moves: tuple[tuple[int, ...], ...]
+
+
+def _reachable(board: tuple[tuple[str, ...], ...], position: int) -> tuple[int, ...]:
+    # given an existing position -1 to 15, return the possible positions to move to
+    # since a space can be a skipped space, this changes how far away other positions are.
+    # a player can always move a distance of 4, but that doesn't count skips.
+    # Also, the board isnt just 0-14, but there is an upper and lower path, so position 9
+    # goes straight to position 15, and instead position 4 branches off to either position 5 or 10
+    # position 15 being "available" means leaving the game board
+
+    def add_targets(targets, pos, dist=5):
+        if dist == 0 or pos > 15:
+            return
+        if 0 <= pos < len(board) and board[pos] == ("SKIP",):
+            dist += 1  # skips add 1 to the distance
+        else:
+            targets.add(pos)
+        if pos == 4:  # branch
+            add_targets(targets, 10, dist - 1)
+        if pos == 9:  # "branch"
+            add_targets(targets, 15, dist - 1)
+            return  # don't go to 10
+        add_targets(targets, pos + 1, dist - 1)
+
+    possible = set()
+    add_targets(possible, position)
+    possible.discard(position)  # you can't stay in the same place
+
+    return tuple(sorted(possible))
+
+
+_TEMPLATES: dict[tuple, ParkTemplate] = {}
+
+
+def park_template(modifiers: dict) -> ParkTemplate:
+    """Build the board and move table for a park card once, and reuse it for every later Park with that card"""
+    key = tuple(sorted((pos, tuple(bonus)) for pos, bonus in modifiers.items()))
+    template = _TEMPLATES.get(key)
+    if template is None:
+        board = list(BOARD)
+        for pos, bonus in key:
+            if bonus == ("SKIP",):  # if the bonus is skip, we replace the existing bonus
+                board[pos] = bonus
+            else:
+                board[pos] += bonus
+        board = tuple(board)
+
+        template = ParkTemplate(
+            board=board,
+            # saved so can be used for some forecasts
+            location_bonuses=tuple(b for _, bonus in key for b in bonus if b not in ("SKIP", "LOOK", "SWAP")),
+            moves=tuple(_reachable(board, pos) for pos in range(-1, 16)),
+        )
+        _TEMPLATES[key] = template
+    return template
+
+
+for _modifiers in PARKS.values():
+    park_template(_modifiers)
 
 
 class Park:
     def __init__(self, modifiers: dict, num_players: int):
         """
         Parks contain a map of all locations. each one starts the same, and then we add a few extra
-        resources to each one based on the park card drawn from parks.yaml
+        resources to each one based on the park card drawn from parks.yaml. The board itself is shared between all
+        parks drawn from the same card, so it must not be modified.
         """
-        # the indices are the positions on the board, where the lower path is 0-9 and the upper is 10-14
-        self.board = [
-            ["STICK"],
-            ["BALL"],
-            ["TOY"],
-            ["TREAT"],
-            ["LOOK"],
-            ["BALL"],
-            ["SWAP"],
-            ["TOY"],
-            ["TREAT"],
-            ["STICK", "STICK"],
-            ["STICK"],
-            ["REP"],
-            ["LOOK"],
-            ["REP"],
-            ["BALL", "BALL"],
-        ]
-        # saved so can be used for some forecasts
-        self.location_bonuses = [b for b in chain(modifiers.values()) if b not in ("SKIP", "LOOK", "SWAP")]
+        template = park_template(modifiers)
+        self.modifiers = modifiers  # the park card
+        self.board = template.board
+        self.location_bonuses = template.location_bonuses
+        self._moves = template.moves
         self.is_special = False
-        for pos, bonus in modifiers.items():
-            if bonus == ["SKIP"]:  # if the bonus is skip, we replace the existing bonus
-                self.board[pos] = ["SKIP"]
-            else:
-                self.board[pos].extend(bonus)
 
-        self.player_positions: dict[str, int] = {}  # colour: position
-        self.leaving_bonuses: List[List[str]] = []  # these get consumed when a player leaves the park
+        self.player_positions: dict[str, int] = {}  # colour: position, 15 once they have left
+        self.leaving_bonuses: list[tuple[str, ...]] = []  # these get consumed when a player leaves the park
         if num_players == 4:
-            self.leaving_bonuses.append(["REP", "REP", "REP"])
+            self.leaving_bonuses.append(("REP", "REP", "REP"))
         self.leaving_bonuses += [
-            ["REP", "REP"],
-            ["REP", "WALKED SWAP"],
+            ("REP", "REP"),
+            ("REP", "WALKED SWAP"),
         ]
 
-    def possible_moves(self, position: int) -> list[int]:
-        # given an existing position -1 to 14, return a list of possible positions to move to
-        # since a space can be a skipped space, this changes how far away other positions are.
-        # a player can always move a distance of 4, but that doesn't count skips.
-        # Also, the board isnt just 0-14, but there is an upper and lower path, so position 9
-        # goes straight to position 15, and instead position 4 branches off to either position 5 or 10
-        # position 15 being "available" means leaving the game board
-
-        def add_targets(targets, pos, dist=5):
-            if dist == 0 or pos > 15:
-                return
-            if 0 <= pos < len(self.board) and self.board[pos] == ["SKIP"]:
-                dist += 1  # skips add 1 to the distance
-            else:
-                targets.add(pos)
-            if pos == 4:  # branch
-                add_targets(targets, 10, dist - 1)
-            if pos == 9:  # "branch"
-                add_targets(targets, 15, dist - 1)
-                return  # don't go to 10
-            add_targets(targets, pos + 1, dist - 1)
-
-        possible = set()
-        add_targets(possible, position)
-        possible.remove(position)  # you can't stay in the same place
-
-        return list(possible)
+    def clone(self) -> "Park":
+        new = copy.copy(self)
+        new.player_positions = self.player_positions.copy()
+        new.leaving_bonuses = self.leaving_bonuses.copy()
+        return new
+
+    def possible_moves(self, position: int) -> tuple[int, ...]:
+        """given an existing position -1 to 15, return the positions that can be moved to"""
+        return self._moves[position + 1]
 
     def __repr__(self):
         return f"{self.board}"
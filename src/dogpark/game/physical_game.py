@@ -1,12 +1,45 @@
 import json
 
-from dogpark.game.dog import reload_dogs
+from dogpark.game.clock import Clock, TimeControl
+from dogpark.game.dog import DOG_IDS, Breed, reload_dogs
+from dogpark.game.events import ObjectiveChosen
 from dogpark.game.game import Dogpark, get_ai
 from dogpark.game.park import Park
+from dogpark.game.ponder import Ponderer
 
 
 class PhysicalDogpark(Dogpark):
 
+    def __init__(self, *args, time_control: TimeControl = TimeControl(), ponder: bool = True, **kwargs):
+        """
+        The arguments are those of Dogpark, and time_control is how long the AIs at the table may think for (see
+        dogpark.game.clock). Each AI that searches gets a clock of its own. If ponder, the AIs think ahead while the
+        human players enter their moves (see dogpark.game.ponder).
+        """
+        self.time_control = time_control
+        self.ponderer = Ponderer() if ponder else None
+        super().__init__(*args, **kwargs)
+
+    def play(self):
+        self.start_clocks()  # a restored game is seated already
+        super().play()
+
+    def start_clocks(self):
+        for player in self.state.players:
+            if hasattr(player, "clock") and player.clock is None:
+                player.clock = Clock(self.time_control)
+        if self.ponderer is not None and self.ponderer not in self.state.observers:
+            self.state.observers.append(self.ponderer)
+
+    def end_game(self):
+        super().end_game()
+        for player in self.state.players:
+            clock = getattr(player, "clock", None)
+            if clock is not None and clock.decisions:
+                print(f"{player.colour} thinking time: {clock.report()}")
+            if self.ponderer is not None and getattr(player, "ponders", False):
+                print(f"{player.colour} {self.ponderer.report(player)}")
+
     def setup(self):
         """Set up a game by asking the user what cards were drawn in the physical game"""
 
@@ -23,12 +56,13 @@ class PhysicalDogpark(Dogpark):
                 players[colour] = HumanPlayer(self.state, colour, is_physical=True)
 
         self.state.players = list(players.values())
+        self.start_clocks()
 
         if input("Are you playing with Forecast cards? (y/n) ").lower() == "y":
             self.state.forecasts = [int(input(f"Forecast {i}: ")) for i in range(1, 5)]  # or None
 
         print("please enter the list of breed experts in order, high to low, seperated by commas:")
-        self.state.breed_experts = input("Breed Experts: ").replace(" ", "").split(",")
+        self.state.breed_experts = [Breed(b) for b in input("Breed Experts: ").replace(" ", "").split(",")]
 
         self.draw_dogs()
 
@@ -36,23 +70,25 @@ class PhysicalDogpark(Dogpark):
 
         for player in self.state.players:
             obj = player.choose_objective()
-            if self.show_hidden and obj is not None:
-                print(f"{player.colour} chose objective {obj}")
+            if obj is not None and self.state.observers:
+                self.state.emit(ObjectiveChosen(player, obj))
 
     def draw_dogs(self):
         print("Please enter the names of the dogs drawn, seperated by commas:")
         dog_names = input("Dogs: ").replace(" ", "").split(",")
-        if any([name not in self.state.dogs_deck for name in dog_names]):
-            input("Dog name not found, please add it and press enter to continue")
-            self.state.dogs_deck = reload_dogs(from_file=True)
+        if any([name not in DOG_IDS for name in dog_names]):
+            input("Dog name not found, please add it to dogs.yaml and press enter to continue")
+            new_dogs = reload_dogs()
+            self.state.dogs_deck += new_dogs
+            self.state.walked += bytes(len(new_dogs))
             self.draw_dogs()
             return
-        self.state.dogs = {name: self.state.dogs_deck.pop(name) for name in dog_names}
+        self.state.dogs = [DOG_IDS[name] for name in dog_names]
+        for dog in self.state.dogs:
+            self.state.dogs_deck.remove(dog)
 
     def draw_park(self):
         print("Please enter the dictionary representing the park modifiers drawn:")
         park_str = input("Park: ")
-        park_json = json.loads(park_str)
-        for key in park_json:  # convert string keys to int keys
-            park_json[int(key)] = park_json.pop(key)
+        park_json = {int(key): bonus for key, bonus in json.loads(park_str).items()}  # json keys are strings
         self.state.park = Park(park_json, self.state.num_players)
\ No newline at end of file
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import copy
+import random
 from abc import abstractmethod, ABC
-from typing import Optional
+from typing import NamedTuple, Optional
 
 from dogpark.game import ANY
+from dogpark.game.dog import BREED_INDEX, COLLECTORS, DOGS, Ability, Breed
+from dogpark.game.events import BonusChosen, BonusesTaken, DestinationChosen, DogsSelected, LeavingBonusChosen, Swapped
 from dogpark.game.park import Park
 from dogpark.game.gamestate import GameState
 
@@ -11,12 +15,17 @@ from dogpark.game.gamestate import GameState
 class Player(ABC):
     """A base class player of dogpark"""
 
-    def __init__(self, gamestate: GameState, colour: str, is_physical: bool = False):
+    def __init__(
+        self, gamestate: GameState, colour: str, is_physical: bool = False, rng: Optional[random.Random] = None
+    ):
+        """rng is the player's own source of randomness, by default seeded from the game's"""
         self.game = gamestate
+        self.rng = rng if rng is not None else random.Random(gamestate.rng.getrandbits(64))
         self.is_physical = is_physical  # governs certain print and input behaviour
         self.colour = colour
-        self.kennel: dict[str, dict] = {}
-        self.lead: dict[str, dict] = {}
+        self.kennel: set[int] = set()  # dog ids
+        self.lead: set[int] = set()
+        self.breeds = [0] * len(Breed)  # dogs of each breed in the kennel, in the order of Breed
         self.reputation = 5
         self.resources = {
             "STICK": 2,
@@ -27,34 +36,37 @@ class Player(ABC):
         self.objective: Optional[int] = None  # may be unknown for physical players
         self.lead_converters = None  # used for playmate, go fetch, and obedient
 
-    def get_lead_abilities(self):
+    def get_lead_abilities(self) -> dict[Ability, list[str]]:
+        """The resources named by the crafty and eager dogs on the lead"""
         abilities = {}
         for dog in self.lead:
-            ability = self.lead[dog]["a"]
-            if ability.startswith("crafty") or ability.startswith("eager"):
-                name, gain = ability.split("_")
-                if name not in abilities:
-                    abilities[name] = []
-                abilities[name].append(gain)
+            dog = DOGS[dog]
+            if dog.ability is Ability.CRAFTY or dog.ability is Ability.EAGER:
+                abilities.setdefault(dog.ability, []).append(dog.args[0])
         return abilities
 
-    def get_lead_converters(self):
-        # todo: we could hash this
-        converters = []
-        for dog in self.lead:
-            if self.lead[dog]["a"][:8] == "go_fetch":
-                prereq, gain = self.lead[dog]["a"][9:].split("_")
-                converters.append((prereq, gain))
-            elif self.lead[dog]["a"][:8] == "obedient":
-                prereq = self.lead[dog]["a"].split("_")[1]
-                converters.append((prereq, "REP"))
-            elif self.lead[dog]["a"][:8] == "playmate":
-                prereq = self.lead[dog]["a"].split("_")[1]
-                converters.append((prereq, "SWAP"))
-        return converters
+    def get_lead_converters(self) -> list[tuple[str, str]]:
+        return [DOGS[dog].converter for dog in self.lead if DOGS[dog].converter is not None]
+
+    def describe_dogs(self, dogs: set[int]) -> dict[str, int]:
+        """dog names and their walked tokens, for printing"""
+        return {DOGS[dog].name: self.game.walked[dog] for dog in dogs}
+
+    def clone(self, gamestate: GameState) -> Player:
+        """A copy of this player belonging to a cloned game, see GameState.clone"""
+        new = copy.copy(self)
+        new.game = gamestate
+        new.kennel = self.kennel.copy()
+        new.lead = self.lead.copy()
+        new.breeds = self.breeds.copy()
+        new.resources = self.resources.copy()
+        return new
 
     def __repr__(self):
-        return f"{self.colour} - {self.reputation} REP - {self.kennel} - {self.resources} - {self.objective}"
+        return (
+            f"{self.colour} - {self.reputation} REP - {self.describe_dogs(self.kennel)} - {self.resources}"
+            f" - {self.objective}"
+        )
 
     @abstractmethod
     def choose_objective(self, hard: int = None, easy: int = None) -> Optional[int]:
@@ -64,26 +76,41 @@ class Player(ABC):
         """
 
     @abstractmethod
-    def bid(self, available_dogs: dict[str, dict], bids: dict[str, list[tuple[Player, Optional[int]]]]) -> (str, int):
-        """for a given dict of dogs, choose one and return its name and bid amount"""
+    def bid(self, available_dogs: list[int], bids: dict[int, list[tuple[Player, Optional[int]]]]) -> (int, int):
+        """for a given list of dogs, choose one and return its id and bid amount"""
 
     @abstractmethod
-    def choose_dog(self, available_dogs: dict[str, dict]) -> str:
-        """for a given dict of dogs, choose one and return its name, for a cost of 1 rep"""
+    def choose_dog(self, available_dogs: list[int]) -> int:
+        """for a given list of dogs, choose one and return its id, for a cost of 1 rep"""
 
     @abstractmethod
-    def do_selection(self) -> list[str]:
+    def do_selection(self) -> list[int]:
         """Select dogs to put on the lead"""
 
     @abstractmethod
     def apply_bonuses(self, bonuses):
         pass
 
-    @abstractmethod
     def choose_leaving_bonus(self, park: Park) -> list[str]:
         """
-        Called when either the player chooses to leave the park, or they are forced to leave the park.
+        Called when either the player chooses to leave the park, or they are forced to leave the park. Returns the
+        bonuses taken.
         """
+        if len(park.leaving_bonuses) == 0:
+            index, bonuses = -1, ["-1 REP"]  # no leaving bonuses, so player loses 1 rep
+            self.reputation -= 1
+        else:
+            index = self.choose_leaving_bonus_index(park)
+            bonuses = list(park.leaving_bonuses.pop(index))
+        if self.game.observers:
+            self.game.emit(LeavingBonusChosen(self, index, bonuses))
+        if index != -1:
+            self.apply_bonuses(bonuses.copy())
+        return bonuses
+
+    @abstractmethod
+    def choose_leaving_bonus_index(self, park: Park) -> int:
+        """Choose one of the leaving bonuses left in the park, of which there is at least one"""
 
     def apply_bonus(self, bonus: str):
         if bonus in ["STICK", "BALL", "TOY", "TREAT"]:
@@ -92,13 +119,13 @@ class Player(ABC):
             self.reputation += 1
         elif bonus == "LOOK":
             self.game.look(self)
-        elif bonus == "SWAP":
-            self.swap(walked=False)
-        elif bonus == "WALKED SWAP":
-            self.swap(walked=True)
+        elif bonus == "SWAP" or bonus == "WALKED SWAP":
+            walked = bonus == "WALKED SWAP"
+            if self.swap(walked=walked) is None and self.game.observers:
+                self.game.emit(Swapped(self, walked, None, None))  # swaps made are reported by GameState.swap
 
     @abstractmethod
-    def swap(self, walked: bool) -> Optional[tuple[str, str]]:
+    def swap(self, walked: bool) -> Optional[tuple[int, int]]:
         """
         The player must swap one dog from their kennel with a dog in the field (self.game.dogs). Unless stated
         otherwise (walked=True), all the Walked tokens on the dog leaving the players Kennel are discarded.
@@ -106,6 +133,8 @@ class Player(ABC):
 
         If walked=True, then the player places a Walked token on the new dog in their Kennel. This Walked token can
         only be placed on the newly acquired Dog.
+
+        Swaps through self.game.swap, and returns the kennel dog and field dog swapped, or None to not swap.
         """
 
     @abstractmethod
@@ -124,48 +153,47 @@ class Player(ABC):
 
         if destination == 15:
             # choose a leaving bonus
+            park.player_positions[self.colour] = 15
+            if self.game.observers:
+                self.game.emit(DestinationChosen(self, 15, False))
             bonuses = self.choose_leaving_bonus(park)
             return 15, bonuses
 
         # Move the player to the destination, and apply any bonuses if there are no other players, or they have a
         # social_butterfly dog on their lead. Elsewise, they can choose to pay 1 reputation to get the bonus
         get_bonus = True
+        paid = False
         if (
             destination in park.player_positions.values()
-            and not any("social_butterfly" == dog["a"] for dog in self.lead.values())
+            and not any(DOGS[dog].ability is Ability.SOCIAL_BUTTERFLY for dog in self.lead)
             and self.reputation > 0
         ):
-            get_bonus = self.pay_walking_bonus(park, destination)
+            get_bonus = paid = self.pay_walking_bonus(park, destination)
             if get_bonus:
                 self.reputation -= 1
 
         park.player_positions[self.colour] = destination
+        if self.game.observers:
+            self.game.emit(DestinationChosen(self, destination, paid))
 
         bonuses = None
         if get_bonus:
-            bonuses = park.board[destination]
-            self.apply_bonuses(bonuses)
+            bonuses = list(park.board[destination])  # the board is shared between parks, so take a copy
+            self.apply_bonuses(bonuses.copy())
+        else:
+            return destination, bonuses
 
         # resolve any go fetch, obedient, and playmate dogs
-        converters = self.get_lead_converters()
-
-        unconsidered = bonuses.copy()
-        # they can trigger eachother, so we need to loop until there are no more
-        while unconsidered:
-            new = []
-            for prereq, gain in converters.copy():
-                if prereq in unconsidered:
-                    self.apply_bonus(gain)
-                    bonuses.append(gain)
-                    new.append(gain)
-                    converters.remove((prereq, gain))
-
-            unconsidered = new
+        for gain in convert_bonuses(self.get_lead_converters(), bonuses):
+            self.apply_bonus(gain)
+            bonuses.append(gain)
 
+        if self.game.observers:
+            self.game.emit(BonusesTaken(self, bonuses))
         return destination, bonuses
 
     @abstractmethod
-    def look(self, top_cards: dict[str, list[str]]) -> Optional[tuple[str, str]]:
+    def look(self, top_cards: list[int]) -> Optional[tuple[int, int]]:
         """
         The player must look at the top 2 cards of the dog deck. This action is performed publicly. The player then
         may choose to replace a dog in the field with 1 of the dog cards they have drawn. The other dog cards are
@@ -174,7 +202,15 @@ class Player(ABC):
 
     @abstractmethod
     def choose_bonus(self, bonuses: list[str]) -> str:
-        """given a list of bonuses, choose one and return it"""
+        """given a list of bonuses, choose one and return it. The caller applies the chosen bonus."""
+
+    def take_bonus(self, bonuses) -> str:
+        """Choose one of the bonuses on offer and apply it"""
+        bonus = self.choose_bonus(bonuses)
+        if self.game.observers:
+            self.game.emit(BonusChosen(self, bonus))
+        self.apply_bonus(bonus)
+        return bonus
 
     def home_time(self):
         """
@@ -190,128 +226,230 @@ class Player(ABC):
 
         # lose some rep for each dog without a walked token
         loss = 2 if self.game.current_forecast() == 8 else 0 if self.game.current_forecast() == 9 else 1
-        self.reputation -= sum([loss for dog in self.kennel if self.kennel[dog]["w"] == 0])
+        self.reputation -= sum([loss for dog in self.kennel if self.game.walked[dog] == 0])
 
         # return dogs to kennel
+        for dog in self.lead:
+            self.breeds[BREED_INDEX[DOGS[dog].breed]] += 1
         self.kennel.update(self.lead)
-        self.lead = {}
-
-        for dog_dict in self.kennel.values():
-            if self.game.current_forecast() == 2 and dog_dict["b"] == "TE":
-                self.choose_bonus(ANY)
-                self.choose_bonus(ANY)
-            elif self.game.current_forecast() == 4 and dog_dict["b"] == "W":
-                self.choose_bonus(ANY)
+        self.lead = set()
+
+        for dog in self.kennel:
+            breed = DOGS[dog].breed
+            if self.game.current_forecast() == 2 and breed is Breed.TERRIER:
+                self.take_bonus(ANY)
+                self.take_bonus(ANY)
+            elif self.game.current_forecast() == 4 and breed is Breed.WORKING:
+                self.take_bonus(ANY)
                 self.reputation += 1
-            elif self.game.current_forecast() == 5 and dog_dict["b"] == "TO":
+            elif self.game.current_forecast() == 5 and breed is Breed.TOY:
                 self.reputation += 3
 
-    def add_dog_to_kennel(self, dog: str, dog_dict: dict[str, dict]):
-        self.kennel[dog] = dog_dict
+    def add_dog_to_kennel(self, dog: int):
+        self.kennel.add(dog)
+        self.breeds[BREED_INDEX[DOGS[dog].breed]] += 1
         if self.game.current_forecast() == 7:
-            if dog_dict["b"] == "U":
+            if DOGS[dog].breed is Breed.UTILITY:
                 self.reputation += 1
-                self.choose_bonus(ANY)
+                self.take_bonus(ANY)
 
-    def final_score(self, print_breakdown: bool = False) -> int:
-        """
-        Calculate the final score for this player.
+    def remove_dog_from_kennel(self, dog: int):
+        self.kennel.remove(dog)
+        self.breeds[BREED_INDEX[DOGS[dog].breed]] -= 1
 
-        used at the end of the game, but can also be used to calculate the score at any point in the game,
-        as if the game ended at that point.
+    def put_on_lead(self, dog: int):
+        self.remove_dog_from_kennel(dog)
+        self.lead.add(dog)
+
+    def finish_selection(self):
         """
+        Called once the dogs on the lead have been paid for: every dog on the lead gets a walked token, eager dogs
+        refund their resource, and forecast 1 gives a location bonus for each gundog.
+        """
+        if self.game.observers:
+            self.game.emit(DogsSelected(self, sorted(self.lead), tuple(self.resources[r] for r in ANY)))
+        for dog in self.lead:
+            self.game.walked[dog] += 1
 
-        def printif(*args):
-            if print_breakdown:
-                print(*args)
+        lead_abilities = self.get_lead_abilities()
+        for resource in lead_abilities.get(Ability.EAGER, []):
+            self.resources[resource] += 1
 
-        printif(f"Final score for {self.colour}:")
+        if self.game.current_forecast() == 1 and self.game.park.location_bonuses:
+            for dog in self.lead | self.kennel:
+                if DOGS[dog].breed is Breed.GUNDOG:
+                    self.take_bonus(self.game.park.location_bonuses)
 
-        rep = self.reputation
-        printif(f"  Reputation: {rep}")
+    def final_score(self, print_breakdown: bool = False) -> int:
+        """
+        Calculate the final score for this player.
 
-        # Player assigns resources to dogs. There isn't actually any optimization to be done here so we can just
-        # calculate it.
-        for dog in self.kennel.values():
-            ability = dog["a"]
+        used at the end of the game, but can also be used to calculate the score at any point in the game,
+        as if the game ended at that point. See score_breakdown, which this doesn't change anything through.
+        """
+        breakdown = score_breakdown(self)
+        if print_breakdown:
+            self.print_score(breakdown)
+        return breakdown.total
+
+    def print_score(self, breakdown: ScoreBreakdown):
+        print(f"Final score for {self.colour}:")
+        print(f"  Reputation: {breakdown.reputation}")
+        # show what each dog scored, assigning resources to collectors the same way score_breakdown does
+        unassigned = self.resources.copy()
+        for dog in self.kennel:
+            ability = DOGS[dog].ability
             dog_rep = 0
-            if ability == "pack_dog":
-                dog_rep = [d["b"] == dog["b"] for d in self.kennel.values()].count(True) * 2
-            elif ability == "raring_to_go":
-                dog_rep = dog["w"] * 2
-            elif ability == "sociable":
-                dog_rep = len(set([d["b"] for d in self.kennel.values()]))
-            elif ability in ("stick_chaser", "ball_hog", "toy_collector", "treat_lover"):
-                resource = ability.split("_")[0].upper()
-                modifier = 2 if resource in ("TREAT", "TOY") else 1
-                # add up to 6 of each
-                assigned = min(6, self.resources[resource])
-                self.resources[resource] -= assigned
-                dog_rep = assigned * modifier
-
+            if ability is Ability.PACK_DOG:
+                dog_rep = self.breeds[BREED_INDEX[DOGS[dog].breed]] * 2
+            elif ability is Ability.RARING_TO_GO:
+                dog_rep = self.game.walked[dog] * 2
+            elif ability is Ability.SOCIABLE:
+                dog_rep = sum(count > 0 for count in self.breeds)
+            elif ability in COLLECTORS:
+                resource = COLLECTORS[ability]
+                assigned = min(6, unassigned[resource])
+                unassigned[resource] -= assigned
+                dog_rep = assigned * (2 if resource in ("TREAT", "TOY") else 1)
             if dog_rep > 0:
-                printif(f"  {ability.replace('_', ' ').capitalize()} rep: {dog_rep}")
-            rep += dog_rep
-
-        # breed experts
-        breed_rep = self.game.calculate_breed_experts()[self.colour][1]
-        printif(f"  Breed experts: {breed_rep}")
-
-        # objectives
-        objective_rep = 0
-        if self.objective is not None:  # if unknown, assume 0
-            # TODO: at the end of the game, we actually do need this
-            objective_rep = objective_score(self, self.objective, self.game.num_players)
-            printif(f"  Objective: {objective_rep}")
-
-        # 1 rep for each 5 remaining resources
-        remaining_resource_rep = sum(self.resources.values()) // 5
-        printif(f"  Remaining resources rep: {remaining_resource_rep}")
-
-        rep += breed_rep + objective_rep + remaining_resource_rep
-
-        printif(f"Total: {rep}")
-
-        return rep
+                print(f"  {ability.value.replace('_', ' ').capitalize()} rep: {dog_rep}")
+        print(f"  Breed experts: {breakdown.breed_experts}")
+        if self.objective is not None:
+            print(f"  Objective: {breakdown.objective}")
+        print(f"  Remaining resources rep: {breakdown.resources}")
+        print(f"Total: {breakdown.total}")
+
+
+# looked up once, since getting members from an Enum class is slow in a loop that runs for every evaluation
+_PACK_DOG, _RARING_TO_GO, _SOCIABLE = Ability.PACK_DOG, Ability.RARING_TO_GO, Ability.SOCIABLE
+_STICK_CHASER, _BALL_HOG = Ability.STICK_CHASER, Ability.BALL_HOG
+_TOY_COLLECTOR, _TREAT_LOVER = Ability.TOY_COLLECTOR, Ability.TREAT_LOVER
+
+
+class ScoreBreakdown(NamedTuple):
+    reputation: int
+    dogs: int  # from the abilities of the dogs in the kennel
+    breed_experts: int
+    objective: int  # 0 if the objective is unknown
+    resources: int  # 1 REP for each 5 resources left over after collectors take theirs
+
+    @property
+    def total(self) -> int:
+        return self.reputation + self.dogs + self.breed_experts + self.objective + self.resources
+
+
+def score_breakdown(player: Player) -> ScoreBreakdown:
+    """
+    The final score of a player if the game ended now. Nothing about the player or the game is changed, and nothing
+    is built up along the way, so this is cheap enough to evaluate positions with during a search.
+    """
+    walked = player.game.walked
+    breeds = player.breeds
+    dogs = 0
+    # each collector takes up to 6 of its resource
+    sticks = balls = toys = treats = 0
+    for dog in player.kennel:
+        ability = DOGS[dog].ability
+        if ability is _PACK_DOG:
+            dogs += breeds[BREED_INDEX[DOGS[dog].breed]] * 2
+        elif ability is _RARING_TO_GO:
+            dogs += walked[dog] * 2
+        elif ability is _SOCIABLE:
+            dogs += sum(count > 0 for count in breeds)
+        elif ability is _STICK_CHASER:
+            sticks += 6
+        elif ability is _BALL_HOG:
+            balls += 6
+        elif ability is _TOY_COLLECTOR:
+            toys += 6
+        elif ability is _TREAT_LOVER:
+            treats += 6
+
+    resources = player.resources
+    sticks = min(sticks, resources["STICK"])
+    balls = min(balls, resources["BALL"])
+    toys = min(toys, resources["TOY"])
+    treats = min(treats, resources["TREAT"])
+    dogs += sticks + balls + 2 * (toys + treats)
+    remaining = sum(resources.values()) - sticks - balls - toys - treats
+
+    objective = 0
+    if player.objective is not None:  # if unknown, assume 0
+        objective = objective_score(player, player.objective, player.game.num_players)
+
+    return ScoreBreakdown(player.reputation, dogs, breed_expert_awards(player)[1], objective, remaining // 5)
+
+
+def breed_expert_awards(player: Player) -> tuple[int, int]:
+    """The number of breed expert awards the player would win now, and the points from them. Ties win."""
+    awards = points = 0
+    players = player.game.players
+    for i, breed in enumerate(player.game.breed_experts):
+        b = BREED_INDEX[breed]
+        count = player.breeds[b]
+        for other in players:
+            if other.breeds[b] > count:
+                break
+        else:
+            awards += 1
+            points += 8 - i
+    return awards, points
+
+
+def convert_bonuses(converters: list[tuple[str, str]], bonuses: list[str]) -> list[str]:
+    """
+    The extra bonuses gained from go fetch, obedient and playmate dogs when the given bonuses are taken, in the order
+    they are gained. Each dog converts at most once, but the gains can trigger other dogs.
+    """
+    converters = converters.copy()
+    gained = []
+    unconsidered = bonuses
+    # they can trigger eachother, so we need to loop until there are no more
+    while unconsidered:
+        new = []
+        for prereq, gain in converters.copy():
+            if prereq in unconsidered:
+                gained.append(gain)
+                new.append(gain)
+                converters.remove((prereq, gain))
+
+        unconsidered = new
+    return gained
 
 
 def objective_score(player: Player, objective: int, num_players: int) -> int:
     """Returns a score based on if a player has completed a certain objective, can be 0, 3 or 7 REP"""
     if objective in (1, 7, 8):
         # assume 4 player game
-        breeds = {}
-        for dog in player.kennel.values():
-            breed = dog["b"]
-            breeds[breed] = breeds.get(breed, 0) + 1
-            if objective == 1 and breeds[breed] == 4:
-                return 7
-            elif objective == 7 and breeds[breed] == 3:
-                return 3
-            elif objective == 8 and len(breeds) == 4:
-                return 3
+        if objective == 1 and max(player.breeds) >= 4:
+            return 7
+        elif objective == 7 and max(player.breeds) >= 3:
+            return 3
+        elif objective == 8 and sum(count > 0 for count in player.breeds) >= 4:
+            return 3
     elif objective in (2, 6):
         dogs_with_2_walked = 0
-        for dog in player.kennel.values():
-            if dog["w"] >= 2:
+        for dog in player.kennel:
+            if player.game.walked[dog] >= 2:
                 dogs_with_2_walked += 1
                 if objective == 2 and dogs_with_2_walked == 3:
                     return 7
                 elif objective == 6 and dogs_with_2_walked == 2:
                     return 3
     elif objective == 3:
-        walked = sum([dog["w"] for dog in player.kennel.values()])
+        walked = sum(player.game.walked[dog] for dog in player.kennel)
         if walked >= 10:
             return 7
     elif objective in (4, 9):
         breed_experts_required = 3 if num_players == 4 else 4
         if objective == 9:
             breed_experts_required -= 1
-        if player.game.calculate_breed_experts()[player.colour][0] >= breed_experts_required:
+        if breed_expert_awards(player)[0] >= breed_experts_required:
             return 7 if objective == 4 else 3
     elif objective in (5, 10):
         dogs_with_1_walked = 0
-        for dog in player.kennel.values():
-            if dog["w"] >= 1:
+        for dog in player.kennel:
+            if player.game.walked[dog] >= 1:
                 dogs_with_1_walked += 1
                 if objective == 5 and dogs_with_1_walked == 7:
                     return 7
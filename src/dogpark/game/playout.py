@@ -0,0 +1,197 @@
+"""
+Quick playouts of the rest of a game, for Monte Carlo search (see dogpark.ais.ismcts_ai).
+
+A playout plays a copy of a GameState to the end with a cheap random policy, and returns the final scores. The players
+of the copy are turned into PlayoutPlayers first, so that the parts of the game that ask players for decisions (like
+home time bonuses) never reach a human or another AI. Selection and walking are played through dogpark.game.moves.
+
+The stage of the copy says where the playout picks up: SETUP and RECRUITMENT play the bidding rounds from
+GameState.bid_round on, SELECTION and WALKING continue with the player to move, and HOME_TIME plays home time.
+"""
+from __future__ import annotations
+
+import random
+from typing import Optional
+
+from dogpark.game import ANY
+from dogpark.game.gamestate import GameState, Stage
+from dogpark.game.moves import (
+    Journal,
+    Leave,
+    Move,
+    Select,
+    Walk,
+    apply_move,
+    lead_capacity,
+    legal_moves,
+    selection_cost,
+)
+from dogpark.game.park import Park
+from dogpark.game.player import Player
+
+# rough worth of each bonus, for choosing between moves
+BONUS_VALUES = {"REP": 1.0, "STICK": 0.5, "BALL": 0.5, "TOY": 0.5, "TREAT": 0.5}
+# chance of making a uniformly random move rather than the greedy one
+EXPLORATION = 0.25
+
+
+def greedy_bonus(player: Player, bonuses: list[str]) -> str:
+    """Reputation if it is on offer, otherwise the resource the player has least of"""
+    if "REP" in bonuses:
+        return "REP"
+    return min(bonuses, key=lambda bonus: player.resources.get(bonus, 100))
+
+
+class PlayoutPlayer(Player):
+    """Makes quick random decisions for a player of a copied game. Set rng to the generator to draw them from."""
+
+    def choose_objective(self, hard: int = None, easy: int = None) -> Optional[int]:
+        self.objective = easy
+        return easy
+
+    def bid(self, available_dogs: list[int], bids: dict) -> (int, int):
+        return self.rng.choice(available_dogs), 1
+
+    def choose_dog(self, available_dogs: list[int]) -> int:
+        return self.rng.choice(available_dogs)
+
+    def do_selection(self) -> list[int]:
+        return []  # playouts select through dogpark.game.moves
+
+    def apply_bonuses(self, bonuses):
+        for bonus in bonuses:
+            self.apply_bonus(bonus)
+
+    def choose_leaving_bonus_index(self, park: Park) -> int:
+        return 0  # playouts walk through dogpark.game.moves
+
+    def swap(self, walked: bool) -> Optional[tuple[int, int]]:
+        return None
+
+    def choose_destination(self, park: Park) -> int:
+        return 15
+
+    def pay_walking_bonus(self, park: Park, destination: int) -> bool:
+        return False
+
+    def look(self, top_cards: list[int]) -> Optional[tuple[int, int]]:
+        return None
+
+    def choose_bonus(self, bonuses: list[str]) -> str:
+        return greedy_bonus(self, bonuses)
+
+
+def play_bidding(state: GameState, bids: Optional[dict] = None):
+    """Play the rest of the current bidding round: every player who hasn't bid yet bids, then the bids are resolved"""
+    if bids is None:
+        bids = {dog: [] for dog in state.dogs}
+    bidders = {id(player) for dog_bids in bids.values() for player, _ in dog_bids}
+    for player in state.players:
+        if id(player) not in bidders:
+            dog, amount = player.bid(state.dogs, bids)
+            bids[dog].append((player, amount))
+    finish_bidding(state, bids)
+
+
+def finish_bidding(state: GameState, bids: dict):
+    """
+    Resolve the bids like Dogpark.bidding, then every player still short of a dog for this round picks one. Draws the
+    dogs for the next bidding round, and moves on to selection after the second.
+    """
+    for dog, dog_bids in bids.items():
+        if dog_bids:
+            winner, amount = max(dog_bids, key=lambda x: x[1])
+            winner.reputation -= amount
+            state.dogs.remove(dog)
+            winner.add_dog_to_kennel(dog)
+
+    # every player gains one dog per bidding round
+    owed = 2 * (state.round - 1) + state.bid_round
+    for player in state.players:
+        if len(player.kennel) < owed and state.dogs:
+            dog = player.choose_dog(state.dogs)
+            player.reputation -= 1
+            state.dogs.remove(dog)
+            player.add_dog_to_kennel(dog)
+
+    state.draw_dogs()
+    if state.bid_round == 1:
+        state.bid_round = 2
+    else:
+        state.stage = Stage.SELECTION
+        state.player = state.players[0]
+
+
+def play_home_time(state: GameState, rng: random.Random):
+    """Home time, and the start of the next round. The round is left at 4 after the last home time."""
+    for player in state.players:
+        player.home_time()
+    if state.round == 4:
+        return
+
+    state.draw_park(rng=rng)
+    state.players.append(state.players.pop(0))
+    state.round += 1
+    state.stage = Stage.RECRUITMENT
+    state.bid_round = 1
+
+
+def policy_selection(state: GameState, rng: random.Random) -> Select:
+    """Put as many dogs on the lead as the player can afford, trying the dogs with the fewest walked tokens first"""
+    player = state.player
+    dogs = list(player.kennel)
+    rng.shuffle(dogs)
+    dogs.sort(key=lambda dog: state.walked[dog])
+    chosen = ()
+    cost = (0,) * len(ANY)
+    capacity = lead_capacity(state)
+    for dog in dogs:
+        if len(chosen) == capacity:
+            break
+        new_cost = selection_cost(state, player, chosen + (dog,))
+        if new_cost is not None:
+            chosen += (dog,)
+            cost = new_cost
+    return Select(tuple(sorted(chosen)), cost)
+
+
+def policy_move(state: GameState, moves: list[Move], rng: random.Random) -> Move:
+    """Usually walk to wherever the bonuses are best"""
+    if rng.random() < EXPLORATION:
+        return rng.choice(moves)
+    return max(moves, key=lambda move: (_move_value(state, move, moves), rng.random()))
+
+
+def _move_value(state: GameState, move: Move, moves: list[Move]) -> float:
+    park = state.park
+    if isinstance(move, Leave):
+        if move.bonus == -1:
+            return -BONUS_VALUES["REP"]
+        return sum(BONUS_VALUES.get(bonus, 0) for bonus in park.leaving_bonuses[move.bonus])
+    if not move.pay and Walk(move.destination, pay=True) in moves:
+        return 0  # walking to an occupied location without paying for it
+    value = sum(BONUS_VALUES.get(bonus, 0) for bonus in park.board[move.destination])
+    return value - BONUS_VALUES["REP"] if move.pay else value
+
+
+def play_out(state: GameState, rng: random.Random) -> tuple[int, ...]:
+    """
+    Play the game to the end and return the final scores, in the order of state.players at the start of the playout.
+    Every player of the state must be a PlayoutPlayer.
+    """
+    players = state.players.copy()
+    journal = Journal()  # moves are made through a journal, but nothing is ever undone here
+    if state.stage is Stage.SETUP:
+        state.stage = Stage.RECRUITMENT
+    while True:
+        if state.stage is Stage.RECRUITMENT:
+            play_bidding(state)
+        elif state.stage is Stage.SELECTION:
+            apply_move(state, policy_selection(state, rng), journal)
+        elif state.stage is Stage.WALKING and state.player is not None:
+            apply_move(state, policy_move(state, legal_moves(state), rng), journal)
+        else:
+            play_home_time(state, rng)
+            if state.round == 4 and state.stage is Stage.HOME_TIME:
+                break
+    return tuple(player.final_score() for player in players)
@@ -0,0 +1,154 @@
+"""
+Pondering: thinking ahead while the game waits on a human player.
+
+At a physical table most of the time goes on people deciding and typing in their moves, while the AIs sit idle. A
+Ponderer follows the game as an observer (see dogpark.game.events). When a human player is asked for their selection or
+walk (see HumanPlayer.input), it makes each of their legal moves on a copy of the game and keeps the positions where
+an AI that can ponder moves next. It then searches those positions in a background thread, the human's best moves by
+heuristic score first (see dogpark.game.node). The search stops as soon as the answer comes in, and carries on where
+it left off the next time the game waits on the same turn.
+
+What is found goes into the AI's pondered, keyed by the zobrist hash of the position, along with whatever the search
+needs to carry on from where it stopped (the max^n search itself, or the ISMCTS tree). When the AI has to move,
+SearchAI.search looks up the position it is in. If the position was pondered for as long as the AI would have thought
+about it anyway, the move is made straight away, otherwise the search carries on for the rest of the time. So the AI
+thinks for as long as it would have without pondering, but less of that time is spent with the table waiting.
+
+Recruitment is left out: while a human player bids or picks a dog, nothing is pondered. Of the AIs that ponder, only
+the ISMCTSAI searches its bids and dog choices, and what it searches depends on which dogs have been bid on, which the
+positions pondered don't hold (they are made of the moves of dogpark.game.moves, which are selections and walks, and
+keyed by zobrist hashes, which leave the bids out). The other AIs that ponder bid like the NaiveAI, with nothing to
+think about.
+
+The background search only plays on copies of the game, and on the AIs' transposition tables, which nothing else uses
+while the game waits: the thread is always stopped and joined before the game gets its answer. Python threads share the
+interpreter lock, but a thread waiting on input lets go of it, so the search has the CPU to itself.
+"""
+from __future__ import annotations
+
+import random
+import threading
+from typing import NamedTuple, Optional
+
+from dogpark.game.clock import Deadline
+from dogpark.game.events import DestinationChosen, DogsSelected, Event, InputGiven, StageStarted, WaitingForInput
+from dogpark.game.gamestate import GameState, Stage
+from dogpark.game.moves import Journal, Move, apply_move, legal_moves
+from dogpark.game.node import heuristic_scores
+from dogpark.game.player import Player
+from dogpark.game.zobrist import zobrist_hash
+
+
+class Pondered(NamedTuple):
+    move: Optional[Move]  # the best move found so far
+    seconds: float
+    work: int
+    carry: object  # whatever the search needs to carry on from where it stopped
+    done: bool  # the search finished before its time was up, so searching longer won't change anything
+
+
+class Candidate(NamedTuple):
+    ai: Player  # at the table
+    ghost: Player  # the AI's copy in the position, which moves next
+    key: int  # zobrist hash of the position
+    soft: float  # seconds the AI thinks for on a decision
+    hard: float
+
+
+class Ponderer:
+    """Searches ahead for the AIs of a game while it waits on a human player"""
+
+    def __init__(self):
+        self.turn: Optional[Player] = None  # the human player whose moves the candidates follow
+        self.candidates: list[Candidate] = []
+        self.seconds: dict[str, float] = {}  # pondered by each AI, by colour
+        self.thread: Optional[threading.Thread] = None
+        self.deadline: Optional[Deadline] = None  # of the search running in the thread
+        self.halted = False
+
+    def __call__(self, event: Event):
+        kind = type(event)
+        if kind is WaitingForInput:
+            self.start(event.player)
+        elif kind is InputGiven:
+            self.stop()
+        elif kind is StageStarted or (kind in (DogsSelected, DestinationChosen) and event.player is not self.turn):
+            # once the human has moved, the rest of their turn follows on from one of the candidates, but after
+            # anyone else's move the candidates are out of date
+            self.turn = None
+            self.candidates = []
+
+    def start(self, human: Player):
+        """Ponder in the background on the positions the human's turn could lead to"""
+        self.stop()
+        if self.turn is not human:
+            self.turn = human
+            self.candidates = self.find_candidates(human.game)
+        if not self.candidates:
+            return
+        self.halted = False
+        self.thread = threading.Thread(target=self._ponder, args=(self.candidates,), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop pondering, waiting for the search in the background to finish what it is doing"""
+        if self.thread is None:
+            return
+        self.halted = True  # before stopping the deadline, so a search started after that sees it
+        if self.deadline is not None:
+            self.deadline.stop()
+        self.thread.join()
+        self.thread = None
+        self.deadline = None
+
+    def find_candidates(self, state: GameState) -> list[Candidate]:
+        """The positions after each move of the player to move where an AI that ponders moves next, most likely first"""
+        if state.stage not in (Stage.SELECTION, Stage.WALKING) or state.player is None:
+            return []
+        mover = state.players.index(state.player)
+        budgets = {}
+        found = []
+        for move in legal_moves(state):
+            position = state.clone()
+            position.zobrist = None
+            apply_move(position, move, Journal())
+            ghost = position.player
+            if ghost is None or not getattr(ghost, "ponders", False):
+                continue
+            ai = state.players[position.players.index(ghost)]
+            if id(ai) not in budgets:
+                deadline = ai.start_thinking()
+                budgets[id(ai)] = deadline.soft - deadline.start, deadline.hard - deadline.start
+            key = zobrist_hash(position)
+            # the background thread mustn't draw from the AI's generator, or even draw from it to seed one, since then
+            # pondering would change the AI's choices in the game
+            ghost.rng = random.Random(key)
+            candidate = Candidate(ai, ghost, key, *budgets[id(ai)])
+            found.append((heuristic_scores(position)[mover], candidate))
+        found.sort(key=lambda score_candidate: -score_candidate[0])
+        return [candidate for _, candidate in found]
+
+    def _ponder(self, candidates: list[Candidate]):
+        for candidate in candidates:
+            ai = candidate.ai
+            pondered = ai.pondered.get(candidate.key)
+            seconds, work = (0.0, 0) if pondered is None else (pondered.seconds, pondered.work)
+            if pondered is not None and (pondered.done or seconds >= candidate.soft):
+                continue
+            self.deadline = deadline = Deadline(candidate.soft - seconds, candidate.hard - seconds)
+            if self.halted:
+                return
+            move, more, carry = candidate.ghost.think(deadline, pondered)
+            done = not deadline.soft_passed()
+            elapsed = deadline.elapsed()
+            ai.pondered[candidate.key] = Pondered(move, seconds + elapsed, work + more, carry, done)
+            self.seconds[ai.colour] = self.seconds.get(ai.colour, 0.0) + elapsed
+            if self.halted:
+                return
+
+    def report(self, ai: Player) -> str:
+        decisions = ai.ponder_hits + ai.ponder_misses
+        return (
+            f"pondered for {self.seconds.get(ai.colour, 0.0):.1f}s, and had pondered the position of "
+            f"{ai.ponder_hits} of the {decisions} decisions it could have"
+        )
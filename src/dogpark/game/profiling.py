@@ -0,0 +1,187 @@
+"""
+Opt-in profiling of games: where the time goes phase by phase, and how much of it the players spend deciding.
+
+A Dogpark given a Profile times its setup, every phase of every round and the final scoring, and every decision its
+players make. Players are profiled by swapping their class for a subclass that times the decision methods, so games
+without a Profile run exactly the code they always did. A decision's time counts from the outermost decision being
+made (looking is decided while applying a bonus, say), and the engine's share of a phase is what's left. Copies of
+profiled players (made by searches) are profiled too, so decisions made while searching are counted with the rest.
+
+Profiles of many games, including games played in other processes, add up with merge. If tracemalloc is tracing
+(python -X tracemalloc), the most memory allocated during each phase is recorded as well. A Profile made with
+cprofile=True also runs cProfile over each game, and the stats of every game can be saved to a pstats file.
+"""
+from __future__ import annotations
+
+import tracemalloc
+from contextlib import contextmanager
+from time import perf_counter
+
+# the methods of Player that ask a player to decide something
+DECISIONS = (
+    "choose_objective",
+    "bid",
+    "choose_dog",
+    "do_selection",
+    "choose_destination",
+    "pay_walking_bonus",
+    "choose_leaving_bonus_index",
+    "choose_bonus",
+    "look",
+    "swap",
+)
+
+
+class Profile:
+    def __init__(self, cprofile: bool = False):
+        self.cprofile = cprofile
+        self.games = 0
+        # phase: [times played, seconds, seconds spent deciding, walking steps, most bytes allocated at once]
+        self.phases: dict[str, list] = {}
+        self.decisions: dict[str, list] = {}  # player class.method: [calls, seconds]
+        self.stats: dict = {}  # of cProfile, in the form pstats keeps them
+        self._classes: dict[type, type] = {}  # profiled subclass of each player class
+        self._depth = 0  # of decisions being made
+        self._deciding = 0.0  # seconds spent deciding in the current phase
+        self._steps = 0  # walking steps in the current phase
+
+    def __getstate__(self):
+        # the profiled classes are made on the fly, so they can't be pickled, and are made again when needed
+        state = self.__dict__.copy()
+        state["_classes"] = {}
+        return state
+
+    @contextmanager
+    def game(self):
+        """Count a game, and run cProfile over it if cprofile"""
+        profiler = None
+        if self.cprofile:
+            import cProfile
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiler.create_stats()
+                self._add_stats(profiler.stats)
+            self.games += 1
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a phase of the game"""
+        self._deciding, self._steps = 0.0, 0
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            allocated = tracemalloc.get_traced_memory()[0]
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            stat = self.phases.setdefault(name, [0, 0.0, 0.0, 0, 0])
+            stat[0] += 1
+            stat[1] += perf_counter() - start
+            stat[2] += self._deciding
+            stat[3] += self._steps
+            if tracing:
+                stat[4] = max(stat[4], tracemalloc.get_traced_memory()[1] - allocated)
+
+    def instrument(self, players: list):
+        """Time the decisions of the players from now on"""
+        for player in players:
+            cls = type(player)
+            if cls not in self._classes.values():
+                if cls not in self._classes:
+                    self._classes[cls] = self._profiled(cls)
+                player.__class__ = self._classes[cls]
+
+    def _profiled(self, cls: type) -> type:
+        namespace = {name: self._timed(f"{cls.__name__}.{name}", getattr(cls, name)) for name in DECISIONS}
+        walk = cls.walk
+
+        def counted_walk(player, park):
+            self._steps += 1
+            return walk(player, park)
+
+        namespace["walk"] = counted_walk
+        # keep the name, which checkpoints and recordings save players by
+        namespace["__qualname__"] = cls.__qualname__
+        namespace["__module__"] = cls.__module__
+        return type(cls)(cls.__name__, (cls,), namespace)
+
+    def _timed(self, name: str, method):
+        def timed(player, *args, **kwargs):
+            self._depth += 1
+            start = perf_counter()
+            try:
+                return method(player, *args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                self._depth -= 1
+                if not self._depth:
+                    self._deciding += elapsed
+                stat = self.decisions.setdefault(name, [0, 0.0])
+                stat[0] += 1
+                stat[1] += elapsed
+
+        return timed
+
+    def merge(self, other: Profile):
+        """Add another profile to this one"""
+        self.games += other.games
+        for name, stat in other.phases.items():
+            mine = self.phases.setdefault(name, [0, 0.0, 0.0, 0, 0])
+            mine[:4] = [a + b for a, b in zip(mine[:4], stat[:4])]
+            mine[4] = max(mine[4], stat[4])
+        for name, stat in other.decisions.items():
+            mine = self.decisions.setdefault(name, [0, 0.0])
+            mine[0] += stat[0]
+            mine[1] += stat[1]
+        self._add_stats(other.stats)
+
+    def _add_stats(self, stats: dict):
+        if not stats:
+            return
+        if not self.stats:
+            self.stats = stats
+            return
+        import pstats
+
+        merged = pstats.Stats(_Stats(self.stats))
+        merged.add(_Stats(stats))
+        self.stats = merged.stats
+
+    def dump_stats(self, path: str):
+        """Save the cProfile stats of every game, to be read with pstats"""
+        import pstats
+
+        pstats.Stats(_Stats(self.stats)).dump_stats(path)
+
+    def print_summary(self):
+        games = max(self.games, 1)
+        print(f"Profile of {self.games} games:")
+        print(
+            f"{'Phase':<12}{'Total s':>10}{'ms/game':>10}{'Players s':>11}{'Engine s':>10}{'Steps/game':>12}"
+            f"{'Peak KiB':>10}"
+        )
+        for name, (_, seconds, deciding, steps, peak) in self.phases.items():
+            print(
+                f"{name:<12}{seconds:>10.3f}{seconds / games * 1000:>10.3f}{deciding:>11.3f}{seconds - deciding:>10.3f}"
+                f"{steps / games:>12.1f}{peak / 1024 if peak else float('nan'):>10.1f}"
+            )
+        print(f"{'Decision':<40}{'Calls':>10}{'Total s':>10}{'us/call':>10}")
+        for name, (calls, seconds) in sorted(self.decisions.items(), key=lambda item: -item[1][1]):
+            print(f"{name:<40}{calls:>10}{seconds:>10.3f}{seconds / calls * 1e6:>10.1f}")
+
+
+class _Stats:
+    """Profiler stats in the form pstats.Stats loads them from a profiler"""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
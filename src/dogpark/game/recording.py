@@ -0,0 +1,387 @@
+"""
+Compact recordings of games, and replaying them.
+
+A Recording holds everything that was drawn at random in a game (the order of the dog deck, the forecasts, the breed
+experts and the parks) and every decision the players made, in the order they made them. Playing the decisions again
+on the same cards plays the same game, so any position of it can be recovered with replay. A Recorder makes a
+recording by observing a game (see dogpark.game.events), which is what Dogpark(record=True) does, and to_bytes packs it
+into a few hundred bytes.
+
+Only games that draw their own cards can be recorded, not physical games.
+"""
+from __future__ import annotations
+
+import struct
+from typing import NamedTuple, Optional
+
+from dogpark.game import ANY
+from dogpark.game.dog import Breed
+from dogpark.game.events import (
+    BidPlaced,
+    BonusChosen,
+    DestinationChosen,
+    DogChosen,
+    DogsSelected,
+    Event,
+    GameStarted,
+    LeavingBonusChosen,
+    Looked,
+    ObjectiveChosen,
+    ParkDrawn,
+    Swapped,
+)
+from dogpark.game.game import Dogpark
+from dogpark.game.gamestate import GameState
+from dogpark.game.park import Park
+from dogpark.game.player import Player
+
+# kinds of action, and the arguments each one is recorded with
+OBJECTIVE = 0  # objective
+BID = 1  # dog, amount
+DOG = 2  # dog, chosen after bidding
+SELECT = 3  # the resources left after paying (in the order of ANY), then the dogs put on the lead
+WALK = 4  # destination, paid
+LEAVE = 5  # index of the leaving bonus
+BONUS = 6  # index of the bonus chosen in BONUSES
+LOOK = 7  # field dog, top card, or nothing to not swap
+SWAP = 8  # walked, then kennel dog, field dog, or nothing more to not swap
+KINDS = ["objective", "bid", "dog", "selection", "walk", "leaving bonus", "bonus", "look", "swap"]
+# actions with a fixed number of arguments, the rest are stored with their length
+ARITY = {OBJECTIVE: 1, BID: 2, DOG: 1, WALK: 2, LEAVE: 1, BONUS: 1}
+
+BONUSES = ANY + ["REP"]
+COLOURS = ["Red", "Green", "Yellow", "Purple"]
+BREEDS = list(Breed)
+HIDDEN = ("LOOK", "SWAP", "WALKED SWAP")  # bonuses that ask the player for a decision
+
+MAGIC = b"DPK"
+VERSION = 2
+
+
+class Action(NamedTuple):
+    kind: int
+    seat: int  # index of the player in the order they were seated at setup
+    args: tuple[int, ...]
+
+
+class Recording(NamedTuple):
+    seed: Optional[int]  # that the game was started with, if any, only kept for reference
+    colours: tuple[str, ...]  # in seat order
+    ais: tuple[str, ...]  # class names of the players
+    forecasts: tuple[int, ...]
+    breed_experts: tuple[Breed, ...]
+    deck: tuple[int, ...]  # the dog deck before any dogs were drawn, drawn from the end
+    parks: tuple[int, ...]  # the parks drawn, in order
+    actions: tuple[Action, ...]
+
+    def to_bytes(self) -> bytes:
+        out = bytearray(MAGIC)
+        out += struct.pack("<B?", VERSION, self.seed is not None)
+        if self.seed is not None:
+            _put_varint(out, self.seed << 1 if self.seed >= 0 else ~self.seed << 1 | 1)  # zigzag, for negative seeds
+        out.append(len(self.colours))
+        for colour, ai in zip(self.colours, self.ais):
+            name = ai.encode()
+            out += bytes([COLOURS.index(colour), len(name)]) + name
+        out += bytes([len(self.forecasts), *self.forecasts])
+        out += bytes(BREEDS.index(breed) for breed in self.breed_experts)
+        out += struct.pack("<H", len(self.deck))
+        for dog in self.deck:
+            _put_varint(out, dog)
+        out += bytes([len(self.parks), *self.parks])
+        for action in self.actions:
+            out.append(action.kind << 2 | action.seat)
+            if action.kind not in ARITY:
+                out.append(len(action.args))
+            for arg in action.args:
+                _put_varint(out, arg)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Recording:
+        if data[:3] != MAGIC:
+            raise ValueError("Not a dogpark recording")
+        version, has_seed = struct.unpack_from("<B?", data, 3)
+        if version != VERSION:
+            raise ValueError(f"Unsupported recording version {version}")
+        i = 5
+        seed = None
+        if has_seed:
+            zigzag, i = _get_varint(data, i)
+            seed = ~(zigzag >> 1) if zigzag & 1 else zigzag >> 1
+
+        colours, ais = [], []
+        for _ in range(data[i]):
+            colours.append(COLOURS[data[i + 1]])
+            ais.append(data[i + 3: i + 3 + data[i + 2]].decode())
+            i += 2 + data[i + 2]
+        i += 1
+        forecasts = tuple(data[i + 1: i + 1 + data[i]])
+        i += 1 + data[i]
+        breed_experts = tuple(BREEDS[b] for b in data[i: i + len(BREEDS)])
+        i += len(BREEDS)
+        (num_dogs,) = struct.unpack_from("<H", data, i)
+        deck, i = _get_varints(data, i + 2, num_dogs)
+        parks = tuple(data[i + 1: i + 1 + data[i]])
+        i += 1 + data[i]
+
+        actions = []
+        while i < len(data):
+            kind, seat = data[i] >> 2, data[i] & 3
+            if kind in ARITY:
+                length, i = ARITY[kind], i + 1
+            else:
+                length, i = data[i + 1], i + 2
+            args, i = _get_varints(data, i, length)
+            actions.append(Action(kind, seat, args))
+        return cls(seed, tuple(colours), tuple(ais), forecasts, breed_experts, deck, parks, tuple(actions))
+
+
+def _put_varint(out: bytearray, value: int):
+    """Append a non-negative int, 7 bits to a byte, so small values take a single byte"""
+    if value < 0:
+        raise ValueError(f"Can't record the negative value {value}")
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(data: bytes, i: int) -> tuple[int, int]:
+    """A value written by _put_varint at i, and the index after it"""
+    value = shift = 0
+    while data[i] & 0x80:
+        value |= (data[i] & 0x7F) << shift
+        shift += 7
+        i += 1
+    return value | data[i] << shift, i + 1
+
+
+def _get_varints(data: bytes, i: int, count: int) -> tuple[tuple[int, ...], int]:
+    values = []
+    for _ in range(count):
+        value, i = _get_varint(data, i)
+        values.append(value)
+    return tuple(values), i
+
+
+class Recorder:
+    """Records a game it observes, from its start"""
+
+    def __init__(self, seed: Optional[int] = None):
+        if seed is not None and not isinstance(seed, int):
+            raise ValueError(f"Only games with an int seed can be recorded, not {seed!r}")
+        self.seed = seed
+        self.seats: dict[int, int] = {}  # id of each player: their seat
+        self.players: list[Player] = []
+        self.setup: Optional[tuple] = None  # forecasts, breed experts and deck
+        self.parks: list[int] = []
+        self.actions: list[Action] = []
+
+    def __call__(self, event: Event):
+        kind = type(event)
+        if kind is ParkDrawn:
+            self.parks.append(event.park_id)
+        elif kind is GameStarted:
+            state = event.state
+            self.players = state.players.copy()
+            self.seats = {id(player): seat for seat, player in enumerate(state.players)}
+            # the first dogs have been drawn from the end of the deck
+            self.setup = tuple(state.forecasts), tuple(state.breed_experts), tuple(state.dogs_deck + state.dogs[::-1])
+        elif kind is ObjectiveChosen:
+            self.add(OBJECTIVE, event.player, event.objective)
+        elif kind is BidPlaced:
+            self.add(BID, event.player, event.dog, event.amount)
+        elif kind is DogChosen:
+            self.add(DOG, event.player, event.dog)
+        elif kind is DogsSelected:
+            self.add(SELECT, event.player, *event.resources, *event.dogs)
+        elif kind is DestinationChosen:
+            self.add(WALK, event.player, event.destination, event.paid)
+        elif kind is LeavingBonusChosen and event.index != -1:
+            self.add(LEAVE, event.player, event.index)
+        elif kind is BonusChosen:
+            self.add(BONUS, event.player, BONUSES.index(event.bonus))
+        elif kind is Looked:
+            self.add(LOOK, event.player, *(event.swap or ()))
+        elif kind is Swapped:
+            swap = () if event.kennel_dog is None else (event.kennel_dog, event.field_dog)
+            self.add(SWAP, event.player, event.walked, *swap)
+
+    def add(self, kind: int, player: Player, *args: int):
+        self.actions.append(Action(kind, self.seats[id(player)], tuple(int(arg) for arg in args)))
+
+    def recording(self) -> Recording:
+        if self.setup is None:
+            raise ValueError("The game hasn't started")
+        forecasts, breed_experts, deck = self.setup
+        return Recording(
+            self.seed,
+            tuple(player.colour for player in self.players),
+            tuple(type(player).__name__ for player in self.players),
+            forecasts,
+            breed_experts,
+            deck,
+            tuple(self.parks),
+            tuple(self.actions),
+        )
+
+
+class ReplayStopped(Exception):
+    """Raised when a replayed game asks for an action past the point it was asked to stop at"""
+
+
+class ReplayPlayer(Player):
+    """Makes the decisions of a recorded player again"""
+
+    def __init__(self, gamestate: GameState, colour: str, replay: ReplayDogpark, seat: int):
+        super().__init__(gamestate, colour)
+        self.replay = replay
+        self.seat = seat
+        self.paid = False  # for the destination being walked to
+
+    def choose_objective(self, hard: int = None, easy: int = None) -> Optional[int]:
+        (self.objective,) = self.replay.take(OBJECTIVE, self.seat)
+        return self.objective
+
+    def bid(self, available_dogs: list[int], bids: dict) -> (int, int):
+        return self.replay.take(BID, self.seat)
+
+    def choose_dog(self, available_dogs: list[int]) -> int:
+        return self.replay.take(DOG, self.seat)[0]
+
+    def do_selection(self) -> list[int]:
+        args = self.replay.take(SELECT, self.seat)
+        for dog in args[len(ANY):]:
+            self.put_on_lead(dog)
+        for resource, amount in zip(ANY, args):
+            self.resources[resource] = amount
+        self.finish_selection()
+        return list(self.lead)
+
+    def choose_destination(self, park: Park) -> int:
+        destination, paid = self.replay.take(WALK, self.seat)
+        self.paid = bool(paid)
+        return destination
+
+    def pay_walking_bonus(self, park: Park, destination: int) -> bool:
+        return self.paid
+
+    def choose_leaving_bonus_index(self, park: Park) -> int:
+        return self.replay.take(LEAVE, self.seat)[0]
+
+    def choose_bonus(self, bonuses: list[str]) -> str:
+        return BONUSES[self.replay.take(BONUS, self.seat)[0]]
+
+    def apply_bonuses(self, bonuses: list[str]):
+        # the order only matters for bonuses that ask for a decision, so take those in the order they were recorded
+        hidden = []
+        for bonus in bonuses:
+            if bonus in HIDDEN:
+                hidden.append(bonus)
+            else:
+                self.apply_bonus(bonus)
+        while hidden:
+            action = self.replay.upcoming()
+            if action is None:
+                bonus = self.first_hidden(hidden)
+            elif action.kind == LOOK and "LOOK" in hidden:
+                bonus = "LOOK"
+            elif action.kind == SWAP and HIDDEN[1 + action.args[0]] in hidden:
+                bonus = HIDDEN[1 + action.args[0]]
+            else:
+                bonus = hidden[0]  # doesn't match the recording, which take will report
+            hidden.remove(bonus)
+            self.apply_bonus(bonus)
+
+    def first_hidden(self, hidden: list[str]) -> str:
+        """The bonus to take first of those that ask for a decision, with nothing recorded to say"""
+        return hidden[0]  # in the order they came in
+
+    def look(self, top_cards: list[int]) -> Optional[tuple[int, int]]:
+        swap = self.replay.take(LOOK, self.seat)
+        return swap or None
+
+    def swap(self, walked: bool) -> Optional[tuple[int, int]]:
+        swap = self.replay.take(SWAP, self.seat)[1:]
+        if not swap:
+            return None
+        self.game.swap(self, walked, *swap)
+        return swap
+
+
+class ReplayDogpark(Dogpark):
+    """Plays a recorded game again, stopping before the action at index stop if it is given"""
+
+    player_class = ReplayPlayer
+
+    def __init__(self, recording: Recording, stop: Optional[int] = None, prints: bool = False):
+        self.recording = recording
+        self.stop = len(recording.actions) if stop is None else stop
+        self.cursor = 0  # index of the next action to take
+        self.parks_drawn = 0
+        super().__init__(autorun=False, num_players=len(recording.colours), ais=[], prints=prints)
+
+    def take(self, kind: int, seat: int) -> tuple[int, ...]:
+        """The arguments of the next action, which must be of the kind and by the player at the seat"""
+        action = self.peek()
+        if action.kind != kind or action.seat != seat:
+            raise ValueError(
+                f"The recording has a {KINDS[action.kind]} by seat {action.seat} at action {self.cursor}, but the"
+                f" game asked seat {seat} for a {KINDS[kind]}"
+            )
+        self.cursor += 1
+        return action.args
+
+    def peek(self) -> Action:
+        if self.cursor >= self.stop:
+            raise ReplayStopped(self.cursor)
+        return self.recording.actions[self.cursor]
+
+    def upcoming(self) -> Optional[Action]:
+        """The next action, or None if the replay stops before it"""
+        return self.recording.actions[self.cursor] if self.cursor < self.stop else None
+
+    def setup(self):
+        state = self.state
+        state.players = [
+            self.player_class(state, colour, self, seat) for seat, colour in enumerate(self.recording.colours)
+        ]
+        state.forecasts = list(self.recording.forecasts)
+        state.breed_experts = list(self.recording.breed_experts)
+        state.dogs_deck = list(self.recording.deck)
+        state.draw_dogs()
+        self.draw_park()
+        if state.observers:
+            state.emit(GameStarted(state))
+        for player in state.players:
+            objective = player.choose_objective()
+            if state.observers:
+                state.emit(ObjectiveChosen(player, objective))
+
+    def draw_park(self):
+        state = self.state
+        park_id = self.recording.parks[self.parks_drawn]
+        self.parks_drawn += 1
+        state.park = Park(state.parks_deck.pop(park_id), state.num_players)
+        if state.observers:
+            state.emit(ParkDrawn(park_id, state.park))
+
+
+def replay(recording: Recording, stop: Optional[int] = None) -> GameState:
+    """
+    Play a recorded game again, and return its state at the end, or just before the action at index stop. The players
+    of the state are ReplayPlayers.
+    """
+    game = ReplayDogpark(recording, stop)
+    try:
+        game.play()
+    except ReplayStopped:
+        pass
+    return game.state
+
+
+def load_game(name: str) -> Recording:
+    """Load a recording saved with Dogpark.save_game"""
+    with open(f"{name}.dogpark", "rb") as f:
+        return Recording.from_bytes(f.read())
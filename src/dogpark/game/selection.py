@@ -0,0 +1,148 @@
+"""
+An exact solver for the selection phase: which dogs to put on the lead.
+
+Every affordable lead is valued by what it is sure to gain by the end of the round, and the best one is chosen. A dog
+on the lead is worth 2 REP at home time, and its walked token saves the REP lost for an unwalked dog (2 with forecast
+8, none with forecast 9), scores 2 more for a raring to go dog, and counts towards objectives about walked dogs (each
+step of the way is worth its share of the objective). Hounds gain 2 REP with forecast 6, and eager dogs refund their
+resource. Resources are worth RESOURCE_VALUE each, for walks in later rounds, which is never enough to leave a dog at
+home that could be walked for the same price, but does pick the cheapest of otherwise equal leads. What a dog does
+during the walk depends on the walk, so it isn't counted here.
+
+Costs are packed into one int per dog, a byte per resource, so the cost of a lead is a sum and whether it is
+affordable one subtraction: with a guard bit set above each resource, a resource going negative clears its guard bit.
+Solutions are memoized on the kennel (with each dog's walked tokens), resources, forecast and objective, which is
+everything they depend on, so positions that come up again in a search or a simulation are looked up.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from itertools import combinations
+from typing import Optional
+
+from dogpark.game import ANY
+from dogpark.game.dog import DOGS, Ability, Breed
+from dogpark.game.gamestate import GameState
+from dogpark.game.moves import Select
+from dogpark.game.player import Player
+
+RESOURCE_VALUE = 0.5  # REP, less than a third of the 2 REP a walk is worth, and dogs cost at most 3 resources
+
+_GUARDS = sum(0x80 << (8 * i) for i in range(len(ANY)))
+
+# objectives scored by the walked tokens in the kennel
+WALKED_OBJECTIVES = (2, 3, 5, 6, 10)
+
+
+def pack(resources: tuple[int, ...]) -> int:
+    """Resources (in the order of ANY, each under 128) as one int, a byte each"""
+    return sum(amount << (8 * i) for i, amount in enumerate(resources))
+
+
+def unpack(packed: int) -> tuple[int, ...]:
+    return tuple((packed >> (8 * i)) & 0xFF for i in range(len(ANY)))
+
+
+def affordable(resources: int, cost: int) -> bool:
+    """Whether packed resources cover a packed cost"""
+    return ((resources | _GUARDS) - cost) & _GUARDS == _GUARDS
+
+
+def best_selection(state: GameState, player: Optional[Player] = None) -> Select:
+    """The best lead for the player, the player to move by default"""
+    player = player or state.player
+    walked = state.walked
+    kennel = tuple((dog, walked[dog]) for dog in sorted(player.kennel))
+    resources = tuple(player.resources[r] for r in ANY)
+    dogs, cost, _ = solve(kennel, resources, state.current_forecast(), player.objective)
+    return Select(dogs, cost)
+
+
+@lru_cache(maxsize=1 << 16)
+def solve(
+    kennel: tuple[tuple[int, int], ...], resources: tuple[int, ...], forecast: Optional[int], objective: Optional[int]
+) -> tuple[tuple[int, ...], tuple[int, ...], float]:
+    """
+    The best lead from a kennel of (dog, walked tokens) in dog order, as the dogs, their cost (in the order of ANY)
+    and its value. Ties go to the first lead found, trying bigger leads first and then in dog order.
+    """
+    dogs = [dog for dog, _ in kennel]
+    costs = [pack(DOGS[dog].cost) for dog in dogs]
+    # the value of each dog less the value of the resources it costs, which is the value of a lead with no free dogs
+    values = [_dog_value(dog, walked, forecast) - RESOURCE_VALUE * sum(DOGS[dog].cost) for dog, walked in kennel]
+    pastoral = [DOGS[dog].breed is Breed.PASTORAL for dog in dogs]
+    walked = [walked for _, walked in kennel]
+    budget = pack(resources)
+    progress = objective in WALKED_OBJECTIVES
+    before = _objective_progress(objective, walked) if progress else 0.0
+
+    best, best_cost, best_value = None, 0, 0.0
+    for size in range(min(4 if forecast == 11 else 3, len(dogs)), -1, -1):
+        for lead in combinations(range(len(dogs)), size):
+            value = sum(values[i] for i in lead)
+            if forecast == 3 and size > 1:
+                cost, free = _pastoral_cost(lead, costs, pastoral, budget)
+                if cost is None:
+                    continue
+                value += RESOURCE_VALUE * free
+            else:
+                cost = sum(costs[i] for i in lead)
+                if not affordable(budget, cost):
+                    continue
+            if progress:
+                after = walked.copy()
+                for i in lead:
+                    after[i] += 1
+                value += _objective_progress(objective, after) - before
+            if best is None or value > best_value:
+                best, best_cost, best_value = lead, cost, value
+    return tuple(dogs[i] for i in best), unpack(best_cost), best_value
+
+
+def _pastoral_cost(
+    lead: tuple[int, ...], costs: list[int], pastoral: list[bool], budget: int
+) -> tuple[Optional[int], int]:
+    """
+    The cheapest affordable cost of a lead with forecast 3, where each pastoral dog lets the next dog go for free (as
+    in dogpark.game.moves.selection_cost), and the resources saved by the free dogs
+    """
+    count = sum(pastoral[i] for i in lead)
+    full = sum(costs[i] for i in lead)
+    if count == 0:
+        return (full if affordable(budget, full) else None), 0
+    best = None
+    for paying in combinations(lead, len(lead) - min(count, len(lead) - 1)):
+        if not any(pastoral[i] for i in paying):
+            continue
+        cost = sum(costs[i] for i in paying)
+        if affordable(budget, cost) and (best is None or sum(unpack(cost)) < sum(unpack(best))):
+            best = cost
+    return best, (0 if best is None else sum(unpack(full)) - sum(unpack(best)))
+
+
+def _dog_value(dog: int, walked: int, forecast: Optional[int]) -> float:
+    """REP gained by the end of the round for putting the dog on the lead, other than towards objectives"""
+    card = DOGS[dog]
+    value = 2.0
+    if walked == 0:
+        value += 2 if forecast == 8 else 0 if forecast == 9 else 1
+    if card.ability is Ability.RARING_TO_GO:
+        value += 2
+    elif card.ability is Ability.EAGER:
+        value += RESOURCE_VALUE
+    if forecast == 6 and card.breed is Breed.HOUND:
+        value += 2
+    return value
+
+
+def _objective_progress(objective: Optional[int], walked: list[int]) -> float:
+    """How much of an objective about walked tokens the kennel has made, as the share of its REP"""
+    if objective in (2, 6):
+        needed, reward = (3, 7) if objective == 2 else (2, 3)
+        return min(sum(tokens >= 2 for tokens in walked), needed) / needed * reward
+    if objective == 3:
+        return min(sum(walked), 10) / 10 * 7
+    if objective in (5, 10):
+        needed, reward = (7, 7) if objective == 5 else (6, 3)
+        return min(sum(tokens >= 1 for tokens in walked), needed) / needed * reward
+    return 0.0
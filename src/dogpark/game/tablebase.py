@@ -0,0 +1,203 @@
+"""
+Walking phase tablebases: the best move of every position of a walk, solved ahead of time for a park card.
+
+Walking never goes backwards (every move is to a higher numbered location, see park._reachable), so a walk is a small
+game without cycles, and every position of it can be solved from the end back (retrograde analysis). A position is
+where each player is (-1 to 15, 15 once they have left) and whose turn it is, with the player the table is for first
+and the others in turn order after them. Each bonus is worth a fixed number of REP (BONUS_VALUES), leaving bonuses
+are taken best first, and taking the bonus of an occupied location costs 1 REP. The first player makes the most they
+can by the end of the walk, against opponents who take the best bonus in reach (as HeuristicAI and NaiveAI do, and
+who leave as soon as they can, cutting the walk short for everyone). Ties go to the nearest destination. What a
+player's dogs add (converters, social butterflies) and their reputation running out aren't part of the solved game, so
+the table is the best move on a typical lead.
+
+A table stores, for every position, the move in a byte (the destination, and whether to pay) and what the first player
+gains by the end of the walk in hundredths of a REP. Tables are solved ahead of time (build_tablebase, or all of them
+with dogpark tablebase) and saved to TABLE_DIR, named after what the park's board is worth and the number of players.
+Games only ever read them back (load_tablebase), by memory mapping, so a game only touches the pages of the positions
+it looks up, and never spends a decision solving one. If the directory can't be written to, a table that is built is
+kept in memory instead.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import zlib
+from array import array
+from itertools import product
+from typing import Optional
+
+from dogpark.game.cards import CARD_DIR
+from dogpark.game.park import PARKS, Park
+from dogpark.game.selection import RESOURCE_VALUE
+
+TABLE_DIR = os.path.join(CARD_DIR, "__pycache__", "tablebases")
+MAGIC = b"DTB"
+VERSION = 1
+HEADER = 8  # magic, version, number of players, then padding so the values are aligned
+
+# REP each bonus is worth to a player
+BONUS_VALUES = {
+    "REP": 1.0,
+    "STICK": RESOURCE_VALUE,
+    "BALL": RESOURCE_VALUE,
+    "TOY": RESOURCE_VALUE,
+    "TREAT": RESOURCE_VALUE,
+    "LOOK": 0.25,
+    "SWAP": 0.25,
+    "WALKED SWAP": 0.25,
+}
+NO_LEAVING_BONUS = -1.0  # leaving after every leaving bonus is taken costs 1 REP
+
+PAY = 0x10  # set in a move byte to pay for the bonus of an occupied location
+NO_MOVE = 0xFF  # positions where the player to move has already left
+POSITIONS = 17  # -1 to 15
+
+
+class Tablebase:
+    """The solved walks of a park for a number of players, over a buffer laid out as written by solve"""
+
+    def __init__(self, num_players: int, data):
+        if bytes(data[:3]) != MAGIC or data[3] != VERSION or data[4] != num_players:
+            raise ValueError("Not a tablebase for this number of players")
+        self.num_players = num_players
+        self.size = num_players * POSITIONS**num_players
+        self.data = data  # kept so that a mapped file stays open
+        self.moves = memoryview(data)[HEADER:HEADER + self.size]
+        self.values = memoryview(data)[HEADER + self.size:HEADER + 3 * self.size].cast("h")
+
+    def index(self, positions: tuple[int, ...], turn: int) -> int:
+        index = turn
+        for position in positions:
+            index = index * POSITIONS + position + 1
+        return index
+
+    def best_move(self, positions: tuple[int, ...], turn: int) -> tuple[int, bool]:
+        """
+        The destination of the player to move (15 to leave), and whether to pay for the bonus there. That's the best
+        move for the first player, and the move the others are expected to make for any other player.
+        """
+        move = self.moves[self.index(positions, turn)]
+        if move == NO_MOVE:
+            raise ValueError(f"The player to move has left the park at {positions}")
+        return move & ~PAY, bool(move & PAY)
+
+    def value(self, positions: tuple[int, ...], turn: int) -> float:
+        """What the first player gains from here to the end of the walk"""
+        return self.values[self.index(positions, turn)] / 100
+
+
+def leaving_values(num_players: int) -> list[float]:
+    """The value of leaving for the first player to leave, the second and so on"""
+    leaving_bonuses = Park({}, num_players).leaving_bonuses
+    values = sorted((sum(BONUS_VALUES[bonus] for bonus in bonuses) for bonuses in leaving_bonuses), reverse=True)
+    return (values + [NO_LEAVING_BONUS] * num_players)[:num_players]
+
+
+def solve(park: Park, num_players: int) -> bytes:
+    """Solve every position of a walk in the park, as the contents of a table file"""
+    board_values = [sum(BONUS_VALUES.get(bonus, 0) for bonus in bonuses) for bonuses in park.board]
+    leaving = leaving_values(num_players)
+    reachable = {position: park.possible_moves(position) for position in range(-1, 15)}
+    players = range(num_players)
+    turns = POSITIONS**num_players  # positions for each player to move
+    size = num_players * turns
+    moves = bytearray([NO_MOVE]) * size
+    # what the first player gains from each position to the end of the walk
+    values = array("d", bytes(8 * size))
+    strides = [POSITIONS ** (num_players - 1 - player) for player in players]
+
+    # every move is to a higher location, so the positions furthest along are solved first
+    for positions in sorted(product(range(-1, 16), repeat=num_players), key=sum, reverse=True):
+        base = sum((position + 1) * stride for position, stride in zip(positions, strides))
+        walking = [player for player in players if positions[player] != 15]
+        left = num_players - len(walking)
+        for turn in walking:
+            index = turn * turns + base
+            if len(walking) == 1:
+                # the last player in the park has to leave
+                moves[index] = 15
+                values[index] = leaving[left] if turn == 0 else 0.0
+                continue
+
+            # after leaving too, the turn passes to whoever was after the player to move
+            following = walking[(walking.index(turn) + 1) % len(walking)] * turns + base
+            position, stride = positions[turn], strides[turn]
+            occupied = {positions[p] for p in walking if p != turn}
+            best_move, best, best_value = NO_MOVE, None, 0.0
+            for destination in reachable[position]:
+                move = destination
+                if destination == 15:
+                    gain = leaving[left]
+                else:
+                    gain = board_values[destination]
+                    if destination in occupied:
+                        if gain > 1:
+                            move, gain = destination | PAY, gain - 1
+                        else:
+                            gain = 0.0
+                after = values[following + (destination - position) * stride]
+                # the first player plays for the end of the walk, the others for the bonus in front of them
+                total = after + gain if turn == 0 else gain
+                if best is None or total > best:
+                    best_move, best, best_value = move, total, after + gain if turn == 0 else after
+            moves[index] = best_move
+            values[index] = best_value
+
+    header = MAGIC + bytes([VERSION, num_players]) + bytes(HEADER - 5)
+    return header + bytes(moves) + array("h", (round(value * 100) for value in values)).tobytes()
+
+
+def table_path(park: Park, num_players: int) -> str:
+    # named after everything solve depends on, so parks that walk the same share a table
+    board_values = [sum(BONUS_VALUES.get(bonus, 0) for bonus in bonuses) for bonuses in park.board]
+    digest = zlib.crc32(repr((VERSION, park._moves, board_values, leaving_values(num_players))).encode())
+    return os.path.join(TABLE_DIR, f"{digest:08x}-{num_players}p.dtb")
+
+
+_LOADED: dict[str, Tablebase] = {}
+
+
+def load_tablebase(park: Park, num_players: int) -> Optional[Tablebase]:
+    """The tablebase of the park, or None if it hasn't been built yet"""
+    path = table_path(park, num_players)
+    table = _LOADED.get(path)
+    if table is None and os.path.exists(path):
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        table = _LOADED[path] = Tablebase(num_players, data)
+    return table
+
+
+def build_tablebase(park: Park, num_players: int) -> Tablebase:
+    """The tablebase of the park, solving and saving it first if there isn't one yet"""
+    table = load_tablebase(park, num_players)
+    if table is not None:
+        return table
+
+    path = table_path(park, num_players)
+    data = solve(park, num_players)
+    try:
+        os.makedirs(TABLE_DIR, exist_ok=True)
+        # write to a temporary file first, so another process never maps half a table
+        temp = f"{path}.{os.getpid()}"
+        with open(temp, "wb") as f:
+            f.write(data)
+        os.replace(temp, path)
+    except OSError:
+        table = _LOADED[path] = Tablebase(num_players, data)
+        return table
+    return load_tablebase(park, num_players)
+
+
+def solve_all() -> list[str]:
+    """Solve the table of every park card for the numbers of players it is played with, returning their paths"""
+    paths = []
+    for park_id, modifiers in PARKS.items():
+        # as in GameState.draw_park
+        for num_players in (2, 3) if park_id <= 8 else (4,):
+            park = Park(modifiers, num_players)
+            build_tablebase(park, num_players)
+            if table_path(park, num_players) not in paths:
+                paths.append(table_path(park, num_players))
+    return paths
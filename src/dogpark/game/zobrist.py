@@ -0,0 +1,139 @@
+"""
+Zobrist hashing of positions, and a transposition table to store search results in.
+
+A position's hash is the XOR of a random key for every feature of it: each player's position in the park, reputation,
+resources, the dogs in their kennel and on their lead, the walked tokens on those dogs, which leaving bonuses are left,
+who is still walking, whose turn it is and the stage. dogpark.game.moves keeps GameState.zobrist up to date as moves
+are made and undone, once it has been set with zobrist_hash.
+"""
+from __future__ import annotations
+
+import random
+from typing import NamedTuple, Optional
+
+from dogpark.game import ANY
+from dogpark.game.gamestate import GameState, Stage
+
+_rng = random.Random(0x5EED)
+
+
+def _keys(*shape: int):
+    if len(shape) == 1:
+        return [_rng.getrandbits(64) for _ in range(shape[0])]
+    return [_keys(*shape[1:]) for _ in range(shape[0])]
+
+
+MAX_PLAYERS = 4
+# values beyond these sizes wrap around, which only makes collisions a little more likely
+DOG_KEYS = 256
+COUNT_KEYS = 64
+
+POSITION = _keys(MAX_PLAYERS, 17)  # -1 to 15, offset by 1
+REPUTATION = _keys(MAX_PLAYERS, COUNT_KEYS)
+RESOURCES = _keys(MAX_PLAYERS, len(ANY), COUNT_KEYS)
+KENNEL = _keys(MAX_PLAYERS, DOG_KEYS)
+LEAD = _keys(MAX_PLAYERS, DOG_KEYS)
+WALKED = _keys(DOG_KEYS, COUNT_KEYS)
+WALKING = _keys(MAX_PLAYERS)
+TURN = _keys(MAX_PLAYERS)
+STAGE = {stage: key for stage, key in zip(Stage, _keys(len(Stage)))}
+LEAVING = _keys(8)  # by which of the park's three possible leaving bonuses are left
+
+
+def player_key(player, i: int) -> int:
+    """The reputation and resources of a player, who is at index i of the players"""
+    key = REPUTATION[i][player.reputation % COUNT_KEYS]
+    for r, resource in enumerate(ANY):
+        key ^= RESOURCES[i][r][player.resources[resource] % COUNT_KEYS]
+    return key
+
+
+def dog_key(state: GameState, player_index: int, dog: int, on_lead: bool) -> int:
+    walked = WALKED[dog % DOG_KEYS][state.walked[dog] % COUNT_KEYS]
+    return (LEAD if on_lead else KENNEL)[player_index][dog % DOG_KEYS] ^ walked
+
+
+def leaving_key(state: GameState) -> int:
+    """Leaving bonuses are taken out of the park's list, so the ones left are a subsequence of the starting list"""
+    initial = (("REP", "REP", "REP"), ("REP", "REP"), ("REP", "WALKED SWAP"))
+    remaining = state.park.leaving_bonuses
+    mask = 0
+    j = 0
+    for i, bonus in enumerate(initial):
+        if j < len(remaining) and remaining[j] == bonus:
+            mask |= 1 << i
+            j += 1
+    return LEAVING[mask]
+
+
+def turn_key(state: GameState) -> int:
+    """Everything about whose turn it is: the stage, the player to move, who is still walking and where everyone is"""
+    players = state.players
+    key = STAGE[state.stage]
+    if state.player is not None:
+        key ^= TURN[players.index(state.player)]
+    for player in state.players_walking:
+        key ^= WALKING[players.index(player)]
+    if state.park is not None:
+        for i, player in enumerate(players):
+            position = state.park.player_positions.get(player.colour)
+            if position is not None:
+                key ^= POSITION[i][position + 1]
+        key ^= leaving_key(state)
+    return key
+
+
+def zobrist_hash(state: GameState) -> int:
+    """The full hash of a position, computed from scratch"""
+    key = turn_key(state)
+    for i, player in enumerate(state.players):
+        key ^= player_key(player, i)
+        for dog in player.kennel:
+            key ^= dog_key(state, i, dog, on_lead=False)
+        for dog in player.lead:
+            key ^= dog_key(state, i, dog, on_lead=True)
+    return key
+
+
+class Entry(NamedTuple):
+    key: int
+    depth: int  # how deep below this position the values were searched
+    values: tuple[float, ...]
+    move: object  # the best move found, for ordering moves in the next search
+    exact: bool  # False if the search of this position was pruned, so the values are only good for ordering
+    generation: int
+
+
+class TranspositionTable:
+    """
+    A fixed size hash table of search results. When two positions want the same slot, the one searched deeper wins,
+    unless the entry in the slot is left over from an earlier search.
+    """
+
+    # rough size of an entry with its tuple of values, used to turn the memory cap into a number of slots
+    ENTRY_BYTES = 320
+
+    def __init__(self, memory: int = 16 * 2**20):
+        self.size = max(1, memory // self.ENTRY_BYTES)
+        self.slots: list[Optional[Entry]] = [None] * self.size
+        self.generation = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self):
+        """Mark every entry as old, so that the next search can replace them"""
+        self.generation += 1
+
+    def lookup(self, key: int) -> Optional[Entry]:
+        entry = self.slots[key % self.size]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key: int, depth: int, values: tuple[float, ...], move, exact: bool):
+        slot = key % self.size
+        old = self.slots[slot]
+        if old is None or old.generation != self.generation or depth >= old.depth:
+            self.slots[slot] = Entry(key, depth, values, move, exact, self.generation)
+            self.stores += 1
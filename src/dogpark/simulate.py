@@ -0,0 +1,86 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional
+
+from dogpark.game.game import Dogpark
+from dogpark.game.profiling import Profile
+
+# a compact record of one finished game: (AI class name, final score) for each player, in seat order
+GameRecord = tuple[tuple[str, int], ...]
+
+
+def play_game(seed: int, ais: tuple[str, ...], profile: Optional[Profile] = None) -> GameRecord:
+    """Play a single silent game with the given seed and return its score record"""
+    d = Dogpark(autorun=True, num_players=len(ais), ais=list(ais), prints=False, seed=seed, profile=profile)
+    return tuple((player.__class__.__name__, score) for player, score in d.scores.items())
+
+
+def profile_game(seed: int, ais: tuple[str, ...], cprofile: bool) -> tuple[GameRecord, Profile]:
+    """Play a single silent game like play_game, and return its profile too"""
+    profile = Profile(cprofile)
+    return play_game(seed, ais, profile), profile
+
+
+def simulate(
+    games: int,
+    ais: list[str],
+    jobs: Optional[int] = 1,
+    seed: int = 0,
+    duplicate: bool = False,
+    profile: Optional[Profile] = None,
+) -> list[GameRecord]:
+    """
+    Play a number of automatic games between the given AIs. Game i is seeded with seed + i, so the results are the
+    same no matter how many jobs are used. If jobs is None, one worker is started per core.
+
+    If duplicate, each of the games is played once for every seat, with the AIs moved round a seat each time. Every AI
+    then plays the same cards from every seat, so the luck of the deal cancels out of their average scores, and far
+    fewer games are needed to tell AIs apart.
+
+    If profile is given, every game is profiled (in whichever process plays it) and added to it.
+    """
+    deals = range(seed, seed + games)
+    if duplicate:
+        seatings = [tuple(ais[k:] + ais[:k]) for k in range(len(ais))]
+        seeds = [s for s in deals for _ in seatings]
+        seats = seatings * games
+    else:
+        seeds = list(deals)
+        seats = [tuple(ais)] * games
+    if profile is None:
+        return _map(jobs, play_game, seeds, seats)
+
+    records = []
+    for record, game_profile in _map(jobs, profile_game, seeds, seats, [profile.cprofile] * len(seeds)):
+        records.append(record)
+        profile.merge(game_profile)
+    return records
+
+
+def _map(jobs: Optional[int], function, *iterables) -> list:
+    if jobs == 1:
+        return list(map(function, *iterables))
+
+    workers = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # send the games out in chunks, so the workers aren't waiting on the pool for every single game
+        chunksize = max(1, len(iterables[0]) // (workers * 4))
+        return list(executor.map(function, *iterables, chunksize=chunksize))
+
+
+def average_scores(records: Iterable[GameRecord]) -> dict[str, float]:
+    """Average score of each AI class across all the games it played in"""
+    class_scores = {}
+    class_games = {}
+    for record in records:
+        for player, score in record:
+            class_scores[player] = class_scores.get(player, 0) + score
+            class_games[player] = class_games.get(player, 0) + 1
+
+    return {player: score / class_games[player] for player, score in class_scores.items()}
+
+
+def print_averages(records: Iterable[GameRecord]):
+    print("Average scores:")
+    for player, score in average_scores(records).items():
+        print(f"{player}: {score}")
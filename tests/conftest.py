@@ -0,0 +1,26 @@
+import pytest
+
+from dogpark.game.game import Dogpark
+from dogpark.game.gamestate import Stage
+
+
+@pytest.fixture
+def start_of():
+    """
+    Sets up a game of the AIs (three NaiveAIs by default) and plays the stages of its first round before the stage. At
+    the start of selection, the first player is the one to move, as the moves of dogpark.game.moves have it.
+    """
+
+    def start(stage: Stage, seed: int, ais: list[str] = None) -> Dogpark:
+        ais = ais or ["NaiveAI", "NaiveAI", "NaiveAI"]
+        d = Dogpark(autorun=False, num_players=len(ais), ais=ais, prints=False, seed=seed)
+        d.setup()
+        if stage in (Stage.SELECTION, Stage.WALKING):
+            d.play_recruitment()
+        if stage is Stage.SELECTION:
+            d.state.stage, d.state.player = Stage.SELECTION, d.state.players[0]
+        elif stage is Stage.WALKING:
+            d.play_selection()
+        return d
+
+    return start
@@ -0,0 +1,97 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from dogpark.game.async_game import AsyncDogpark, play_games, serve
+from dogpark.game.game import Dogpark
+
+AIS = ["NaiveAI", "StingyAI", "HeuristicAI"]
+
+
+def test_games_match_synchronous_games():
+    games = [AsyncDogpark(AIS, seed=seed) for seed in range(6)]
+    results = asyncio.run(play_games(games, workers=3))
+    for seed, scores in enumerate(results):
+        expected = Dogpark(num_players=3, ais=AIS, prints=False, seed=seed).scores
+        assert scores == {p.colour: s for p, s in expected.items()}
+
+
+async def _first_options(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> tuple[dict, int]:
+    """Play a game as a client, always answering with the first option, and return the end of the game"""
+    errors = 0
+    while True:
+        message = json.loads(await reader.readline())
+        if "scores" in message:
+            writer.close()
+            return message, errors
+        if "error" in message:
+            errors += 1
+            continue
+        decision = message["decision"]
+        answer = {
+            "choose_objective": message.get("hard"),
+            "bid": [message.get("dogs", [None])[0], 1],
+            "choose_dog": message.get("dogs", [None])[0],
+            "do_selection": 0,
+            "choose_destination": message.get("options", [None])[0],
+            "pay_walking_bonus": False,
+            "choose_leaving_bonus_index": 0,
+            "choose_bonus": message.get("bonuses", [None])[0],
+            "look": None,
+            "swap": None,
+        }[decision]
+        if decision == "choose_objective" and not errors:
+            writer.write(b"1.0\n")  # not an objective on offer, so asked again
+        writer.write(json.dumps(answer).encode() + b"\n")
+        await writer.drain()
+
+
+def test_remote_seat_over_a_socket():
+    async def main():
+        server = await serve(port=0, ais=("NaiveAI", "StingyAI"))
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            clients = [await asyncio.open_connection("127.0.0.1", port) for _ in range(3)]
+            return await asyncio.gather(*(_first_options(*client) for client in clients))
+
+    for result, errors in asyncio.run(main()):
+        assert len(result["scores"]) == 3
+        assert errors == 1
+
+
+def test_waiting_games_hold_no_thread():
+    async def main():
+        server = await serve(port=0, ais=("NaiveAI",), executor=ThreadPoolExecutor(1))
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            clients = [await asyncio.open_connection("127.0.0.1", port) for _ in range(4)]
+            # every game is waiting on its player at once, with a single thread to play them in
+            firsts = [json.loads(await asyncio.wait_for(reader.readline(), 5)) for reader, _ in clients]
+            for (_, writer), first in zip(clients, firsts):
+                writer.write(json.dumps(first["hard"]).encode() + b"\n")
+            return firsts, await asyncio.gather(*(_first_options(*client) for client in clients))
+
+    firsts, results = asyncio.run(main())
+    assert all(first["decision"] == "choose_objective" for first in firsts)
+    assert all(len(result["scores"]) == 2 for result, _ in results)
+
+
+def test_full_servers_and_slow_players_are_told():
+    async def main():
+        server = await serve(port=0, ais=("NaiveAI",), max_games=1, timeout=0.2)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            assert json.loads(await reader.readline())["decision"] == "choose_objective"
+            turned_away, other_writer = await asyncio.open_connection("127.0.0.1", port)
+            full = json.loads(await turned_away.readline())
+            timed_out = json.loads(await reader.readline())
+            closed = [await reader.readline(), await turned_away.readline()]
+            writer.close()
+            other_writer.close()
+            return full, timed_out, closed
+
+    full, timed_out, closed = asyncio.run(main())
+    assert "full" in full["error"]
+    assert "no answer" in timed_out["error"]
+    assert closed == [b"", b""]
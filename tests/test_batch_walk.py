@@ -0,0 +1,37 @@
+import pytest
+
+from dogpark.game import ANY
+from dogpark.game.game import Dogpark
+from dogpark.game.gamestate import Stage
+
+np = pytest.importorskip("numpy")
+
+from dogpark.game.batch_walk import batch_from_states, walk_batch  # noqa: E402
+
+
+@pytest.mark.parametrize("ais", [["NaiveAI", "NaiveAI", "StingyAI"], ["StingyAI", "NaiveAI", "NaiveAI", "NaiveAI"]])
+def test_batch_matches_play_walking(start_of, ais):
+    reputation, resources, states = [], [], []
+    for seed in range(10):
+        d = start_of(Stage.WALKING, seed, ais)
+        states.append(d.state)
+        for _ in range(20):
+            walk = Dogpark(autorun=False, num_players=len(ais), ais=ais, prints=False)
+            walk.state = d.state.clone()
+            walk.play_walking()
+            reputation.append([p.reputation - q.reputation for p, q in zip(walk.state.players, d.state.players)])
+            resources.append(
+                [sum(p.resources[r] - q.resources[r] for r in ANY) for p, q in zip(walk.state.players, d.state.players)]
+            )
+
+    result = walk_batch(batch_from_states([s for s in states for _ in range(200)]), np.random.default_rng(0))
+    assert np.allclose(result.reputation.mean(axis=0), np.mean(reputation, axis=0), atol=0.3)
+    assert np.allclose(result.resources.sum(axis=2).mean(axis=0), np.mean(resources, axis=0), atol=0.3)
+
+
+def test_every_player_leaves(start_of):
+    d = start_of(Stage.WALKING, 1, ["StingyAI", "StingyAI", "StingyAI", "StingyAI"])
+    result = walk_batch(batch_from_states([d.state] * 50), np.random.default_rng(1))
+    # the leaving bonuses are 3, 2 and 1 REP, the last player has to pay 1 REP, and no one pays for bonuses
+    assert (result.reputation.sum(axis=1) >= 5).all()
+    assert (result.resources >= 0).all()
@@ -0,0 +1,26 @@
+from dogpark import bench
+from dogpark.__main__ import main
+
+
+def test_benchmarks_run():
+    results = bench.run(quick=True)
+    assert set(bench.MICRO) < set(results)
+    assert all(result.value > 0 for result in results.values())
+    assert bench.loads(bench.dumps(results)) == results
+
+
+def test_compare():
+    baseline = {"walk": bench.Result(10, "us"), "games": bench.Result(100, "games/s", higher_is_better=True)}
+    assert bench.compare(baseline, baseline) == []
+    slower = {"walk": bench.Result(12, "us"), "games": bench.Result(80, "games/s", higher_is_better=True)}
+    assert bench.compare(slower, baseline, threshold=0.1) == ["walk", "games"]
+    assert bench.compare(slower, baseline, threshold=0.3) == []
+    faster = {"walk": bench.Result(5, "us"), "new": bench.Result(1, "us")}
+    assert bench.compare(faster, baseline) == []
+
+
+def test_bench_command(tmp_path, capsys):
+    path = str(tmp_path / "bench.json")
+    main(["bench", "--quick", "--save", path])
+    main(["bench", "--quick", "--baseline", path, "--threshold", "100"])
+    assert "Player.walk" in capsys.readouterr().out
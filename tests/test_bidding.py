@@ -0,0 +1,107 @@
+import random
+
+import pytest
+
+from dogpark.game import bidding
+from dogpark.game.bidding import (
+    MAX_BID,
+    bids,
+    dog_value,
+    equilibrium,
+    equilibrium_bid,
+    exploitability,
+    option_gains,
+    payoffs,
+    situation,
+)
+from dogpark.game.game import Dogpark
+from dogpark.game.player import score_breakdown
+
+
+def test_payoffs():
+    values = ((4, 2, 1), (4, 3, 0), (1, 4, 2))
+    # the tie on the first dog goes to the first player, and the others pick what's left in turn order
+    assert payoffs(values, ((0, 2), (0, 2), (2, 1))) == [2, 2, 1]
+    assert payoffs(values, ((0, 1), (0, 2), (0, 3))) == [1, -1, -2]
+
+
+def test_option_gains_match_payoffs():
+    rng = random.Random(1)
+    for num_players in (2, 3, 4):
+        values = tuple(tuple(rng.randint(-4, 0) for _ in range(num_players + 1)) for _ in range(num_players))
+        actions = bids(3, num_players + 1)
+        for _ in range(50):
+            profile = [rng.choice(actions) for _ in range(num_players)]
+            for player in range(num_players):
+                wins = [(values[player][dog] - amount, dog, amount) for dog, amount in actions]
+                expected = [
+                    payoffs(values, (*profile[:player], bid, *profile[player + 1:]))[player] for bid in actions
+                ]
+                assert option_gains(values, player, profile, wins) == expected
+
+
+def test_equilibrium_is_hard_to_exploit():
+    values = ((0, -2, -3), (-1, 0, -3), (-3, 0, -2))
+    reputations = (3, 2, 3)
+    strategies = equilibrium(values, reputations)
+    for strategy in strategies:
+        assert abs(sum(p for _, p in strategy) - 1) < 1e-9
+    assert exploitability(values, reputations, strategies) < 0.1
+    # everyone bidding 1 on the first dog is easy to beat
+    assert exploitability(values, reputations, tuple((((0, 1), 1.0),) for _ in range(3))) > 0.5
+
+
+def test_memoized():
+    equilibrium.cache_clear()
+    values = ((0, -1, -2), (0, -1, -2))
+    first = equilibrium(values, (3, 3))
+    assert equilibrium(values, (3, 3)) is first
+    assert equilibrium.cache_info().hits == 1
+
+
+def test_equilibrium_bid_is_legal():
+    rng = random.Random(0)
+    for seed in range(10):
+        ais = ["HeuristicAI", "NaiveAI", "StingyAI", "NaiveAI"]
+        d = Dogpark(autorun=False, num_players=4, ais=ais, prints=False, seed=seed)
+        d.setup()
+        state = d.state
+        for player in state.players:
+            values, dogs = situation(state, player)
+            assert sorted(dogs) == sorted(state.dogs)
+            assert all(max(row) == 0 for row in values)
+            dog, amount = equilibrium_bid(state, player, rng)
+            assert dog in state.dogs
+            assert 1 <= amount <= max(1, min(MAX_BID, player.reputation))
+
+
+def test_dog_value_leaves_players_alone(monkeypatch):
+    d = Dogpark(autorun=False, num_players=3, ais=["HeuristicAI", "NaiveAI", "StingyAI"], prints=False, seed=4)
+    d.setup()
+    player, dog = d.state.players[0], d.state.dogs[0]
+    kennel, breeds = set(player.kennel), list(player.breeds)
+    worth = dog_value(player, dog)
+    assert (player.kennel, player.breeds) == (kennel, breeds)
+
+    calls = []
+
+    def failing(scored):
+        calls.append(scored)
+        if len(calls) == 2:
+            raise RuntimeError("scoring failed")
+        return score_breakdown(scored)
+
+    monkeypatch.setattr(bidding, "score_breakdown", failing)
+    with pytest.raises(RuntimeError):
+        dog_value(player, dog)
+    assert calls[1] is not player
+    assert (player.kennel, player.breeds) == (kennel, breeds)
+    monkeypatch.undo()
+    assert dog_value(player, dog) == worth
+
+
+def test_equilibrium_ai_bids_from_the_equilibrium():
+    equilibrium.cache_clear()
+    d = Dogpark(num_players=3, ais=["EquilibriumAI", "HeuristicAI", "NaiveAI"], prints=False, seed=2)
+    assert len(d.scores) == 3
+    assert equilibrium.cache_info().misses > 0
@@ -0,0 +1,68 @@
+import marshal
+
+from dogpark.game.checkpoint import dumps, loads
+from dogpark.game.game import PHASES, Dogpark
+from dogpark.game.moves import Journal, apply_move, legal_moves
+
+
+def test_snapshot_round_trip():
+    ais = ["NaiveAI", "StingyAI", "NaiveAI", "HeuristicAI"]
+    d = Dogpark(autorun=False, num_players=4, ais=ais, prints=False, seed=0)
+    d.setup()
+    d.play_round()
+    d.state.round = 2
+    d.play_recruitment()
+    d.play_selection()
+    # part way through a walk
+    state = d.state
+    state.stage, state.players_walking, state.player = PHASES[2], state.players.copy(), state.players[0]
+    state.park.player_positions = {player.colour: -1 for player in state.players}
+    journal = Journal()
+    for _ in range(5):
+        apply_move(state, legal_moves(state)[0], journal)
+
+    restored = loads(dumps(state))
+    assert marshal.loads(dumps(restored)[4:]) == marshal.loads(dumps(state)[4:])
+    assert [type(player) for player in restored.players] == [type(player) for player in state.players]
+    assert [player.breeds for player in restored.players] == [player.breeds for player in state.players]
+    assert legal_moves(restored) == legal_moves(state)
+    assert restored.players.index(restored.player) == state.players.index(state.player)
+
+
+def test_restore_plays_on(tmp_path):
+    path = str(tmp_path / "checkpoint")
+    for seed in range(6):
+        phase = 1 + seed % 3
+        d = Dogpark(autorun=False, num_players=3, ais=["NaiveAI", "StingyAI", "NaiveAI"], prints=False, seed=seed)
+        d.setup()
+        d.play_round()
+        d.state.round = 2
+        d.play_round(PHASES[:phase])
+        d.state.stage = PHASES[phase]
+        d.save_checkpoint(path)
+        d.play_round(PHASES[phase:])
+        for r in (3, 4):
+            d.state.round = r
+            d.play_round()
+        d.end_game()
+
+        restored = Dogpark.restore(path, prints=False)
+        restored.play()
+        assert [score for score in restored.scores.values()] == [score for score in d.scores.values()]
+
+
+def test_checkpoints_are_written(tmp_path):
+    path = str(tmp_path / "checkpoint")
+    d = Dogpark(num_players=3, ais=["NaiveAI", "StingyAI", "NaiveAI"], prints=False, checkpoint=path)
+    with open(path, "rb") as f:
+        state = loads(f.read())
+    assert state.round == 4 and state.stage is PHASES[-1]
+
+
+def test_saving_leaves_the_game_alone(tmp_path):
+    path = str(tmp_path / "checkpoint")
+    ais = ["NaiveAI", "StingyAI", "HeuristicAI"]
+    for seed in range(3):
+        saved = Dogpark(num_players=3, ais=ais, prints=False, seed=seed, checkpoint=path)
+        unsaved = Dogpark(num_players=3, ais=ais, prints=False, seed=seed)
+        assert {p.colour: s for p, s in saved.scores.items()} == {p.colour: s for p, s in unsaved.scores.items()}
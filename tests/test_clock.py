@@ -0,0 +1,111 @@
+import time
+
+import pytest
+
+from dogpark.ais.HeuristicAi import HeuristicAI
+from dogpark.ais.ismcts_ai import ISMCTSAI
+from dogpark.ais.minimax_ai import MinimaxAI
+from dogpark.game.clock import Clock, Deadline, DecisionTime, TimeControl
+from dogpark.game.game import Dogpark
+from dogpark.game.gamestate import GameState, Stage
+from dogpark.game.moves import legal_moves
+from dogpark.game.node import MaxnSearch
+
+
+def test_deadline():
+    deadline = Deadline(10, 20)
+    assert not deadline.soft_passed() and not deadline.hard_passed()
+    deadline.stop()
+    assert deadline.soft_passed() and deadline.hard_passed()
+    deadline = Deadline(0.5)
+    assert deadline.hard == deadline.soft
+    assert Deadline(0, 0.5).soft_passed()
+
+
+def test_game_time_is_shared_out():
+    state = GameState(3)
+    clock = Clock(TimeControl(per_decision=5, per_game=32, hard_limit=3))
+    deadline = clock.deadline(state)
+    assert deadline.soft - deadline.start == pytest.approx(1)  # 4 rounds of 8 decisions to go
+    assert deadline.hard - deadline.start == pytest.approx(3)
+
+    # a round of 4 decisions, taking half the game's time
+    clock.decisions = [DecisionTime(1, 4, 100, "positions") for _ in range(4)]
+    state.round = 2
+    assert clock.decisions_to_go(state) == 12
+    deadline = clock.deadline(state)
+    assert deadline.soft - deadline.start == pytest.approx(16 / 12)
+    clock.decisions.append(DecisionTime(2, 16, 100, "positions"))
+    assert clock.deadline(state).hard_passed()
+    assert clock.report().startswith("5 decisions in 32.0s (longest 16.00s), 500 positions")
+
+
+def test_stopped_search_returns_at_once():
+    d = Dogpark(autorun=False, num_players=3, ais=["NaiveAI"] * 3, prints=False, seed=1)
+    d.setup()
+    d.play_recruitment()
+    d.state.stage, d.state.player = Stage.SELECTION, d.state.players[0]
+
+    deadline = Deadline(60)
+    deadline.stop()
+    start = time.perf_counter()
+    move = MaxnSearch(d.state.clone(), deadline=deadline).search()
+    assert time.perf_counter() - start < 0.5
+    assert move in legal_moves(d.state)
+
+
+@pytest.mark.parametrize("ai, unit", [(MinimaxAI, "positions"), (ISMCTSAI, "playouts")])
+def test_ais_think_against_the_clock(monkeypatch, ai, unit):
+    control = TimeControl(per_decision=0.01, hard_limit=0.05)
+    monkeypatch.setattr(ai, "clock", None)
+    clocks = []
+
+    def with_clock(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        self.clock = Clock(control)
+        clocks.append(self.clock)
+
+    init = ai.__init__
+    monkeypatch.setattr(ai, "__init__", with_clock)
+    Dogpark(num_players=3, ais=[ai.__name__, "HeuristicAI", "NaiveAI"], prints=False, seed=3)
+    (clock,) = clocks
+    assert clock.decisions
+    assert all(decision.unit == unit and decision.work > 0 for decision in clock.decisions)
+    assert max(decision.seconds for decision in clock.decisions) < control.hard_limit + 0.05
+
+
+def test_ismcts_stops_at_the_hard_deadline():
+    d = Dogpark(autorun=False, num_players=3, ais=["ISMCTSAI", "NaiveAI", "NaiveAI"], prints=False, seed=1)
+    d.setup()
+    d.play_recruitment()
+    d.state.stage, d.state.player = Stage.SELECTION, d.state.players[0]
+    ai = d.state.players[0]
+
+    deadline = Deadline(60)
+    deadline.stop()
+    start = time.perf_counter()
+    move, work, _ = ai.think(deadline)
+    assert time.perf_counter() - start < 0.05
+    assert move is None and work == 0
+
+    # past its hard limit before it starts, it falls back on the naive AI's choices rather than searching
+    ai.clock = Clock(TimeControl(per_decision=1, per_game=0, hard_limit=1))
+    dogs = d.state.dogs[:2]
+    start = time.perf_counter()
+    assert ai.choose_dog(dogs) == dogs[0]
+    assert ai.do_selection() is not None
+    assert time.perf_counter() - start < 0.05
+    assert all(decision.work == 0 for decision in ai.clock.decisions)
+
+
+def test_heuristic_ai_decisions_are_timed():
+    clock = Clock(TimeControl(per_decision=0.01, hard_limit=0.05))
+
+    def heuristic(*args, **kwargs) -> HeuristicAI:
+        ai = HeuristicAI(*args, **kwargs)
+        ai.clock = clock
+        return ai
+
+    Dogpark(num_players=3, ais=[heuristic, "NaiveAI", "NaiveAI"], prints=False, seed=3)
+    assert clock.decisions
+    assert all(decision.work > 0 for decision in clock.decisions)
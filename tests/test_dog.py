@@ -0,0 +1,54 @@
+import os
+
+import yaml
+
+from dogpark.game.cards import CARD_DIR, load_yaml
+from dogpark.game.dog import DOG_IDS, DOGS, Ability, Breed
+from dogpark.game.game import Dogpark
+from dogpark.game.gamestate import GameState
+
+
+def test_catalog():
+    dog = DOGS[DOG_IDS["Cirneco_Dell_Etna"]]
+    assert dog.breed is Breed.HOUND
+    assert dog.ability is Ability.GO_FETCH
+    assert dog.cost == (1, 1, 1, 0)
+    assert dog.converter == ("STICK", "TOY")
+    assert DOGS[DOG_IDS["Maltese"]].converter == ("TOY", "REP")
+    assert all(DOGS[i].id == i for i in range(len(DOGS)))
+
+
+def test_games_share_the_catalog():
+    first, second = GameState(3), GameState(3)
+    first.walked[0] += 1
+    assert second.walked[0] == 0
+    assert sorted(first.dogs_deck) == sorted(second.dogs_deck) == list(range(len(DOGS)))
+
+
+def test_breed_counts_follow_the_kennel():
+    d = Dogpark(autorun=True, num_players=4, ais=["NaiveAI", "NaiveAI", "StingyAI", "MinimaxAI"], prints=False, seed=7)
+    for player in d.state.players:
+        assert player.breeds == [sum(DOGS[dog].breed is breed for dog in player.kennel) for breed in Breed]
+
+    experts = d.state.calculate_breed_experts()
+    for i, breed in enumerate(d.state.breed_experts):
+        counts = {p.colour: sum(DOGS[dog].breed is breed for dog in p.kennel) for p in d.state.players}
+        for colour, count in counts.items():
+            if count == max(counts.values()):
+                assert experts[colour][2] >= 8 - i
+
+
+def test_card_cache(tmp_path):
+    path = tmp_path / "dogs.yaml"
+    with open(os.path.join(CARD_DIR, "dogs.yaml"), "rb") as f:
+        path.write_bytes(f.read())
+    parsed = yaml.safe_load(path.read_text())
+    assert load_yaml(str(path), str(tmp_path)) == parsed
+    (cache,) = tmp_path.glob("*.marshal")
+    cached = load_yaml(str(path), str(tmp_path))
+    assert cached == parsed and list(cached) == list(parsed)
+
+    # an edited file misses the cache, and replaces it
+    path.write_text("Pug: {b: T, c: [BALL]}\n")
+    assert load_yaml(str(path), str(tmp_path)) == {"Pug": {"b": "T", "c": ["BALL"]}}
+    assert not cache.exists() and len(list(tmp_path.glob("*.marshal"))) == 1
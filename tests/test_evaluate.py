@@ -0,0 +1,45 @@
+from dogpark.evaluate import GameResult, Matchup, Ratings, league, play_matchup
+
+WIN, DRAW, LOSS = GameResult(1, 5), GameResult(0.5, 0), GameResult(0, -5)
+
+
+def test_sprt_accepts_the_stronger_ai():
+    matchup = Matchup("A", "B")
+    while matchup.result is None:
+        matchup.add_pair((WIN, [WIN, LOSS, DRAW][matchup.pairs % 3]))
+    assert matchup.result == "H1"
+    assert matchup.wins > matchup.losses and matchup.mean_margin > 0
+    assert matchup.elo()[0] > 0
+
+
+def test_sprt_rejects_an_equal_ai():
+    matchup = Matchup("A", "B")
+    while matchup.result is None:
+        matchup.add_pair([(WIN, LOSS), (LOSS, WIN), (DRAW, DRAW)][matchup.pairs % 3])
+    assert matchup.result == "H0"
+    assert abs(matchup.elo()[0]) < 1
+
+
+def test_ratings():
+    ratings = Ratings()
+    for _ in range(10):
+        ratings.update("A", "B", 1)
+    assert ratings["A"] > 1500 > ratings["B"]
+    assert ratings["A"] + ratings["B"] == 3000
+    assert [ai for ai, _, _ in ratings.table()] == ["A", "B"]
+
+
+def test_matchup_stops_early_and_is_reproducible():
+    # the AIs only differ when every location they can walk to is occupied, so each pair of games is a draw overall
+    serial = play_matchup("NaiveAI", "StingyAI", max_games=200)
+    assert serial.result == "H0" and serial.games < 200
+    parallel = play_matchup("NaiveAI", "StingyAI", max_games=200, jobs=2)
+    assert parallel.pair_scores == serial.pair_scores
+
+
+def test_league():
+    matchups, ratings = league(["NaiveAI", "StingyAI", "HeuristicAI"], max_games=20)
+    assert [(m.ai, m.opponent) for m in matchups] == [
+        ("NaiveAI", "StingyAI"), ("NaiveAI", "HeuristicAI"), ("StingyAI", "HeuristicAI")
+    ]
+    assert sum(games for _, _, games in ratings.table()) == 2 * sum(m.games for m in matchups)
@@ -0,0 +1,29 @@
+from dogpark.game.events import BidPlaced, BonusesTaken, DestinationChosen, DogWon, FinalScore, Result
+from dogpark.game.game import Dogpark
+
+
+def test_observers_follow_the_game():
+    d = Dogpark(autorun=False, num_players=3, ais=["NaiveAI", "NaiveAI", "StingyAI"], prints=False, seed=0)
+    events = []
+    d.state.observers.append(events.append)
+    d.setup()
+    for r in range(1, 5):
+        d.state.round = r
+        d.play_round()
+    d.end_game()
+
+    kinds = {type(event) for event in events}
+    assert {BidPlaced, DogWon, DestinationChosen, BonusesTaken, FinalScore, Result} <= kinds
+    assert sum(isinstance(event, BidPlaced) for event in events) == 4 * 2 * 3
+    scores = {event.player.colour: event.breakdown.total for event in events if isinstance(event, FinalScore)}
+    assert scores == {player.colour: score for player, score in d.scores.items()}
+    assert d.state.clone().observers == []
+
+
+def test_console_observer(capsys):
+    Dogpark(autorun=True, num_players=3, ais=["NaiveAI", "NaiveAI", "StingyAI"], prints=False, seed=0)
+    assert capsys.readouterr().out == ""
+    d = Dogpark(autorun=True, num_players=3, ais=["NaiveAI", "NaiveAI", "StingyAI"], seed=0)
+    out = capsys.readouterr().out
+    assert "Bidding Round 2" in out and "Game over!" in out
+    assert all(f"{player.colour}: {score} REP" in out for player, score in d.scores.items())
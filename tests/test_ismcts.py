@@ -0,0 +1,38 @@
+import random
+
+from dogpark.ais.ismcts_ai import ISMCTSAI
+from dogpark.game.game import Dogpark
+from dogpark.game.gamestate import Stage
+from dogpark.game.playout import PlayoutPlayer, play_out
+
+AIS = ["ISMCTSAI", "NaiveAI", "NaiveAI"]
+
+
+def test_determinize_hides_only_hidden_information(start_of):
+    d = start_of(Stage.RECRUITMENT, 2, AIS)
+    ai = next(p for p in d.state.players if isinstance(p, ISMCTSAI))
+    deck = d.state.dogs_deck.copy()
+    for _ in range(20):
+        state, me = ai.determinize()
+        assert me.objective == ai.objective
+        assert sorted(state.dogs_deck) == sorted(deck)
+        assert all(isinstance(p, PlayoutPlayer) for p in state.players)
+        for player, copy in zip(d.state.players, state.players):
+            assert copy.kennel == player.kennel
+            if player is not ai:
+                assert copy.objective not in ai.objective_pair
+    assert d.state.dogs_deck == deck
+
+
+def test_play_out_finishes_the_game(start_of):
+    d = start_of(Stage.RECRUITMENT, 3, AIS)
+    state, _ = d.state.players[0].determinize()
+    scores = play_out(state, random.Random(0))
+    assert len(scores) == 3
+    assert state.round == 4
+    assert d.state.round == 1
+
+
+def test_ismcts_ai_plays_a_game():
+    d = Dogpark(autorun=True, num_players=4, ais=["ISMCTSAI", "NaiveAI", "StingyAI", "MinimaxAI"], prints=False, seed=6)
+    assert len(d.scores) == 4
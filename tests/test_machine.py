@@ -0,0 +1,94 @@
+import pickle
+
+import pytest
+
+from dogpark.game.game import Dogpark
+from dogpark.game.gamestate import Stage
+from dogpark.game.machine import GameMachine, play
+from dogpark.game.recording import BID, BONUS, HIDDEN, LOOK, SWAP
+
+AIS = ["NaiveAI", "StingyAI", "HeuristicAI"]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_plays_the_same_game_as_dogpark(seed):
+    game = Dogpark(num_players=3, ais=AIS, prints=False, seed=seed, record=True)
+    recording = game.recorder.recording()
+    machine = GameMachine.deal(3, seed)
+    # the same seats and cards
+    assert machine.recording.colours == recording.colours
+    assert machine.recording[3:7] == recording[3:7]
+
+    # answer every decision with the option that makes the next actions the game made
+    actions = list(recording.actions)
+    while machine.decision is not None:
+        decision = machine.decision
+        answers = {option: list(machine._actions(decision, option)) for option in decision.options}
+        if decision.kind == BONUS and decision.options[0] in HIDDEN:
+            # the order of the bonuses, which shows in the action answering the first of them
+            action = actions[0]
+            option = "LOOK" if action.kind == LOOK else HIDDEN[1 + action.args[0]]
+        else:
+            option = next(option for option, answer in answers.items() if answer == actions[: len(answer)])
+        del actions[: len(answers[option])]
+        machine.answer(option)
+    assert not actions
+    assert machine.scores == {player.colour: score for player, score in game.scores.items()}
+    assert machine.winners == game.winners
+
+
+def test_suspended_games_carry_on():
+    machine = GameMachine.deal(4, seed=5)
+    for _ in range(40):
+        machine.answer(machine.decision.options[-1])
+    stage = machine.state.stage
+    data = pickle.dumps(machine)
+    assert len(data) < 1000
+    copy = pickle.loads(data)
+    machine.suspend()
+    assert copy.decision == machine.decision
+    assert copy.state.stage is stage
+    while machine.decision is not None:
+        option = machine.decision.options[0]
+        machine.answer(option)
+        copy.answer(option)
+    assert copy.decision is None
+    assert copy.scores == machine.scores
+
+
+def test_answers_must_be_options():
+    machine = GameMachine.deal(2, seed=1)
+    objective = machine.decision.options[0]
+    with pytest.raises(ValueError):
+        machine.answer(0)
+    machine.answer(objective)
+    machine.answer(machine.decision.options[0])
+    assert machine.decision.kind == BID
+    assert machine.state.stage is Stage.RECRUITMENT
+    assert machine.player.seat == machine.decision.seat
+
+
+def test_ais_play_to_the_end():
+    machine = GameMachine.deal(3, seed=2)
+    scores = play(machine, AIS, seed=2)
+    assert machine.decision is None
+    assert sorted(scores) == sorted(machine.recording.colours)
+    with pytest.raises(ValueError):
+        machine.answer(None)
+
+
+def test_order_of_bonuses_that_ask_for_decisions():
+    machine = GameMachine.deal(4, seed=0)
+    while not (machine.decision.kind == BONUS and machine.decision.options[0] in HIDDEN):
+        machine.answer(machine.decision.options[-1])
+    assert machine.decision.options == ("LOOK", "SWAP")
+    actions = machine.recording.actions
+    machine.answer("SWAP")
+    # choosing the order records nothing, but is kept, suspended or pickled
+    assert machine.recording.actions == actions
+    assert machine.decision.kind == SWAP
+    copy = pickle.loads(pickle.dumps(machine))
+    machine.suspend()
+    assert copy.decision == machine.decision
+    machine.answer(None)
+    assert machine.decision.kind == LOOK
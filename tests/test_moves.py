@@ -0,0 +1,88 @@
+import random
+
+from dogpark.game.gamestate import Stage
+from dogpark.game.moves import Journal, Leave, Select, apply_move, legal_moves
+from dogpark.game.zobrist import TranspositionTable, zobrist_hash
+
+AIS = ["NaiveAI", "NaiveAI", "StingyAI"]
+
+
+def snapshot(state):
+    """everything the moves can change, in a comparable form"""
+    return (
+        state.stage,
+        state.player.colour if state.player else None,
+        [p.colour for p in state.players_walking],
+        bytes(state.walked),
+        dict(state.park.player_positions),
+        list(state.park.leaving_bonuses),
+        [(p.reputation, dict(p.resources), sorted(p.kennel), sorted(p.lead), list(p.breeds)) for p in state.players],
+    )
+
+
+def test_clone_is_independent(start_of):
+    state = start_of(Stage.SELECTION, 1, AIS).state
+    clone = state.clone()
+    assert clone.players[0].game is clone
+    assert clone.player is clone.players[0]
+
+    journal = Journal()
+    while legal_moves(clone):
+        apply_move(clone, legal_moves(clone)[0], journal)
+    assert clone.stage is Stage.HOME_TIME
+    assert state.stage is Stage.SELECTION
+    assert not any(p.lead for p in state.players)
+
+
+def test_undo_restores_every_position(start_of):
+    state = start_of(Stage.SELECTION, 2, AIS).state
+    journal = Journal()
+    rng = random.Random(0)
+    history = []
+    while moves := legal_moves(state):
+        history.append((journal.mark(), snapshot(state)))
+        apply_move(state, rng.choice(moves), journal)
+    assert state.stage is Stage.HOME_TIME
+
+    for mark, before in reversed(history):
+        journal.undo(mark)
+        assert snapshot(state) == before
+
+
+def test_legal_moves(start_of):
+    state = start_of(Stage.SELECTION, 3, AIS).state
+    moves = legal_moves(state)
+    assert all(isinstance(m, Select) for m in moves)
+    assert Select((), (0, 0, 0, 0)) in moves
+
+    journal = Journal()
+    for _ in range(3):
+        apply_move(state, Select((), (0, 0, 0, 0)), journal)
+    assert state.stage is Stage.WALKING
+    assert Leave(0) not in legal_moves(state)  # nobody can leave from the start
+
+
+def test_zobrist_hash_is_incremental(start_of):
+    state = start_of(Stage.SELECTION, 6, AIS).state
+    state.zobrist = zobrist_hash(state)
+    start = state.zobrist
+    journal = Journal()
+    rng = random.Random(1)
+    seen = set()
+    while moves := legal_moves(state):
+        apply_move(state, rng.choice(moves), journal)
+        assert state.zobrist == zobrist_hash(state)
+        seen.add(state.zobrist)
+    journal.undo()
+    assert state.zobrist == start == zobrist_hash(state)
+    assert start not in seen
+
+
+def test_transposition_table_prefers_deeper_entries():
+    table = TranspositionTable(memory=TranspositionTable.ENTRY_BYTES)  # a single slot
+    table.store(1, 5, (0.5, 0.5), None, exact=True)
+    table.store(2, 3, (0.1, 0.9), None, exact=True)
+    assert table.lookup(2) is None and table.lookup(1).depth == 5
+    table.new_search()
+    table.store(2, 3, (0.1, 0.9), None, exact=True)
+    assert table.lookup(2).values == (0.1, 0.9)
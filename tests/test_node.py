@@ -0,0 +1,26 @@
+from dogpark.game.game import Dogpark
+from dogpark.game.gamestate import Stage
+from dogpark.game.moves import Select, legal_moves
+from dogpark.game.node import MaxnSearch, utilities
+
+
+def test_utilities_sum_to_one():
+    assert abs(sum(utilities((10, -3, 4))) - 1) < 1e-9
+    assert min(utilities((10, -3, 4))) > 0
+
+
+def test_search_leaves_state_unchanged(start_of):
+    state = start_of(Stage.SELECTION, 4).state
+    kennels = [sorted(p.kennel) for p in state.players]
+    search = MaxnSearch(state, time_limit=0.2)
+    move = search.search()
+    assert move in legal_moves(state)
+    assert isinstance(move, Select)
+    assert search.depth >= 1
+    assert [sorted(p.kennel) for p in state.players] == kennels
+    assert search.journal.mark() == 0
+
+
+def test_minimax_ai_plays_a_game():
+    d = Dogpark(autorun=True, num_players=3, ais=["MinimaxAI", "NaiveAI", "StingyAI"], prints=False, seed=5)
+    assert len(d.scores) == 3
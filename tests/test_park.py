@@ -1,4 +1,4 @@
-from dogpark.game.park import Park
+from dogpark.game.park import Park, PARKS
 
 
 def test_park():
@@ -16,3 +16,13 @@ def test_skips():
     }, 3)
     assert set(park.possible_moves(1)) == {2, 3, 5, 6, 10, 11}
     assert set(park.possible_moves(3)) == {5, 6, 7, 8, 10, 11, 12, 13}
+
+
+def test_parks_share_templates():
+    first, second = Park(PARKS[1], 3), Park(PARKS[1], 4)
+    assert first.board is second.board
+    assert first.possible_moves(-1) is second.possible_moves(-1)
+    assert first.possible_moves(15) == ()
+    assert first.location_bonuses == ("TOY",)
+    # leaving bonuses are consumed during a walk, so each park gets its own
+    assert first.leaving_bonuses is not second.leaving_bonuses
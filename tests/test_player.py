@@ -0,0 +1,26 @@
+from dogpark.game.dog import DOG_IDS
+from dogpark.game.game import Dogpark
+from dogpark.game.player import score_breakdown
+
+
+def test_scoring_changes_nothing():
+    ais = ["NaiveAI", "NaiveAI", "StingyAI", "HeuristicAI"]
+    d = Dogpark(autorun=True, num_players=4, ais=ais, prints=False, seed=8)
+    for player, score in d.scores.items():
+        resources = dict(player.resources)
+        breakdown = score_breakdown(player)
+        assert breakdown.total == score == player.final_score()
+        assert player.resources == resources
+
+
+def test_collectors_take_up_to_six():
+    d = Dogpark(autorun=False, num_players=3, ais=["NaiveAI", "NaiveAI", "NaiveAI"], prints=False, seed=9)
+    d.setup()
+    player = d.state.players[0]
+    player.objective = None
+    player.add_dog_to_kennel(DOG_IDS["Retriever_Labrador"])  # a treat lover
+    player.resources = {"STICK": 0, "BALL": 0, "TOY": 0, "TREAT": 9}
+    breakdown = score_breakdown(player)
+    assert breakdown.dogs == 12
+    assert breakdown.resources == 0  # the 3 treats left over aren't enough for a point
+    assert player.resources["TREAT"] == 9
@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from dogpark.ais.minimax_ai import MinimaxAI
+from dogpark.ais.naive_ai import NaiveAI
+from dogpark.game.clock import Clock, TimeControl
+from dogpark.game.game import Dogpark
+from dogpark.game.gamestate import Stage
+from dogpark.game.human import HumanPlayer
+from dogpark.game.ponder import Ponderer
+
+
+class WaitingAI(NaiveAI):
+    """Plays like the NaiveAI, but waits on input before each move, like a human player entering theirs"""
+
+    input = HumanPlayer.input
+
+    def do_selection(self) -> list[int]:
+        self.input()
+        return super().do_selection()
+
+    def choose_destination(self, park) -> int:
+        self.input()
+        return super().choose_destination(park)
+
+
+def _play(monkeypatch, ais: list, seed: int) -> tuple[Dogpark, Ponderer]:
+    monkeypatch.setattr("builtins.input", lambda prompt="": time.sleep(0.03) or "")
+    game = Dogpark(autorun=False, num_players=len(ais), ais=ais, prints=False, seed=seed)
+    ponderer = Ponderer()
+    game.state.observers.append(ponderer)
+    game.play()
+    return game, ponderer
+
+
+@pytest.mark.parametrize("ai", ["MinimaxAI", "ISMCTSAI"])
+def test_ais_reuse_what_they_pondered(monkeypatch, ai):
+    game, ponderer = _play(monkeypatch, [WaitingAI, ai], seed=3)
+    assert ponderer.thread is None
+    assert len(game.scores) == 2
+    searcher = next(player for player in game.state.players if type(player).__name__ == ai)
+    assert searcher.ponder_hits > 0
+    assert ponderer.seconds[searcher.colour] > 0
+    assert not searcher.pondered
+
+
+def _timed_minimax(*args, **kwargs) -> MinimaxAI:
+    ai = MinimaxAI(*args, **kwargs)
+    ai.clock = Clock(TimeControl(per_decision=0.01, hard_limit=0.02))
+    return ai
+
+
+def test_moves_pondered_for_long_enough_are_made_at_once(monkeypatch):
+    game, ponderer = _play(monkeypatch, [WaitingAI, _timed_minimax], seed=4)
+    minimax = next(player for player in game.state.players if isinstance(player, MinimaxAI))
+    # made from what was pondered, without searching any more positions
+    assert any(decision.work == 0 for decision in minimax.clock.decisions)
+    assert minimax.ponder_hits > 0
+
+
+def test_nothing_to_ponder_for(monkeypatch):
+    game, ponderer = _play(monkeypatch, [WaitingAI, "NaiveAI"], seed=1)
+    assert ponderer.seconds == {}
+    assert len(game.scores) == 2
+
+
+def test_recruitment_is_not_pondered():
+    d = Dogpark(autorun=False, num_players=2, ais=[WaitingAI, "ISMCTSAI"], prints=False, seed=2)
+    d.setup()
+    d.state.stage, d.state.player = Stage.RECRUITMENT, d.state.players[0]
+    assert Ponderer().find_candidates(d.state) == []
+
+
+def test_pondering_leaves_the_ais_choices_alone():
+    d = Dogpark(autorun=False, num_players=2, ais=[WaitingAI, "ISMCTSAI"], prints=False, seed=2)
+    d.setup()
+    d.play_recruitment()
+    d.state.players.sort(key=lambda player: not isinstance(player, WaitingAI))
+    d.state.stage, d.state.player = Stage.SELECTION, d.state.players[0]
+    ai = d.state.players[1]
+    rng = ai.rng.getstate()
+
+    ponderer = Ponderer()
+    candidates = ponderer.find_candidates(d.state)
+    assert candidates
+    ponderer._ponder(candidates[:2])
+    assert len(ai.pondered) == 2
+    assert ai.rng.getstate() == rng
@@ -0,0 +1,44 @@
+import pickle
+import pstats
+
+from dogpark.game.checkpoint import dumps, loads
+from dogpark.game.game import Dogpark
+from dogpark.game.profiling import Profile
+from dogpark.simulate import simulate
+
+AIS = ["NaiveAI", "StingyAI", "HeuristicAI"]
+
+
+def test_profile_game():
+    profile = Profile()
+    d = Dogpark(num_players=3, ais=AIS, prints=False, seed=1, profile=profile)
+    assert profile.games == 1
+    assert list(profile.phases) == ["SETUP", "RECRUITMENT", "SELECTION", "WALKING", "HOME_TIME", "SCORING"]
+    assert profile.phases["RECRUITMENT"][0] == 4
+    assert profile.phases["WALKING"][3] > 0 and profile.phases["SELECTION"][3] == 0
+    assert all(deciding <= seconds for _, seconds, deciding, _, _ in profile.phases.values())
+    assert profile.decisions["HeuristicAI.bid"][0] == 8
+    # profiled players keep the name of their class
+    names = [type(player).__name__ for player in d.state.players]
+    assert sorted(names) == sorted(AIS)
+    assert [type(player).__name__ for player in loads(dumps(d.state)).players] == names
+
+    unprofiled = Dogpark(num_players=3, ais=AIS, prints=False, seed=1)
+    assert list(unprofiled.scores.values()) == list(d.scores.values())
+
+
+def test_profile_simulation(tmp_path):
+    serial, parallel = Profile(cprofile=True), Profile(cprofile=True)
+    records = simulate(4, AIS, seed=3, profile=serial)
+    assert simulate(4, AIS, jobs=2, seed=3, profile=parallel) == records
+    for profile in (serial, parallel):
+        assert profile.games == 4
+        assert profile.phases["WALKING"][0] == 16
+    assert serial.decisions.keys() == parallel.decisions.keys()
+    assert [stat[0] for stat in serial.decisions.values()] == [stat[0] for stat in parallel.decisions.values()]
+
+    path = str(tmp_path / "games.pstats")
+    parallel.dump_stats(path)
+    stats = pstats.Stats(path)
+    assert any(function == "play_walking" for _, _, function in stats.stats)
+    assert pickle.loads(pickle.dumps(serial)).phases == serial.phases
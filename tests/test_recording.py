@@ -0,0 +1,53 @@
+import pytest
+
+from dogpark.game.game import Dogpark
+from dogpark.game.recording import SELECT, Action, Recording, load_game, replay
+
+
+def summary(state):
+    return [(p.colour, p.reputation, sorted(p.kennel), p.resources, p.objective) for p in state.players]
+
+
+def test_replay_plays_the_same_game():
+    for seed in range(10):
+        ais = ["NaiveAI", "StingyAI", "HeuristicAI", "NaiveAI"][: 3 + seed % 2]
+        d = Dogpark(num_players=len(ais), ais=ais, prints=False, seed=seed, record=True)
+        recording = d.recorder.recording()
+        data = recording.to_bytes()
+        assert len(data) < 1000
+        assert Recording.from_bytes(data) == recording
+
+        state = replay(Recording.from_bytes(data))
+        assert summary(state) == summary(d.state)
+        assert state.walked == d.state.walked
+        assert [player.final_score() for player in state.players] == list(d.scores.values())
+
+
+def test_replay_stops_part_way():
+    d = Dogpark(num_players=3, ais=["NaiveAI", "NaiveAI", "StingyAI"], prints=False, seed=1, record=True)
+    recording = d.recorder.recording()
+    assert replay(recording, 0).round == 1 and all(not p.kennel for p in replay(recording, 0).players)
+    rounds = [replay(recording, stop).round for stop in range(0, len(recording.actions), 10)]
+    assert rounds == sorted(rounds) and rounds[-1] == 4
+
+
+def test_save_game(tmp_path):
+    d = Dogpark(num_players=3, ais=["NaiveAI", "NaiveAI", "StingyAI"], prints=False, seed=2, record=True)
+    d.save_game(str(tmp_path / "game"))
+    assert summary(replay(load_game(str(tmp_path / "game")))) == summary(d.state)
+
+
+def test_any_int_seed_round_trips():
+    for seed in (-1, -(2**70), 2**64 + 5):
+        d = Dogpark(num_players=3, ais=["NaiveAI", "NaiveAI", "StingyAI"], prints=False, seed=seed, record=True)
+        recording = d.recorder.recording()
+        assert Recording.from_bytes(recording.to_bytes()) == recording
+        assert summary(replay(recording)) == summary(d.state)
+    # arguments that don't fit in a byte
+    big = recording._replace(actions=recording.actions + (Action(SELECT, 0, (300, 2**20, 0)),))
+    assert Recording.from_bytes(big.to_bytes()) == big
+
+
+def test_only_int_seeds_are_recorded():
+    with pytest.raises(ValueError):
+        Dogpark(num_players=3, ais=["NaiveAI", "NaiveAI", "StingyAI"], prints=False, seed="abc", record=True)
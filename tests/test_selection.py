@@ -0,0 +1,60 @@
+from dogpark.game.dog import DOGS, Breed
+from dogpark.game.game import Dogpark
+from dogpark.game.gamestate import Stage
+from dogpark.game.moves import legal_moves
+from dogpark.game.selection import affordable, best_selection, pack, solve
+
+
+def test_affordable():
+    assert affordable(pack((2, 1, 0, 3)), pack((2, 1, 0, 3)))
+    assert affordable(pack((2, 1, 0, 3)), pack((1, 0, 0, 0)))
+    assert not affordable(pack((2, 1, 0, 3)), pack((0, 0, 1, 0)))
+    assert not affordable(pack((0, 5, 5, 5)), pack((1, 0, 0, 0)))
+
+
+def test_best_selection_is_legal_and_best():
+    forecasts = set()
+    for seed in range(30):
+        d = Dogpark(autorun=False, num_players=3, ais=["NaiveAI", "NaiveAI", "StingyAI"], prints=False, seed=seed)
+        d.setup()
+        for r in range(1, 5):
+            d.state.round = r
+            d.play_recruitment()
+            state = d.state
+            state.stage = Stage.SELECTION
+            forecasts.add(state.current_forecast())
+            for player in state.players:
+                state.player = player
+                moves = legal_moves(state)
+                move = best_selection(state)
+                assert move in moves
+                # nothing walks more dogs for the same resources
+                assert not any(
+                    len(other.dogs) > len(move.dogs) and sum(other.cost) <= sum(move.cost) for other in moves
+                )
+            d.play_selection()
+            d.play_walking()
+            d.play_home_time()
+    assert 3 in forecasts and 11 in forecasts
+
+
+def test_forecasts():
+    hound = next(dog for dog in DOGS if dog.breed is Breed.HOUND)
+    toy = next(dog for dog in DOGS if dog.breed is Breed.TOY and dog.cost == hound.cost)
+    kennel = tuple(sorted([(hound.id, 1), (toy.id, 1)]))
+    # only one of them can be afforded, and forecast 6 makes it the hound
+    assert solve(kennel, hound.cost, 6, None)[0] == (hound.id,)
+
+    pastoral = next(dog for dog in DOGS if dog.breed is Breed.PASTORAL)
+    kennel = tuple(sorted([(pastoral.id, 0), (toy.id, 0)]))
+    # the dog placed after the pastoral dog is free
+    assert solve(kennel, pastoral.cost, 3, None)[:2] == (tuple(dog for dog, _ in kennel), pastoral.cost)
+    assert len(solve(kennel, pastoral.cost, 4, None)[0]) == 1
+
+
+def test_memoized():
+    solve.cache_clear()
+    kennel = tuple((dog, 0) for dog in range(6))
+    first = solve(kennel, (3, 3, 3, 3), 1, 3)
+    assert solve(kennel, (3, 3, 3, 3), 1, 3) is first
+    assert solve.cache_info().hits == 1
@@ -0,0 +1,39 @@
+from dogpark.game.game import Dogpark
+from dogpark.simulate import average_scores, simulate
+
+
+def test_simulate_is_reproducible():
+    ais = ["NaiveAI", "NaiveAI", "StingyAI", "StingyAI"]
+    serial = simulate(8, ais, jobs=1, seed=42)
+    parallel = simulate(8, ais, jobs=2, seed=42)
+    assert serial == parallel
+    assert len(serial) == 8
+    assert all(len(record) == 4 for record in serial)
+
+
+def test_seed_deals_the_same_cards_to_any_players():
+    games = [
+        Dogpark(autorun=False, num_players=3, ais=ais, prints=False, seed=3)
+        for ais in (["NaiveAI", "StingyAI", "NaiveAI"], ["HeuristicAI", "NaiveAI", "StingyAI"])
+    ]
+    for d in games:
+        d.setup()
+        d.play_round()
+    first, second = (d.state for d in games)
+    assert first.dogs_deck == second.dogs_deck and first.dogs == second.dogs
+    assert first.forecasts == second.forecasts and first.breed_experts == second.breed_experts
+    assert [player.objective for player in first.players] == [player.objective for player in second.players]
+
+
+def test_duplicate():
+    records = simulate(2, ["NaiveAI", "StingyAI", "HeuristicAI"], seed=5, duplicate=True)
+    assert len(records) == 6
+    seatings = [tuple(name for name, _ in record) for record in records]
+    assert all(sorted(seating) == ["HeuristicAI", "NaiveAI", "StingyAI"] for seating in seatings)
+    assert len(set(seatings[:3])) == 3
+    assert records[3:] != records[:3]
+
+
+def test_average_scores():
+    records = [(("NaiveAI", 10), ("StingyAI", 20)), (("NaiveAI", 30), ("StingyAI", 40))]
+    assert average_scores(records) == {"NaiveAI": 20, "StingyAI": 30}
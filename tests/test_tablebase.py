@@ -0,0 +1,111 @@
+import mmap
+from functools import lru_cache
+
+import pytest
+
+from dogpark.ais.tablebase_ai import TablebaseAI
+from dogpark.game import tablebase
+from dogpark.game.game import Dogpark
+from dogpark.game.moves import legal_moves
+from dogpark.game.park import PARKS, Park
+from dogpark.game.tablebase import (
+    BONUS_VALUES,
+    PAY,
+    Tablebase,
+    build_tablebase,
+    leaving_values,
+    load_tablebase,
+    solve,
+)
+
+
+@pytest.fixture
+def table_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(tablebase, "TABLE_DIR", str(tmp_path))
+    monkeypatch.setattr(tablebase, "_LOADED", {})
+    return tmp_path
+
+
+def test_solve_matches_search():
+    park = Park(PARKS[3], 2)
+    table = Tablebase(2, solve(park, 2))
+    board = [sum(BONUS_VALUES.get(bonus, 0) for bonus in bonuses) for bonuses in park.board]
+    leaving = leaving_values(2)
+
+    def gain(positions, turn, destination):
+        if destination == 15:
+            return leaving[0]
+        return max(board[destination] - 1, 0.0) if destination == positions[1 - turn] else board[destination]
+
+    @lru_cache(maxsize=None)
+    def mine(positions, turn):
+        """What the first player gains from here, searched forwards"""
+        other = 1 - turn
+        if positions[other] == 15:
+            return leaving[1] if turn == 0 else 0.0
+        destinations = park.possible_moves(positions[turn])
+        if turn == 1:
+            # the opponent takes the best bonus in reach, the nearest of equal ones
+            destination = max(destinations, key=lambda d: gain(positions, turn, d))
+            return mine((positions[0], destination), 0)
+        return max(gain(positions, 0, d) + mine((d, positions[1]), 1) for d in destinations)
+
+    for first in range(-1, 15):
+        for second in range(-1, 15):
+            for turn in range(2):
+                positions = (first, second)
+                assert table.value(positions, turn) == pytest.approx(mine(positions, turn), abs=0.01)
+                destination, _ = table.best_move(positions, turn)
+                assert destination in park.possible_moves(positions[turn])
+
+
+def test_pays_for_rep():
+    park = Park(PARKS[1], 2)
+    table = Tablebase(2, solve(park, 2))
+    for position, bonuses in enumerate(park.board):
+        value = sum(BONUS_VALUES.get(bonus, 0) for bonus in bonuses)
+        for turn in range(2):
+            positions = tuple(position if p != turn else -1 for p in range(2))
+            move = table.moves[table.index(positions, turn)]
+            if move & ~PAY == position:
+                assert bool(move & PAY) == (value > 1)
+
+
+def test_load_maps_saved_table(table_dir):
+    park = Park(PARKS[1], 3)
+    assert load_tablebase(park, 3) is None
+    table = build_tablebase(park, 3)
+    assert load_tablebase(park, 3) is table
+    assert list(table_dir.iterdir()) == [table_dir / tablebase.table_path(park, 3).rsplit("/", 1)[1]]
+    tablebase._LOADED.clear()
+    mapped = load_tablebase(park, 3)
+    assert isinstance(mapped.data, mmap.mmap)
+    assert bytes(mapped.moves) == bytes(table.moves)
+    with pytest.raises(ValueError):
+        Tablebase(2, mapped.data)
+
+
+def test_tablebase_ai_moves_are_legal(table_dir, monkeypatch):
+    search = TablebaseAI.search
+    moves = []
+
+    def checked(player):
+        move = search(player)
+        if player.game.stage.name == "WALKING":
+            assert move in legal_moves(player.game)
+            moves.append(move)
+        return move
+
+    monkeypatch.setattr(TablebaseAI, "search", checked)
+    for park_id in range(1, 9):
+        build_tablebase(Park(PARKS[park_id], 3), 3)
+    for seed in range(3):
+        Dogpark(num_players=3, ais=["TablebaseAI", "HeuristicAI", "TablebaseAI"], prints=False, seed=seed)
+    assert moves
+
+
+def test_tablebase_ai_never_solves_in_a_game(table_dir):
+    with pytest.warns(UserWarning, match="dogpark tablebase"):
+        d = Dogpark(num_players=3, ais=["TablebaseAI", "HeuristicAI", "TablebaseAI"], prints=False, seed=0)
+    assert len(d.scores) == 3
+    assert not list(table_dir.iterdir())